@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+import re
 import sys
 from logging.config import fileConfig
 
@@ -20,6 +21,23 @@ if config.config_file_name is not None:
 
 target_metadata = Base.metadata
 
+# On PostgreSQL, revision e1f2a3b4c5d6 partitions tickets by datetime. The
+# models keep the foreign keys into tickets.id and the unique ticket_no
+# because SQLite still has them, but Postgres cannot enforce either across
+# partitions. Autogenerate must not try to add them back, or drop the
+# partitions it finds.
+TICKET_PARTITION = re.compile(r"^tickets_(default|y\d{4}|m\d{4}_\d{2})$")
+
+
+def include_partitioned_tickets(object, name, type_, reflected, compare_to) -> bool:
+    if type_ == "table":
+        return not (reflected and TICKET_PARTITION.match(name or ""))
+    if type_ == "foreign_key_constraint":
+        return object.referred_table.name != "tickets"
+    if type_ == "unique_constraint" and object.table.name == "tickets":
+        return [column.name for column in object.columns] != ["ticket_no"]
+    return True
+
 
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
@@ -42,7 +60,13 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_partitioned_tickets
+            if connection.dialect.name == "postgresql"
+            else None,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
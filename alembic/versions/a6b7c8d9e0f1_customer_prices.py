@@ -0,0 +1,42 @@
+"""customer prices
+
+Revision ID: a6b7c8d9e0f1
+Revises: f5a6b7c8d9e0
+Create Date: 2026-10-19 00:10:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "a6b7c8d9e0f1"
+down_revision = "f5a6b7c8d9e0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "customer_prices",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "customer_id", sa.Integer(), sa.ForeignKey("customers.id"), nullable=False
+        ),
+        sa.Column(
+            "product_id", sa.Integer(), sa.ForeignKey("products.id"), nullable=False
+        ),
+        sa.Column("unit_price", sa.Numeric(12, 2), nullable=False),
+        sa.Column("effective_from", sa.Date(), nullable=False),
+        sa.Column("effective_to", sa.Date(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index(
+        "ix_customer_prices_lookup",
+        "customer_prices",
+        ["customer_id", "product_id", "effective_from"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_customer_prices_lookup", table_name="customer_prices")
+    op.drop_table("customer_prices")
@@ -0,0 +1,33 @@
+"""ticket unit price overridden
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-10-19 00:00:00.000000
+
+Existing tickets are treated as default-priced.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "a7b8c9d0e1f2"
+down_revision = "f6a7b8c9d0e1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("tickets") as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "unit_price_overridden",
+                sa.Boolean(),
+                nullable=False,
+                server_default=sa.false(),
+            )
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("tickets") as batch_op:
+        batch_op.drop_column("unit_price_overridden")
@@ -0,0 +1,62 @@
+"""customer balances
+
+Revision ID: b7c8d9e0f1a2
+Revises: a6b7c8d9e0f1
+Create Date: 2026-10-19 00:20:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "b7c8d9e0f1a2"
+down_revision = "a6b7c8d9e0f1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("customers") as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "uninvoiced_balance",
+                sa.Numeric(12, 2),
+                nullable=False,
+                server_default="0",
+            )
+        )
+        batch_op.add_column(
+            sa.Column(
+                "unpaid_invoice_balance",
+                sa.Numeric(12, 2),
+                nullable=False,
+                server_default="0",
+            )
+        )
+
+    op.execute(
+        """
+        UPDATE customers SET uninvoiced_balance = COALESCE((
+            SELECT SUM(t.total) FROM tickets t
+            WHERE t.customer_id = customers.id
+              AND t.status = 'COMPLETE'
+              AND t.invoice_id IS NULL
+              AND NOT t.dont_invoice
+              AND t.total IS NOT NULL
+        ), 0)
+        """
+    )
+    op.execute(
+        """
+        UPDATE customers SET unpaid_invoice_balance = COALESCE((
+            SELECT SUM(i.gross_total) FROM invoices i
+            WHERE i.customer_id = customers.id
+              AND i.status NOT IN ('PAID', 'VOID')
+        ), 0)
+        """
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("customers") as batch_op:
+        batch_op.drop_column("unpaid_invoice_balance")
+        batch_op.drop_column("uninvoiced_balance")
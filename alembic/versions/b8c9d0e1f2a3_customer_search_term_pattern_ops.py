@@ -0,0 +1,37 @@
+"""customer search term pattern ops
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-19 00:00:00.000000
+
+PostgreSQL only. Under a non-C collation a plain btree index cannot serve
+the typeahead's ``LIKE 'word%'``; ``varchar_pattern_ops`` can.
+"""
+from alembic import op
+
+
+revision = "b8c9d0e1f2a3"
+down_revision = "a7b8c9d0e1f2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.drop_index("ix_customer_search_terms_term", table_name="customer_search_terms")
+    op.create_index(
+        "ix_customer_search_terms_term",
+        "customer_search_terms",
+        ["term"],
+        postgresql_ops={"term": "varchar_pattern_ops"},
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.drop_index("ix_customer_search_terms_term", table_name="customer_search_terms")
+    op.create_index(
+        "ix_customer_search_terms_term", "customer_search_terms", ["term"]
+    )
@@ -0,0 +1,72 @@
+"""integrity findings
+
+Revision ID: c8d9e0f1a2b3
+Revises: b7c8d9e0f1a2
+Create Date: 2026-10-19 00:30:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "c8d9e0f1a2b3"
+down_revision = "b7c8d9e0f1a2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("invoices") as batch_op:
+        batch_op.add_column(sa.Column("updated_at", sa.DateTime(), nullable=True))
+    op.execute("UPDATE invoices SET updated_at = CURRENT_TIMESTAMP")
+
+    op.create_table(
+        "integrity_findings",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("issue_code", sa.String(length=50), nullable=False),
+        sa.Column(
+            "ticket_id",
+            sa.Integer(),
+            sa.ForeignKey("tickets.id", ondelete="CASCADE"),
+            nullable=True,
+        ),
+        sa.Column(
+            "invoice_id",
+            sa.Integer(),
+            sa.ForeignKey("invoices.id", ondelete="CASCADE"),
+            nullable=True,
+        ),
+        sa.Column("reference", sa.String(length=50), nullable=True),
+        sa.Column("detail", sa.String(length=255), nullable=True),
+        sa.Column("occurred_at", sa.DateTime(), nullable=True),
+        sa.Column("found_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index(
+        "ix_integrity_findings_ticket_id", "integrity_findings", ["ticket_id"]
+    )
+    op.create_index(
+        "ix_integrity_findings_invoice_id", "integrity_findings", ["invoice_id"]
+    )
+    op.create_index(
+        "ix_integrity_findings_issue_code", "integrity_findings", ["issue_code"]
+    )
+    op.create_index(
+        "ix_integrity_findings_occurred_at", "integrity_findings", ["occurred_at"]
+    )
+    op.create_table(
+        "integrity_scan_state",
+        sa.Column("name", sa.String(length=50), primary_key=True),
+        sa.Column("watermark", sa.DateTime(), nullable=True),
+        sa.Column("last_run_at", sa.DateTime(), nullable=True),
+        sa.Column("last_findings", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("integrity_scan_state")
+    op.drop_index("ix_integrity_findings_occurred_at", table_name="integrity_findings")
+    op.drop_index("ix_integrity_findings_issue_code", table_name="integrity_findings")
+    op.drop_index("ix_integrity_findings_invoice_id", table_name="integrity_findings")
+    op.drop_index("ix_integrity_findings_ticket_id", table_name="integrity_findings")
+    op.drop_table("integrity_findings")
+    with op.batch_alter_table("invoices") as batch_op:
+        batch_op.drop_column("updated_at")
@@ -0,0 +1,57 @@
+"""lookup usage counters
+
+Revision ID: d9e0f1a2b3c4
+Revises: c8d9e0f1a2b3
+Create Date: 2026-10-19 01:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "d9e0f1a2b3c4"
+down_revision = "c8d9e0f1a2b3"
+branch_labels = None
+depends_on = None
+
+# (lookup table, referencing table, referencing column)
+LOOKUP_REFERENCES = (
+    ("hauliers", "tickets", "haulier_id"),
+    ("drivers", "tickets", "driver_id"),
+    ("containers", "tickets", "container_id"),
+    ("destinations", "tickets", "destination_id"),
+    ("yards", "tickets", "yard_id"),
+    ("areas", "tickets", "area_id"),
+    ("waste_codes", "tickets", "waste_code_id"),
+    ("waste_codes", "products", "default_waste_code_id"),
+    ("licences", "tickets", "licence_id"),
+    ("waste_producers", "tickets", "waste_producer_id"),
+    ("tax_rates", "products", "tax_rate_id"),
+    ("payment_methods", "invoices", "payment_method_id"),
+    ("nominal_codes", "products", "nominal_code_id"),
+    ("invoice_frequencies", "customers", "invoice_frequency_id"),
+    ("void_reasons", "ticket_voids", "reason_id"),
+    ("void_reasons", "invoice_voids", "reason_id"),
+    ("product_groups", "products", "group_id"),
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "lookup_usage",
+        sa.Column("lookup", sa.String(length=50), primary_key=True),
+        sa.Column("lookup_id", sa.Integer(), primary_key=True),
+        sa.Column("source", sa.String(length=50), primary_key=True),
+        sa.Column(
+            "usage_count", sa.Integer(), nullable=False, server_default="0"
+        ),
+    )
+    for lookup, source, column in LOOKUP_REFERENCES:
+        op.execute(
+            f"INSERT INTO lookup_usage (lookup, lookup_id, source, usage_count) "
+            f"SELECT '{lookup}', {column}, '{source}', COUNT(*) FROM {source} "
+            f"WHERE {column} IS NOT NULL GROUP BY {column}"
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("lookup_usage")
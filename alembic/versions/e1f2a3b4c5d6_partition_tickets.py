@@ -0,0 +1,155 @@
+"""partition tickets by datetime
+
+Revision ID: e1f2a3b4c5d6
+Revises: d9e0f1a2b3c4
+Create Date: 2026-10-19 00:00:00.000000
+
+PostgreSQL only; other databases keep a plain ``tickets`` table.
+
+Creates one partition per year from the oldest ticket through next year,
+plus ``tickets_default``; the app creates later partitions itself. The
+primary key becomes (id, datetime), since Postgres requires the partition
+key in every unique constraint. For the same reason the foreign keys
+pointing at tickets.id are dropped, and ticket_no is unique per partition
+only. Foreign keys from tickets to customers and the lookups are kept. Ids
+still come from the one sequence.
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "e1f2a3b4c5d6"
+down_revision = "d9e0f1a2b3c4"
+branch_labels = None
+depends_on = None
+
+DEFAULT_PARTITION = "tickets_default"
+
+# (table, column, ondelete) of every foreign key to tickets.id.
+REFERENCES = (
+    ("invoice_lines", "ticket_id", None),
+    ("ticket_voids", "ticket_id", None),
+    ("integrity_findings", "ticket_id", "CASCADE"),
+)
+
+
+def _plain_indexes(conn, table: str) -> list[dict]:
+    return [
+        index for index in sa.inspect(conn).get_indexes(table) if not index["unique"]
+    ]
+
+
+def _swap_out(conn, new_name: str) -> tuple[list[dict], list[dict], str | None]:
+    """Rename ``tickets`` out of the way, freeing its index and key names.
+
+    Returns its plain indexes, outgoing foreign keys and id sequence.
+    """
+    inspector = sa.inspect(conn)
+    indexes = _plain_indexes(conn, "tickets")
+    foreign_keys = inspector.get_foreign_keys("tickets")
+    sequence = conn.execute(
+        sa.text("SELECT pg_get_serial_sequence('tickets', 'id')")
+    ).scalar_one()
+    pk_name = inspector.get_pk_constraint("tickets")["name"]
+    for index in indexes:
+        op.drop_index(index["name"], table_name="tickets")
+    op.rename_table("tickets", new_name)
+    op.execute(f"ALTER TABLE {new_name} RENAME CONSTRAINT {pk_name} TO {new_name}_pkey")
+    return indexes, foreign_keys, sequence
+
+
+def _restore_foreign_keys(foreign_keys: list[dict]) -> None:
+    for foreign_key in foreign_keys:
+        op.create_foreign_key(
+            foreign_key["name"],
+            "tickets",
+            foreign_key["referred_table"],
+            foreign_key["constrained_columns"],
+            foreign_key["referred_columns"],
+            ondelete=foreign_key["options"].get("ondelete"),
+        )
+
+
+def _create_year_partition(year: int) -> None:
+    name = f"tickets_y{year}"
+    op.execute(
+        f"CREATE TABLE {name} (LIKE tickets INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    )
+    op.execute(
+        f"ALTER TABLE tickets ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{year}-01-01 00:00:00') TO ('{year + 1}-01-01 00:00:00')"
+    )
+    op.execute(f"CREATE UNIQUE INDEX {name}_ticket_no_key ON {name} (ticket_no)")
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        return
+
+    inspector = sa.inspect(conn)
+    for table, _, _ in REFERENCES:
+        for foreign_key in inspector.get_foreign_keys(table):
+            if foreign_key["referred_table"] == "tickets":
+                op.drop_constraint(foreign_key["name"], table, type_="foreignkey")
+
+    indexes, foreign_keys, sequence = _swap_out(conn, "tickets_unpartitioned")
+    op.execute(
+        "CREATE TABLE tickets (LIKE tickets_unpartitioned INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (datetime)"
+    )
+    op.execute("ALTER TABLE tickets ADD CONSTRAINT tickets_pkey PRIMARY KEY (id, datetime)")
+    if sequence:
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY tickets.id")
+    for index in indexes:
+        op.create_index(index["name"], "tickets", index["column_names"])
+
+    first, last = conn.execute(
+        sa.text("SELECT min(datetime), max(datetime) FROM tickets_unpartitioned")
+    ).one()
+    today = date.today()
+    first_year = min(first.year if first else today.year, today.year)
+    last_year = max(last.year if last else today.year, today.year + 1)
+    for year in range(first_year, last_year + 1):
+        _create_year_partition(year)
+    op.execute(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF tickets DEFAULT")
+    op.execute(
+        f"CREATE UNIQUE INDEX {DEFAULT_PARTITION}_ticket_no_key "
+        f"ON {DEFAULT_PARTITION} (ticket_no)"
+    )
+
+    op.execute("INSERT INTO tickets SELECT * FROM tickets_unpartitioned")
+    op.drop_table("tickets_unpartitioned")
+    _restore_foreign_keys(foreign_keys)
+    op.execute("ANALYZE tickets")
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        return
+
+    indexes, foreign_keys, sequence = _swap_out(conn, "tickets_partitioned")
+    op.execute("CREATE TABLE tickets (LIKE tickets_partitioned INCLUDING DEFAULTS)")
+    op.execute("ALTER TABLE tickets ADD CONSTRAINT tickets_pkey PRIMARY KEY (id)")
+    if sequence:
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY tickets.id")
+    op.execute("INSERT INTO tickets SELECT * FROM tickets_partitioned")
+    # Dropping the parent drops every partition with it.
+    op.drop_table("tickets_partitioned")
+
+    op.create_unique_constraint("uq_tickets_ticket_no", "tickets", ["ticket_no"])
+    for index in indexes:
+        op.create_index(index["name"], "tickets", index["column_names"])
+    _restore_foreign_keys(foreign_keys)
+    for table, column, ondelete in REFERENCES:
+        op.create_foreign_key(
+            f"{table}_{column}_fkey",
+            table,
+            "tickets",
+            [column],
+            ["id"],
+            ondelete=ondelete,
+        )
@@ -0,0 +1,68 @@
+"""customer search terms
+
+Revision ID: f5a6b7c8d9e0
+Revises: e4f5a6b7c8d9
+Create Date: 2026-10-19 00:00:00.000000
+"""
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "f5a6b7c8d9e0"
+down_revision = "e4f5a6b7c8d9"
+branch_labels = None
+depends_on = None
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def _normalize(value: str | None) -> str:
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _NON_ALNUM.sub(" ", stripped.lower()).strip()
+
+
+def _terms(account_code: str | None, name: str | None) -> set[str]:
+    terms = set(_normalize(account_code).split()) | set(_normalize(name).split())
+    compact_code = _normalize(account_code).replace(" ", "")
+    if compact_code:
+        terms.add(compact_code)
+    return {term[:100] for term in terms}
+
+
+def upgrade() -> None:
+    op.create_index("ix_customers_name_id", "customers", ["name", "id"])
+    search_terms = op.create_table(
+        "customer_search_terms",
+        sa.Column(
+            "customer_id",
+            sa.Integer(),
+            sa.ForeignKey("customers.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("term", sa.String(length=100), primary_key=True),
+    )
+    op.create_index(
+        "ix_customer_search_terms_term", "customer_search_terms", ["term"]
+    )
+
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("SELECT id, account_code, name FROM customers"))
+    values = [
+        {"customer_id": customer_id, "term": term}
+        for customer_id, account_code, name in rows
+        for term in _terms(account_code, name)
+    ]
+    if values:
+        op.bulk_insert(search_terms, values)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_customer_search_terms_term", table_name="customer_search_terms")
+    op.drop_table("customer_search_terms")
+    op.drop_index("ix_customers_name_id", table_name="customers")
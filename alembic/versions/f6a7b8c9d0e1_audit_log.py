@@ -0,0 +1,55 @@
+"""audit log
+
+Revision ID: f6a7b8c9d0e1
+Revises: e1f2a3b4c5d6
+Create Date: 2026-10-19 00:00:00.000000
+
+On PostgreSQL a trigger rejects UPDATE and DELETE on audit_log.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "f6a7b8c9d0e1"
+down_revision = "e1f2a3b4c5d6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "audit_log",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("entity", sa.String(length=50), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column("action", sa.String(length=10), nullable=False),
+        sa.Column("changes", sa.JSON(), nullable=False),
+        sa.Column("changed_by", sa.String(length=150), nullable=False),
+        sa.Column("changed_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_audit_log_entity", "audit_log", ["entity", "entity_id", "id"])
+    op.create_index("ix_audit_log_changed_at", "audit_log", ["changed_at"])
+
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            """
+            CREATE FUNCTION audit_log_append_only() RETURNS trigger AS $$
+            BEGIN
+                RAISE EXCEPTION 'audit_log is append-only';
+            END;
+            $$ LANGUAGE plpgsql
+            """
+        )
+        op.execute(
+            "CREATE TRIGGER audit_log_append_only BEFORE UPDATE OR DELETE "
+            "ON audit_log FOR EACH ROW EXECUTE FUNCTION audit_log_append_only()"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP TRIGGER audit_log_append_only ON audit_log")
+        op.execute("DROP FUNCTION audit_log_append_only()")
+    op.drop_index("ix_audit_log_changed_at", table_name="audit_log")
+    op.drop_index("ix_audit_log_entity", table_name="audit_log")
+    op.drop_table("audit_log")
@@ -0,0 +1,156 @@
+"""Content-hashed static assets with precompressed variants.
+
+At startup every file under ``app/static`` is copied into the build directory
+as ``name.<hash>.ext``, next to ``.gz`` (and ``.br`` when the ``brotli``
+package is installed) versions. Templates link the hashed names through
+``static_url``, so those responses can be cached forever.
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+
+from .config import Settings, settings
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip variants are written without it
+    brotli = None
+
+STATIC_DIR = Path("app/static")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+COMPRESSIBLE_SUFFIXES = {".css", ".js", ".svg", ".json", ".map", ".txt", ".html"}
+# Smaller files gain nothing from compression.
+MIN_COMPRESS_BYTES = 512
+HASH_LENGTH = 12
+HTMX_VERSION = "1.9.10"
+HTMX_URL = f"https://unpkg.com/htmx.org@{HTMX_VERSION}/dist/htmx.min.js"
+# Subresource integrity hash published with the release.
+HTMX_SHA384 = "D1Kt99CQMDuVetoL1lrYwg5t+9QdHe7NLX/SoJYkXDFfX37iInKRy5xLSi8nO7UC"
+HTMX_PATH = STATIC_DIR / "vendor" / "htmx.min.js"
+
+
+@dataclass(frozen=True)
+class AssetManifest:
+    # logical path ("css/style.css") -> hashed path ("css/style.3f2a9c1b7d4e.css")
+    files: dict[str, str]
+    hashed: frozenset[str] = frozenset()
+
+    def url(self, path: str) -> str:
+        return f"/static/{self.files.get(path, path)}"
+
+
+def _hashed_name(relative: Path, data: bytes) -> Path:
+    digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+    return relative.with_name(f"{relative.stem}.{digest}{relative.suffix}")
+
+
+def _write_once(path: Path, data: bytes) -> None:
+    # Hashed names never change content, so an existing file is up to date.
+    if path.exists():
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    partial.write_bytes(data)
+    partial.replace(path)
+
+
+def build_assets(
+    source: Path = STATIC_DIR, config: Settings = settings
+) -> AssetManifest:
+    output = Path(config.static_build_dir)
+    files: dict[str, str] = {}
+    for path in sorted(source.rglob("*")):
+        if not path.is_file() or path.name.startswith("."):
+            continue
+        relative = path.relative_to(source)
+        data = path.read_bytes()
+        hashed = _hashed_name(relative, data)
+        target = output / hashed
+        _write_once(target, data)
+        if relative.suffix in COMPRESSIBLE_SUFFIXES and len(data) >= MIN_COMPRESS_BYTES:
+            _write_once(
+                target.with_name(target.name + ".gz"),
+                gzip.compress(data, compresslevel=9, mtime=0),
+            )
+            if brotli is not None:
+                _write_once(
+                    target.with_name(target.name + ".br"), brotli.compress(data)
+                )
+        files[relative.as_posix()] = hashed.as_posix()
+    output.mkdir(parents=True, exist_ok=True)
+    (output / "manifest.json").write_text(json.dumps(files, indent=2, sort_keys=True))
+    return AssetManifest(files, frozenset(files.values()))
+
+
+manifest = AssetManifest({})
+
+
+def load_assets(config: Settings = settings) -> AssetManifest:
+    global manifest
+    manifest = build_assets(config=config)
+    return manifest
+
+
+def static_url(path: str) -> str:
+    """URL for a file under app/static, fingerprinted outside debug.
+
+    In debug the plain name is served (revalidated each time), so edits show
+    up without a restart.
+    """
+    if settings.debug:
+        return f"/static/{path}"
+    return manifest.url(path)
+
+
+class AssetStaticFiles(StaticFiles):
+    """Serves hashed files from the build directory and the rest from source.
+
+    Hashed files are immutable and served precompressed when the client
+    accepts it; anything else must be revalidated.
+    """
+
+    def __init__(self, config: Settings = settings) -> None:
+        build_dir = Path(config.static_build_dir)
+        build_dir.mkdir(parents=True, exist_ok=True)
+        super().__init__(directory=build_dir)
+        self.all_directories = [build_dir, STATIC_DIR]
+        self.build_dir = build_dir.resolve()
+
+    def file_response(
+        self, full_path, stat_result, scope, status_code: int = 200
+    ) -> Response:
+        path = Path(full_path).resolve()
+        if path.is_relative_to(self.build_dir) and (
+            path.relative_to(self.build_dir).as_posix() in manifest.hashed
+        ):
+            return self._immutable_response(path, scope)
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        response.headers["Cache-Control"] = REVALIDATE_CACHE_CONTROL
+        return response
+
+    def _immutable_response(self, path: Path, scope) -> Response:
+        headers = {
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+            "Vary": "Accept-Encoding",
+        }
+        media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        accepted = {
+            part.split(";")[0].strip()
+            for part in Headers(scope=scope).get("accept-encoding", "").split(",")
+        }
+        for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+            variant = path.with_name(path.name + suffix)
+            if encoding in accepted and variant.is_file():
+                headers["Content-Encoding"] = encoding
+                return FileResponse(variant, media_type=media_type, headers=headers)
+        return FileResponse(path, media_type=media_type, headers=headers)
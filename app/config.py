@@ -6,6 +6,30 @@ class Settings(BaseSettings):
     secret_key: str
     indicator_connected: bool = False
     debug: bool = False
+    document_cache_dir: str = "var/documents"
+    template_cache_dir: str = "var/templates"
+    template_precompile: bool = False
+    static_build_dir: str = "var/static"
+    compression_min_bytes: int = 1024
+    compression_level: int = 6
+    render_workers: int = 2
+    integrity_scan_interval_seconds: int = 0
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: float = 30.0
+    db_pool_recycle_seconds: int = 1800
+    db_pool_pre_ping: bool = False
+    db_pool_reset_on_return: str = "rollback"
+    db_statement_timeout_ms: int = 0
+    read_database_url: str | None = None
+    read_replica_max_lag_seconds: float = 10.0
+    ticket_partition_period: str = "year"
+    ticket_partitions_ahead: int = 1
+    archive_dir: str = "var/archive"
+    archive_after_days: int = 2557
+    archive_segment_rows: int = 50_000
+    audit_flush_seconds: float = 1.0
+    audit_batch_size: int = 500
 
     model_config = SettingsConfigDict(env_file=".env", env_prefix="")
 
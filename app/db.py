@@ -1,13 +1,215 @@
+import logging
+import threading
+import time
 from collections.abc import Generator
+from dataclasses import dataclass
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 
-from .config import settings
+from .config import Settings, settings
 
-engine = create_engine(settings.database_url, pool_pre_ping=True)
+logger = logging.getLogger(__name__)
+REPLICA_LAG_CHECK_SECONDS = 5.0
+# The last replayed commit only dates the lag while WAL is still waiting to
+# be replayed; once caught up, a quiet primary is not a lagging replica.
+REPLICA_LAG_SQL = """
+SELECT CASE
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a connection."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_seconds_total += waited
+                self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def recreate(self):
+        # Keep counters across dispose() so the admin view stays cumulative.
+        pool = super().recreate()
+        pool.checkouts = self.checkouts
+        pool.timeouts = self.timeouts
+        pool.wait_seconds_total = self.wait_seconds_total
+        pool.wait_seconds_max = self.wait_seconds_max
+        return pool
+
+
+@dataclass(frozen=True, slots=True)
+class PoolStatus:
+    pool_class: str
+    size: int | None
+    checked_out: int | None
+    checked_in: int | None
+    overflow: int | None
+    max_overflow: int | None
+    checkouts: int
+    timeouts: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+
+    @property
+    def wait_seconds_avg(self) -> float:
+        return self.wait_seconds_total / self.checkouts if self.checkouts else 0.0
+
+
+def engine_options(url: str, config: Settings = settings) -> dict:
+    """Engine keyword arguments for ``url`` built from the pool settings."""
+    parsed = make_url(url)
+    options: dict = {
+        "pool_pre_ping": config.db_pool_pre_ping,
+        "pool_reset_on_return": _reset_on_return(config.db_pool_reset_on_return),
+    }
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (
+        None,
+        "",
+        ":memory:",
+    ):
+        # In-memory SQLite keeps its single-connection default pool.
+        return options
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=config.db_pool_size,
+        max_overflow=config.db_max_overflow,
+        pool_timeout=config.db_pool_timeout_seconds,
+        pool_recycle=config.db_pool_recycle_seconds,
+    )
+    if config.db_statement_timeout_ms and parsed.get_backend_name() == "postgresql":
+        options["connect_args"] = {
+            "options": f"-c statement_timeout={config.db_statement_timeout_ms}"
+        }
+    return options
+
+
+def _reset_on_return(value: str | None) -> str | None:
+    if not value or value.lower() == "none":
+        return None
+    return value.lower()
+
+
+def pool_status(engine: Engine) -> PoolStatus:
+    pool = engine.pool
+    queue = isinstance(pool, QueuePool)
+    return PoolStatus(
+        pool_class=type(pool).__name__,
+        size=pool.size() if queue else None,
+        checked_out=pool.checkedout() if queue else None,
+        checked_in=pool.checkedin() if queue else None,
+        overflow=max(pool.overflow(), 0) if queue else None,
+        max_overflow=pool._max_overflow if queue else None,
+        checkouts=getattr(pool, "checkouts", 0),
+        timeouts=getattr(pool, "timeouts", 0),
+        wait_seconds_total=getattr(pool, "wait_seconds_total", 0.0),
+        wait_seconds_max=getattr(pool, "wait_seconds_max", 0.0),
+    )
+
+
+class ReadOnlySession(Session):
+    """Session for replica reads; refuses to flush pending changes."""
+
+    def flush(self, objects=None) -> None:
+        if self.new or self.dirty or self.deleted:
+            raise RuntimeError("Read-only session cannot write.")
+
+
+class ReplicaRouter:
+    """Hands out replica sessions while the replica is fresh enough.
+
+    Lag is sampled at most every ``check_seconds``; when the replica is
+    unreachable or further behind than ``max_lag_seconds`` reads go to the
+    primary instead.
+    """
+
+    def __init__(
+        self,
+        primary: sessionmaker,
+        replica: sessionmaker | None,
+        max_lag_seconds: float,
+        check_seconds: float = REPLICA_LAG_CHECK_SECONDS,
+    ) -> None:
+        self.primary = primary
+        self.replica = replica
+        self.max_lag_seconds = max_lag_seconds
+        self.check_seconds = check_seconds
+        self._checked_at = float("-inf")
+        self._healthy = False
+        self._lock = threading.Lock()
+
+    def session(self) -> Session:
+        if self.replica is not None and self.replica_healthy():
+            return self.replica()
+        return self.primary()
+
+    def replica_healthy(self) -> bool:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_seconds:
+            return self._healthy
+        with self._lock:
+            if now - self._checked_at >= self.check_seconds:
+                lag = self._replica_lag_seconds()
+                self._healthy = lag is not None and lag <= self.max_lag_seconds
+                self._checked_at = now
+        return self._healthy
+
+    def _replica_lag_seconds(self) -> float | None:
+        try:
+            with self.replica() as session:
+                if session.get_bind().dialect.name != "postgresql":
+                    session.execute(text("SELECT 1"))
+                    return 0.0
+                lag = session.execute(text(REPLICA_LAG_SQL)).scalar()
+                return float(lag or 0)
+        except Exception:
+            logger.warning("Read replica unavailable; using primary", exc_info=True)
+            return None
+
+
+engine = create_engine(settings.database_url, **engine_options(settings.database_url))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+read_engine = (
+    create_engine(
+        settings.read_database_url, **engine_options(settings.read_database_url)
+    )
+    if settings.read_database_url
+    else None
+)
+ReadSessionLocal = (
+    sessionmaker(
+        class_=ReadOnlySession, autocommit=False, autoflush=False, bind=read_engine
+    )
+    if read_engine is not None
+    else None
+)
+read_router = ReplicaRouter(
+    SessionLocal, ReadSessionLocal, settings.read_replica_max_lag_seconds
+)
+
 
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
@@ -15,3 +217,12 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+def get_read_db() -> Generator[Session, None, None]:
+    """Session for list, report and export pages; may read from the replica."""
+    db = read_router.session()
+    try:
+        yield db
+    finally:
+        db.close()
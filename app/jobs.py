@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import sys
+import urllib.request
+from datetime import date, datetime, time
+
+from sqlalchemy import select
+
+from .assets import HTMX_PATH, HTMX_SHA384, HTMX_URL
+from .db import SessionLocal, engine
+from .models import Ticket, TicketStatusEnum
+from .services.archive import archive_cutoff, archive_tickets, count_archivable
+from .services.credit import reconcile_balances
+from .services.integrity import run_integrity_scan
+from .services.lookups import rebuild_lookup_usage
+from .services.partitions import ensure_ticket_partitions
+from .services.price_lists import (
+    import_price_list,
+    invalidate_price_lists,
+    read_price_csv,
+)
+from .services.pricing import price_tickets
+
+REPRICE_BATCH_SIZE = 500
+
+
+def import_prices(path: str) -> int:
+    with open(path, newline="", encoding="utf-8-sig") as handle:
+        rows = read_price_csv(handle)
+    with SessionLocal() as session:
+        result = import_price_list(session, rows)
+        if result.errors:
+            session.rollback()
+            for error in result.errors:
+                print(error, file=sys.stderr)
+            return 1
+        session.commit()
+    invalidate_price_lists()
+    print(f"Imported prices: {result.created} created, {result.updated} updated")
+    return 0
+
+
+def reprice_open_tickets(dry_run: bool = False) -> int:
+    """Reprice every open ticket, in id-ordered batches.
+
+    Tickets take the price from the current price lists and product prices,
+    except those whose unit price the operator typed in: those keep it and
+    only the total is recomputed.
+    """
+    changed = 0
+    last_id = 0
+    with SessionLocal() as session:
+        while True:
+            tickets = (
+                session.execute(
+                    select(Ticket)
+                    .where(
+                        Ticket.status == TicketStatusEnum.OPEN.value,
+                        Ticket.product_id.is_not(None),
+                        Ticket.id > last_id,
+                    )
+                    .order_by(Ticket.id)
+                    .limit(REPRICE_BATCH_SIZE)
+                )
+                .scalars()
+                .all()
+            )
+            if not tickets:
+                break
+            last_id = tickets[-1].id
+            defaulted = [
+                ticket for ticket in tickets if not ticket.unit_price_overridden
+            ]
+            overridden = [ticket for ticket in tickets if ticket.unit_price_overridden]
+            quotes = [
+                *zip(defaulted, price_tickets(session, defaulted)),
+                *zip(
+                    overridden,
+                    price_tickets(session, overridden, keep_unit_price=True),
+                ),
+            ]
+            for ticket, priced in quotes:
+                if priced is None:
+                    continue
+                if (
+                    ticket.unit_price != priced.unit_price
+                    or ticket.total != priced.total
+                ):
+                    ticket.unit_price = priced.unit_price
+                    ticket.total = priced.total
+                    changed += 1
+            if dry_run:
+                session.rollback()
+            else:
+                session.commit()
+    return changed
+
+
+def reconcile_credit(fix: bool = False) -> int:
+    with SessionLocal() as session:
+        mismatches = reconcile_balances(session, fix=fix)
+        for mismatch in mismatches:
+            print(
+                f"{mismatch.account_code}: uninvoiced "
+                f"{mismatch.uninvoiced_balance} (expected "
+                f"{mismatch.expected_uninvoiced}), unpaid invoices "
+                f"{mismatch.unpaid_invoice_balance} (expected "
+                f"{mismatch.expected_unpaid_invoices})"
+            )
+        if fix:
+            session.commit()
+    return len(mismatches)
+
+
+def scan_integrity(full: bool = False) -> int | None:
+    with SessionLocal() as session:
+        result = run_integrity_scan(session, full=full)
+        session.commit()
+    return result.findings if result else None
+
+
+def rebuild_usage() -> int:
+    with SessionLocal() as session:
+        rows = rebuild_lookup_usage(session)
+        session.commit()
+    return rows
+
+
+def archive_closed_tickets(before: date | None = None, dry_run: bool = False) -> int:
+    cutoff = datetime.combine(before, time.min) if before else archive_cutoff()
+    with SessionLocal() as session:
+        if dry_run:
+            return count_archivable(session, cutoff)
+        result = archive_tickets(session, cutoff=cutoff)
+    for segment in result.segments:
+        print(f"Wrote {segment}")
+    return result.tickets
+
+
+def create_ticket_partitions() -> int:
+    with engine.begin() as conn:
+        created = ensure_ticket_partitions(conn)
+    for name in created:
+        print(f"Created partition {name}")
+    return len(created)
+
+
+def vendor_htmx() -> int:
+    """Download the pinned htmx build into app/static, checking its hash.
+
+    Only needed when bumping ``HTMX_VERSION``; the file is committed.
+    """
+    with urllib.request.urlopen(HTMX_URL, timeout=30) as response:
+        data = response.read()
+    digest = base64.b64encode(hashlib.sha384(data).digest()).decode()
+    if digest != HTMX_SHA384:
+        print(
+            f"{HTMX_URL} has sha384-{digest}, expected sha384-{HTMX_SHA384}; "
+            "nothing written",
+            file=sys.stderr,
+        )
+        return 1
+    HTMX_PATH.parent.mkdir(parents=True, exist_ok=True)
+    HTMX_PATH.write_bytes(data)
+    print(f"Wrote {HTMX_PATH} ({len(data)} bytes)")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.jobs")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser(
+        "import-prices", help="Import a customer price list CSV."
+    )
+    import_parser.add_argument("path")
+
+    reprice_parser = commands.add_parser(
+        "reprice-open-tickets",
+        help=(
+            "Reprice open tickets from the current price lists; prices "
+            "typed in by an operator are kept and only the total is recomputed."
+        ),
+    )
+    reprice_parser.add_argument("--dry-run", action="store_true")
+
+    reconcile_parser = commands.add_parser(
+        "reconcile-credit", help="Check customer balances against tickets/invoices."
+    )
+    reconcile_parser.add_argument("--fix", action="store_true")
+
+    scan_parser = commands.add_parser(
+        "scan-integrity", help="Refresh stored data integrity findings."
+    )
+    scan_parser.add_argument("--full", action="store_true")
+
+    commands.add_parser(
+        "rebuild-lookup-usage", help="Recount lookup references from scratch."
+    )
+
+    archive_parser = commands.add_parser(
+        "archive-tickets",
+        help="Move old closed tickets into compressed archive segments.",
+    )
+    archive_parser.add_argument(
+        "--before",
+        type=date.fromisoformat,
+        help="Archive tickets dated before this day (default: ARCHIVE_AFTER_DAYS ago).",
+    )
+    archive_parser.add_argument("--dry-run", action="store_true")
+
+    commands.add_parser(
+        "create-ticket-partitions",
+        help="Create upcoming ticket partitions (PostgreSQL).",
+    )
+
+    commands.add_parser(
+        "vendor-htmx", help="Download the pinned htmx release into app/static and check its hash."
+    )
+
+    args = parser.parse_args(argv)
+    if args.command == "import-prices":
+        return import_prices(args.path)
+    if args.command == "reprice-open-tickets":
+        changed = reprice_open_tickets(dry_run=args.dry_run)
+        label = "Would reprice" if args.dry_run else "Repriced"
+        print(f"{label} open tickets: {changed}")
+    if args.command == "reconcile-credit":
+        mismatched = reconcile_credit(fix=args.fix)
+        label = "Fixed" if args.fix else "Mismatched"
+        print(f"{label} customer balances: {mismatched}")
+        return 1 if mismatched and not args.fix else 0
+    if args.command == "scan-integrity":
+        findings = scan_integrity(full=args.full)
+        if findings is None:
+            print("Integrity scan already running; skipped", file=sys.stderr)
+            return 1
+        print(f"Integrity findings: {findings}")
+    if args.command == "rebuild-lookup-usage":
+        print(f"Lookup usage rows: {rebuild_usage()}")
+    if args.command == "archive-tickets":
+        archived = archive_closed_tickets(before=args.before, dry_run=args.dry_run)
+        label = "Would archive" if args.dry_run else "Archived"
+        print(f"{label} tickets: {archived}")
+    if args.command == "create-ticket-partitions":
+        print(f"Ticket partitions created: {create_ticket_partitions()}")
+    if args.command == "vendor-htmx":
+        return vendor_htmx()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,18 +1,53 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
+from fastapi.responses import HTMLResponse, PlainTextResponse
 
+from .assets import AssetStaticFiles, load_assets
+from .config import settings
+from .db import SessionLocal, engine
 from .routes import api_router
 from .routers.lookups import router as lookups_router
+from .services.audit import audit_writer
+from .services.compression import CompressionMiddleware
+from .services.integrity import start_integrity_scheduler
+from .services.metrics import MetricsMiddleware, render_metrics
+from .services.partitions import ensure_ticket_partitions
+from .services.query_budget import QueryBudgetMiddleware
+from .services.render_pool import shutdown_render_pool
+from .templating import precompile_templates, templates
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.template_precompile:
+        precompile_templates()
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            ensure_ticket_partitions(conn)
+    if settings.audit_flush_seconds > 0:
+        audit_writer.start(settings.audit_flush_seconds, settings.audit_batch_size)
+    stop_scanner = None
+    if settings.integrity_scan_interval_seconds > 0:
+        stop_scanner = start_integrity_scheduler(
+            SessionLocal, settings.integrity_scan_interval_seconds
+        )
+    yield
+    if stop_scanner is not None:
+        stop_scanner.set()
+    shutdown_render_pool()
+    audit_writer.stop()
+
 
-app = FastAPI(title="weighbridge_web")
+app = FastAPI(title="weighbridge_web", lifespan=lifespan)
+app.add_middleware(QueryBudgetMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(CompressionMiddleware)
 
 app.include_router(api_router)
 app.include_router(lookups_router)
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
-
-templates = Jinja2Templates(directory="app/templates")
+load_assets()
+app.mount("/static", AssetStaticFiles(), name="static")
 
 
 @app.get("/health", tags=["health"])
@@ -20,6 +55,13 @@ def health_check() -> dict:
     return {"status": "ok"}
 
 
+@app.get("/metrics", tags=["health"], response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 @app.get("/", response_class=HTMLResponse)
 def index(request: Request) -> HTMLResponse:
     return templates.TemplateResponse(request, "index.html", {"request": request})
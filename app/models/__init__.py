@@ -1,10 +1,15 @@
+from .audit import AuditEntry
 from .base import Base
 from .customer import Customer
+from .customer_price import CustomerPrice
+from .customer_search_term import CustomerSearchTerm
 from .invoice import Invoice
 from .invoice_line import InvoiceLine
 from .invoice_sequence import InvoiceSequence
 from .invoice_void import InvoiceVoid
+from .integrity import IntegrityFinding, IntegrityScanState
 from .item import Item
+from .lookup_usage import LookupUsageCount
 from .lookups import Container, Destination, Driver, Haulier
 from .lookups_misc import (
     Area,
@@ -36,13 +41,19 @@ from .vehicle import Vehicle
 from .vehicle_tare import VehicleTare
 
 __all__ = [
+    "AuditEntry",
     "Base",
     "Customer",
+    "CustomerPrice",
+    "CustomerSearchTerm",
     "Invoice",
     "InvoiceLine",
     "InvoiceSequence",
     "InvoiceVoid",
+    "IntegrityFinding",
+    "IntegrityScanState",
     "Item",
+    "LookupUsageCount",
     "Area",
     "Container",
     "Contractor",
@@ -1,5 +1,6 @@
 from datetime import datetime, timezone
 
+from sqlalchemy import event
 from sqlalchemy.orm import DeclarativeBase
 
 
@@ -9,3 +10,18 @@ def utcnow() -> datetime:
 
 class Base(DeclarativeBase):
     pass
+
+
+def _ignore_set(target, value, oldvalue, initiator) -> None:
+    pass
+
+
+def track_previous_values(*attributes) -> None:
+    """Load an attribute's old value before it is overwritten.
+
+    Flush hooks read the replaced value from the attribute history, which
+    is empty when a commit had expired the attribute. ``active_history``
+    makes the assignment load it first.
+    """
+    for attribute in attributes:
+        event.listen(attribute, "set", _ignore_set, active_history=True)
@@ -2,7 +2,7 @@ from datetime import datetime
 
 from decimal import Decimal
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, Numeric, String
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, Numeric, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .base import Base, utcnow
@@ -10,6 +10,7 @@ from .base import Base, utcnow
 
 class Customer(Base):
     __tablename__ = "customers"
+    __table_args__ = (Index("ix_customers_name_id", "name", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     account_code: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
@@ -27,6 +28,12 @@ class Customer(Base):
     )
     payment_terms: Mapped[str | None] = mapped_column(String(100))
     credit_limit: Mapped[Decimal | None] = mapped_column(Numeric(12, 2))
+    uninvoiced_balance: Mapped[Decimal] = mapped_column(
+        Numeric(12, 2), default=Decimal("0.00"), server_default="0", nullable=False
+    )
+    unpaid_invoice_balance: Mapped[Decimal] = mapped_column(
+        Numeric(12, 2), default=Decimal("0.00"), server_default="0", nullable=False
+    )
     on_stop: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     cash_account: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     do_not_invoice: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
@@ -0,0 +1,22 @@
+from sqlalchemy import ForeignKey, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class CustomerSearchTerm(Base):
+    __tablename__ = "customer_search_terms"
+    # Pattern ops let Postgres serve ``LIKE 'word%'`` from the index under
+    # any collation.
+    __table_args__ = (
+        Index(
+            "ix_customer_search_terms_term",
+            "term",
+            postgresql_ops={"term": "varchar_pattern_ops"},
+        ),
+    )
+
+    customer_id: Mapped[int] = mapped_column(
+        ForeignKey("customers.id", ondelete="CASCADE"), primary_key=True
+    )
+    term: Mapped[str] = mapped_column(String(100), primary_key=True)
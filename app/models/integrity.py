@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base, utcnow
+
+
+class IntegrityFinding(Base):
+    __tablename__ = "integrity_findings"
+    __table_args__ = (
+        Index("ix_integrity_findings_ticket_id", "ticket_id"),
+        Index("ix_integrity_findings_invoice_id", "invoice_id"),
+        Index("ix_integrity_findings_issue_code", "issue_code"),
+        Index("ix_integrity_findings_occurred_at", "occurred_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    issue_code: Mapped[str] = mapped_column(String(50), nullable=False)
+    ticket_id: Mapped[int | None] = mapped_column(
+        ForeignKey("tickets.id", ondelete="CASCADE")
+    )
+    invoice_id: Mapped[int | None] = mapped_column(
+        ForeignKey("invoices.id", ondelete="CASCADE")
+    )
+    reference: Mapped[str | None] = mapped_column(String(50))
+    detail: Mapped[str | None] = mapped_column(String(255))
+    occurred_at: Mapped[datetime | None] = mapped_column(DateTime)
+    found_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
+
+
+class IntegrityScanState(Base):
+    __tablename__ = "integrity_scan_state"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    watermark: Mapped[datetime | None] = mapped_column(DateTime)
+    last_run_at: Mapped[datetime | None] = mapped_column(DateTime)
+    last_findings: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
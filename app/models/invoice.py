@@ -2,9 +2,9 @@ from datetime import date, datetime
 from decimal import Decimal
 
 from sqlalchemy import Date, DateTime, ForeignKey, Integer, Numeric, String
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from .base import Base
+from .base import Base, utcnow
 
 
 class Invoice(Base):
@@ -22,3 +22,13 @@ class Invoice(Base):
     net_total: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
     vat_total: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
     gross_total: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
+    updated_at: Mapped[datetime | None] = mapped_column(
+        DateTime, default=utcnow, onupdate=utcnow
+    )
+    customer: Mapped["Customer"] = relationship("Customer")
+    lines: Mapped[list["InvoiceLine"]] = relationship(
+        "InvoiceLine", order_by="InvoiceLine.id", viewonly=True
+    )
+    tickets: Mapped[list["Ticket"]] = relationship(
+        "Ticket", order_by="Ticket.datetime", viewonly=True
+    )
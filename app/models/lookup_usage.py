@@ -0,0 +1,17 @@
+from sqlalchemy import Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class LookupUsageCount(Base):
+    """How many rows of ``source`` reference lookup row ``lookup_id``."""
+
+    __tablename__ = "lookup_usage"
+
+    lookup: Mapped[str] = mapped_column(String(50), primary_key=True)
+    lookup_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    source: Mapped[str] = mapped_column(String(50), primary_key=True)
+    usage_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
@@ -11,6 +11,7 @@ from sqlalchemy import (
     Integer,
     Numeric,
     String,
+    false,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -48,6 +49,8 @@ class Ticket(Base):
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # Unique per partition only once Postgres partitions tickets; see
+    # alembic/env.py.
     ticket_no: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
     updated_at: Mapped[datetime] = mapped_column(
@@ -91,12 +94,22 @@ class Ticket(Base):
     qty: Mapped[float | None] = mapped_column(Numeric(12, 3))
     unit_id: Mapped[int | None] = mapped_column(Integer)
     unit_price: Mapped[Decimal | None] = mapped_column(Numeric(12, 2))
+    # Set when the operator typed a price other than the default, so
+    # repricing leaves it alone.
+    unit_price_overridden: Mapped[bool] = mapped_column(
+        Boolean, default=False, server_default=false(), nullable=False
+    )
     total: Mapped[Decimal | None] = mapped_column(Numeric(12, 2))
     dont_invoice: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     paid: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     payment_method_id: Mapped[int | None] = mapped_column(Integer)
+    customer: Mapped["Customer | None"] = relationship("Customer")
+    vehicle: Mapped["Vehicle | None"] = relationship("Vehicle")
     product: Mapped["Product | None"] = relationship("Product")
     haulier: Mapped["Haulier | None"] = relationship("Haulier")
     driver: Mapped["Driver | None"] = relationship("Driver")
     container: Mapped["Container | None"] = relationship("Container")
     destination: Mapped["Destination | None"] = relationship("Destination")
+    waste_code: Mapped["WasteCode | None"] = relationship("WasteCode")
+    waste_producer: Mapped["WasteProducer | None"] = relationship("WasteProducer")
+    licence: Mapped["Licence | None"] = relationship("Licence")
@@ -0,0 +1,144 @@
+import hashlib
+import os
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass
+from email.utils import formatdate
+from pathlib import Path
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from .config import settings
+from .templating import render_version
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+_CHUNK_SIZE = 64 * 1024
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    # If-None-Match uses weak comparison.
+    candidates = {value.strip().removeprefix("W/") for value in header.split(",")}
+    return etag.removeprefix("W/") in candidates or "*" in candidates
+
+
+@dataclass(frozen=True)
+class PageValidators:
+    etag: str
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {"ETag": self.etag, "Cache-Control": "private, no-cache"}
+
+
+def page_validators(request: Request, *versions: object) -> PageValidators:
+    """ETag for an HTML page built from database rows.
+
+    ``versions`` must change whenever anything shown on the page does, which
+    usually means the ``updated_at`` of each row involved. The templates and
+    the query string are folded in, so a deploy or a flash flag such as
+    ``?saved=1`` gives a new ETag.
+
+    There is no Last-Modified: a delete or a deploy changes the page without
+    moving any timestamp forward, so only the ETag is a safe validator.
+    """
+    digest = hashlib.sha256()
+    for part in (render_version(), request.url.path, request.url.query, *versions):
+        digest.update(repr(part).encode("utf-8") + b"\0")
+    return PageValidators(etag=f'W/"{digest.hexdigest()[:32]}"')
+
+
+def not_modified(request: Request, validators: PageValidators) -> Response | None:
+    """A 304 when the client's copy is current, otherwise None.
+
+    Always None with DEBUG on, so template edits show up on reload.
+    """
+    if settings.debug or not etag_matches(request, validators.etag):
+        return None
+    return Response(status_code=304, headers=validators.headers)
+
+
+def with_validators(response: Response, validators: PageValidators) -> Response:
+    if response.status_code == 200 and not settings.debug:
+        response.headers.update(validators.headers)
+    return response
+
+
+def cached_file_response(
+    request: Request,
+    path: Path,
+    *,
+    etag: str,
+    media_type: str,
+    filename: str | None = None,
+    cache_control: str = "private, no-cache",
+) -> Response:
+    """Serve a file with ETag revalidation and single byte-range support."""
+    stat = path.stat()
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+    }
+    if filename:
+        headers["Content-Disposition"] = f'inline; filename="{filename}"'
+
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range == etag):
+        byte_range = _parse_range(range_header, stat.st_size)
+        if byte_range is None:
+            return Response(
+                status_code=416,
+                headers={**headers, "Content-Range": f"bytes */{stat.st_size}"},
+            )
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(
+            _iter_file(path, start, end),
+            status_code=206,
+            media_type=media_type,
+            headers=headers,
+        )
+
+    return FileResponse(path, media_type=media_type, headers=headers, stat_result=stat)
+
+
+def _parse_range(header: str, size: int) -> tuple[int, int] | None:
+    # Multi-range requests are rare for documents; only one range is served.
+    match = _RANGE_RE.match(header.strip())
+    if not match or size == 0:
+        return None
+    start_raw, end_raw = match.groups()
+    if not start_raw and not end_raw:
+        return None
+    if not start_raw:
+        length = int(end_raw)
+        if length == 0:
+            return None
+        return max(size - length, 0), size - 1
+    start = int(start_raw)
+    end = int(end_raw) if end_raw else size - 1
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def _iter_file(path: Path, start: int, end: int) -> Iterator[bytes]:
+    remaining = end - start + 1
+    with open(path, "rb") as handle:
+        handle.seek(start, os.SEEK_SET)
+        while remaining > 0:
+            chunk = handle.read(min(_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
@@ -1,17 +1,24 @@
-import re
 from urllib.parse import urlencode
 
 from fastapi import APIRouter, Depends, Query, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy import func, select, true
 from sqlalchemy.orm import Session
 
 from ..db import get_db
-from ..models import Container, Destination, Driver, Haulier, Ticket
+from ..services.lookups import (
+    LOOKUP_SPECS,
+    LOOKUPS,
+    LookupSpec,
+    invalidate_lookups,
+    lookup_rows,
+    lookup_usage_totals,
+    parse_lookup_form,
+    set_active,
+    usage_error,
+)
+from ..templating import templates
 
 router = APIRouter(prefix="/lookups")
-templates = Jinja2Templates(directory="app/templates")
 
 
 def _lookup_redirect_url(request: Request, base_path: str) -> str:
@@ -42,31 +49,46 @@ def _resolve_hide_inactive(request: Request, hide_inactive: int | None) -> int:
     return 0 if _is_truthy(legacy_show) else 1
 
 
+def _not_found(
+    request: Request, spec: LookupSpec | None, slug: str, item_id: int | None = None
+) -> HTMLResponse:
+    return templates.TemplateResponse(request,
+        "lookups/not_found.html",
+        {
+            "request": request,
+            "entity": spec.singular if spec else "Lookup",
+            "entity_id": item_id if spec else slug,
+            "base_path": spec.base_path if spec else None,
+        },
+        status_code=404,
+    )
+
+
 def _render_lookup_list(
     request: Request,
     db: Session,
-    model,
-    entity_plural: str,
-    entity_singular: str,
-    base_path: str,
+    spec: LookupSpec,
     q: str | None,
     hide_inactive: int,
     error: str | None = None,
+    sort: str | None = None,
 ) -> HTMLResponse:
-    query = select(model)
-    if hide_inactive:
-        query = query.where(model.is_active == true())
-    if q:
-        query = query.where(func.lower(model.name).contains(func.lower(q)))
-    items = db.execute(query.order_by(model.name.asc())).scalars().all()
-    return templates.TemplateResponse(request, 
+    items = lookup_rows(db, spec, q=q, hide_inactive=bool(hide_inactive))
+    usage = lookup_usage_totals(db, spec)
+    if sort == "usage":
+        items.sort(key=lambda item: usage.get(item.id, 0), reverse=True)
+    return templates.TemplateResponse(request,
         "lookups/list.html",
         {
             "request": request,
-            "entity_plural": entity_plural,
-            "entity_singular": entity_singular,
-            "base_path": base_path,
+            "entity_plural": spec.plural,
+            "entity_singular": spec.singular,
+            "base_path": spec.base_path,
+            "fields": spec.fields,
+            "lookups": LOOKUP_SPECS,
             "items": items,
+            "usage": usage,
+            "sort": sort or "",
             "q": q or "",
             "hide_inactive": bool(hide_inactive),
             "saved": request.query_params.get("saved") == "1",
@@ -75,947 +97,200 @@ def _render_lookup_list(
     )
 
 
-@router.get("/hauliers", response_class=HTMLResponse)
-def hauliers_list(
+def _render_lookup_form(
     request: Request,
-    q: str | None = None,
-    hide_inactive: int | None = Query(None),
-    db: Session = Depends(get_db),
-) -> HTMLResponse:
-    resolved_hide = _resolve_hide_inactive(request, hide_inactive)
-    return _render_lookup_list(
-        request,
-        db,
-        Haulier,
-        "Hauliers",
-        "Haulier",
-        "/lookups/hauliers",
-        q,
-        resolved_hide,
-    )
-
-
-@router.get("/hauliers/new", response_class=HTMLResponse)
-def hauliers_new(request: Request) -> HTMLResponse:
-    return templates.TemplateResponse(request, 
-        "lookups/form.html",
-        {
-            "request": request,
-            "entity_plural": "Hauliers",
-            "entity_singular": "Haulier",
-            "base_path": "/lookups/hauliers",
-            "mode": "new",
-            "item": None,
-            "prefill_name": "",
-            "error": None,
-        },
-    )
-
-
-@router.post("/hauliers/new", response_class=HTMLResponse)
-async def hauliers_create(
-    request: Request, db: Session = Depends(get_db)
-) -> HTMLResponse:
-    form = await request.form()
-    raw_name = str(form.get("name", ""))
-    name = re.sub(r"\s+", " ", raw_name.strip())
-    error = None
-    if not name:
-        error = "Name is required."
-    elif len(name) > 120:
-        error = "Name must be 120 characters or fewer."
-    else:
-        existing = db.execute(
-            select(Haulier).where(func.lower(Haulier.name) == func.lower(name))
-        ).scalar_one_or_none()
-        if existing:
-            error = "Name already exists."
-
-    if error:
-        return templates.TemplateResponse(request, 
-            "lookups/form.html",
-            {
-                "request": request,
-                "entity_plural": "Hauliers",
-                "entity_singular": "Haulier",
-                "base_path": "/lookups/hauliers",
-                "mode": "new",
-                "item": None,
-                "prefill_name": name,
-                "error": error,
-            },
-            status_code=400,
-        )
-
-    haulier = Haulier(name=name, is_active=True)
-    db.add(haulier)
-    db.commit()
-    return RedirectResponse(
-        url=_lookup_redirect_url(request, "/lookups/hauliers"),
-        status_code=303,
-    )
-
-
-@router.get("/hauliers/{haulier_id}/edit", response_class=HTMLResponse)
-def hauliers_edit(
-    haulier_id: int, request: Request, db: Session = Depends(get_db)
+    spec: LookupSpec,
+    mode: str,
+    item=None,
+    values: dict | None = None,
+    error: str | None = None,
 ) -> HTMLResponse:
-    haulier = db.get(Haulier, haulier_id)
-    if not haulier:
-        return templates.TemplateResponse(request, 
-            "lookups/not_found.html",
-            {
-                "request": request,
-                "entity": "Haulier",
-                "entity_id": haulier_id,
-                "base_path": "/lookups/hauliers",
-            },
-            status_code=404,
-        )
-    return templates.TemplateResponse(request, 
+    if values is None:
+        values = {
+            lookup_field.name: getattr(item, lookup_field.name) if item else ""
+            for lookup_field in spec.fields
+        }
+    return templates.TemplateResponse(request,
         "lookups/form.html",
         {
             "request": request,
-            "entity_plural": "Hauliers",
-            "entity_singular": "Haulier",
-            "base_path": "/lookups/hauliers",
-            "mode": "edit",
-            "item": haulier,
-            "prefill_name": None,
-            "error": None,
+            "entity_plural": spec.plural,
+            "entity_singular": spec.singular,
+            "base_path": spec.base_path,
+            "fields": spec.fields,
+            "mode": mode,
+            "item": item,
+            "values": values,
+            "error": error,
         },
+        status_code=400 if error else 200,
     )
 
 
-@router.post("/hauliers/{haulier_id}/edit", response_class=HTMLResponse)
-async def hauliers_update(
-    haulier_id: int, request: Request, db: Session = Depends(get_db)
-) -> HTMLResponse:
-    haulier = db.get(Haulier, haulier_id)
-    if not haulier:
-        return templates.TemplateResponse(request, 
-            "lookups/not_found.html",
-            {
-                "request": request,
-                "entity": "Haulier",
-                "entity_id": haulier_id,
-                "base_path": "/lookups/hauliers",
-            },
-            status_code=404,
-        )
-    form = await request.form()
-    raw_name = str(form.get("name", ""))
-    name = re.sub(r"\s+", " ", raw_name.strip())
-    error = None
-    if not name:
-        error = "Name is required."
-    elif len(name) > 120:
-        error = "Name must be 120 characters or fewer."
-    else:
-        existing = db.execute(
-            select(Haulier).where(
-                func.lower(Haulier.name) == func.lower(name),
-                Haulier.id != haulier.id,
-            )
-        ).scalar_one_or_none()
-        if existing:
-            error = "Name already exists."
-
-    if error:
-        return templates.TemplateResponse(request, 
-            "lookups/form.html",
-            {
-                "request": request,
-                "entity_plural": "Hauliers",
-                "entity_singular": "Haulier",
-                "base_path": "/lookups/hauliers",
-                "mode": "edit",
-                "item": haulier,
-                "prefill_name": name,
-                "error": error,
-            },
-            status_code=400,
-        )
-
-    haulier.name = name
-    db.commit()
-    return RedirectResponse(
-        url=_lookup_redirect_url(request, "/lookups/hauliers"),
-        status_code=303,
-    )
-
-
-@router.post("/hauliers/{haulier_id}/deactivate", response_class=HTMLResponse)
-def hauliers_deactivate(
-    haulier_id: int, request: Request, db: Session = Depends(get_db)
-) -> HTMLResponse:
-    haulier = db.get(Haulier, haulier_id)
-    if not haulier:
-        return templates.TemplateResponse(request, 
-            "lookups/not_found.html",
-            {
-                "request": request,
-                "entity": "Haulier",
-                "entity_id": haulier_id,
-                "base_path": "/lookups/hauliers",
-            },
-            status_code=404,
-        )
-    in_use = db.execute(
-        select(func.count(Ticket.id)).where(Ticket.haulier_id == haulier.id)
-    ).scalar()
-    if in_use and in_use > 0:
-        resolved_hide = _resolve_hide_inactive(
-            request, None
-        )
-        return _render_lookup_list(
-            request,
-            db,
-            Haulier,
-            "Hauliers",
-            "Haulier",
-            "/lookups/hauliers",
-            request.query_params.get("q"),
-            resolved_hide,
-            "Cannot deactivate: in use by tickets.",
-        )
-
-    haulier.is_active = False
-    db.commit()
-    return RedirectResponse(
-        url=_lookup_redirect_url(request, "/lookups/hauliers"),
-        status_code=303,
-    )
-
-
-@router.post("/hauliers/{haulier_id}/reactivate", response_class=HTMLResponse)
-def hauliers_reactivate(
-    haulier_id: int, request: Request, db: Session = Depends(get_db)
-) -> HTMLResponse:
-    haulier = db.get(Haulier, haulier_id)
-    if not haulier:
-        return templates.TemplateResponse(request, 
-            "lookups/not_found.html",
-            {
-                "request": request,
-                "entity": "Haulier",
-                "entity_id": haulier_id,
-                "base_path": "/lookups/hauliers",
-            },
-            status_code=404,
-        )
-    haulier.is_active = True
-    db.commit()
-    return RedirectResponse(
-        url=_lookup_redirect_url(request, "/lookups/hauliers"),
-        status_code=303,
-    )
+@router.get("", response_class=HTMLResponse)
+def lookups_index() -> RedirectResponse:
+    return RedirectResponse(url=LOOKUP_SPECS[0].base_path, status_code=303)
 
 
-@router.get("/drivers", response_class=HTMLResponse)
-def drivers_list(
+@router.get("/{slug}", response_class=HTMLResponse)
+def lookups_list(
+    slug: str,
     request: Request,
     q: str | None = None,
     hide_inactive: int | None = Query(None),
+    sort: str | None = None,
     db: Session = Depends(get_db),
 ) -> HTMLResponse:
+    spec = LOOKUPS.get(slug)
+    if spec is None:
+        return _not_found(request, None, slug)
     resolved_hide = _resolve_hide_inactive(request, hide_inactive)
-    return _render_lookup_list(
-        request,
-        db,
-        Driver,
-        "Drivers",
-        "Driver",
-        "/lookups/drivers",
-        q,
-        resolved_hide,
-    )
+    return _render_lookup_list(request, db, spec, q, resolved_hide, sort=sort)
 
 
-@router.get("/drivers/new", response_class=HTMLResponse)
-def drivers_new(request: Request) -> HTMLResponse:
-    return templates.TemplateResponse(request, 
-        "lookups/form.html",
-        {
-            "request": request,
-            "entity_plural": "Drivers",
-            "entity_singular": "Driver",
-            "base_path": "/lookups/drivers",
-            "mode": "new",
-            "item": None,
-            "prefill_name": "",
-            "error": None,
-        },
-    )
+@router.get("/{slug}/new", response_class=HTMLResponse)
+def lookups_new(slug: str, request: Request) -> HTMLResponse:
+    spec = LOOKUPS.get(slug)
+    if spec is None:
+        return _not_found(request, None, slug)
+    return _render_lookup_form(request, spec, "new")
 
 
-@router.post("/drivers/new", response_class=HTMLResponse)
-async def drivers_create(
-    request: Request, db: Session = Depends(get_db)
+@router.post("/{slug}/new", response_class=HTMLResponse)
+async def lookups_create(
+    slug: str, request: Request, db: Session = Depends(get_db)
 ) -> HTMLResponse:
+    spec = LOOKUPS.get(slug)
+    if spec is None:
+        return _not_found(request, None, slug)
     form = await request.form()
-    raw_name = str(form.get("name", ""))
-    name = re.sub(r"\s+", " ", raw_name.strip())
-    error = None
-    if not name:
-        error = "Name is required."
-    elif len(name) > 120:
-        error = "Name must be 120 characters or fewer."
-    else:
-        existing = db.execute(
-            select(Driver).where(func.lower(Driver.name) == func.lower(name))
-        ).scalar_one_or_none()
-        if existing:
-            error = "Name already exists."
-
+    values, error = parse_lookup_form(db, spec, form)
     if error:
-        return templates.TemplateResponse(request, 
-            "lookups/form.html",
-            {
-                "request": request,
-                "entity_plural": "Drivers",
-                "entity_singular": "Driver",
-                "base_path": "/lookups/drivers",
-                "mode": "new",
-                "item": None,
-                "prefill_name": name,
-                "error": error,
-            },
-            status_code=400,
-        )
+        return _render_lookup_form(request, spec, "new", values=values, error=error)
 
-    driver = Driver(name=name, is_active=True)
-    db.add(driver)
+    db.add(spec.model(**values, is_active=True))
     db.commit()
+    invalidate_lookups(spec)
     return RedirectResponse(
-        url=_lookup_redirect_url(request, "/lookups/drivers"),
+        url=_lookup_redirect_url(request, spec.base_path),
         status_code=303,
     )
 
 
-@router.get("/drivers/{driver_id}/edit", response_class=HTMLResponse)
-def drivers_edit(
-    driver_id: int, request: Request, db: Session = Depends(get_db)
-) -> HTMLResponse:
-    driver = db.get(Driver, driver_id)
-    if not driver:
-        return templates.TemplateResponse(request, 
-            "lookups/not_found.html",
-            {
-                "request": request,
-                "entity": "Driver",
-                "entity_id": driver_id,
-                "base_path": "/lookups/drivers",
-            },
-            status_code=404,
-        )
-    return templates.TemplateResponse(request, 
-        "lookups/form.html",
-        {
-            "request": request,
-            "entity_plural": "Drivers",
-            "entity_singular": "Driver",
-            "base_path": "/lookups/drivers",
-            "mode": "edit",
-            "item": driver,
-            "prefill_name": None,
-            "error": None,
-        },
-    )
-
-
-@router.post("/drivers/{driver_id}/edit", response_class=HTMLResponse)
-async def drivers_update(
-    driver_id: int, request: Request, db: Session = Depends(get_db)
+@router.post("/{slug}/bulk", response_class=HTMLResponse)
+async def lookups_bulk(
+    slug: str, request: Request, db: Session = Depends(get_db)
 ) -> HTMLResponse:
-    driver = db.get(Driver, driver_id)
-    if not driver:
-        return templates.TemplateResponse(request, 
-            "lookups/not_found.html",
-            {
-                "request": request,
-                "entity": "Driver",
-                "entity_id": driver_id,
-                "base_path": "/lookups/drivers",
-            },
-            status_code=404,
-        )
+    spec = LOOKUPS.get(slug)
+    if spec is None:
+        return _not_found(request, None, slug)
     form = await request.form()
-    raw_name = str(form.get("name", ""))
-    name = re.sub(r"\s+", " ", raw_name.strip())
-    error = None
-    if not name:
-        error = "Name is required."
-    elif len(name) > 120:
-        error = "Name must be 120 characters or fewer."
-    else:
-        existing = db.execute(
-            select(Driver).where(
-                func.lower(Driver.name) == func.lower(name),
-                Driver.id != driver.id,
-            )
-        ).scalar_one_or_none()
-        if existing:
-            error = "Name already exists."
-
-    if error:
-        return templates.TemplateResponse(request, 
-            "lookups/form.html",
-            {
-                "request": request,
-                "entity_plural": "Drivers",
-                "entity_singular": "Driver",
-                "base_path": "/lookups/drivers",
-                "mode": "edit",
-                "item": driver,
-                "prefill_name": name,
-                "error": error,
-            },
-            status_code=400,
-        )
-
-    driver.name = name
-    db.commit()
-    return RedirectResponse(
-        url=_lookup_redirect_url(request, "/lookups/drivers"),
-        status_code=303,
-    )
-
-
-@router.post("/drivers/{driver_id}/deactivate", response_class=HTMLResponse)
-def drivers_deactivate(
-    driver_id: int, request: Request, db: Session = Depends(get_db)
-) -> HTMLResponse:
-    driver = db.get(Driver, driver_id)
-    if not driver:
-        return templates.TemplateResponse(request, 
-            "lookups/not_found.html",
-            {
-                "request": request,
-                "entity": "Driver",
-                "entity_id": driver_id,
-                "base_path": "/lookups/drivers",
-            },
-            status_code=404,
-        )
-    in_use = db.execute(
-        select(func.count(Ticket.id)).where(Ticket.driver_id == driver.id)
-    ).scalar()
-    if in_use and in_use > 0:
-        resolved_hide = _resolve_hide_inactive(request, None)
+    action = form.get("action")
+    ids = [int(value) for value in form.getlist("ids") if str(value).isdigit()]
+    if action not in {"activate", "deactivate"} or not ids:
         return _render_lookup_list(
             request,
             db,
-            Driver,
-            "Drivers",
-            "Driver",
-            "/lookups/drivers",
+            spec,
             request.query_params.get("q"),
-            resolved_hide,
-            "Cannot deactivate: in use by tickets.",
-        )
-
-    driver.is_active = False
-    db.commit()
-    return RedirectResponse(
-        url=_lookup_redirect_url(request, "/lookups/drivers"),
-        status_code=303,
-    )
-
-
-@router.post("/drivers/{driver_id}/reactivate", response_class=HTMLResponse)
-def drivers_reactivate(
-    driver_id: int, request: Request, db: Session = Depends(get_db)
-) -> HTMLResponse:
-    driver = db.get(Driver, driver_id)
-    if not driver:
-        return templates.TemplateResponse(request, 
-            "lookups/not_found.html",
-            {
-                "request": request,
-                "entity": "Driver",
-                "entity_id": driver_id,
-                "base_path": "/lookups/drivers",
-            },
-            status_code=404,
-        )
-    driver.is_active = True
-    db.commit()
-    return RedirectResponse(
-        url=_lookup_redirect_url(request, "/lookups/drivers"),
-        status_code=303,
-    )
-
-
-@router.get("/containers", response_class=HTMLResponse)
-def containers_list(
-    request: Request,
-    q: str | None = None,
-    hide_inactive: int | None = Query(None),
-    db: Session = Depends(get_db),
-) -> HTMLResponse:
-    resolved_hide = _resolve_hide_inactive(request, hide_inactive)
-    return _render_lookup_list(
-        request,
-        db,
-        Container,
-        "Containers",
-        "Container",
-        "/lookups/containers",
-        q,
-        resolved_hide,
-    )
-
-
-@router.get("/containers/new", response_class=HTMLResponse)
-def containers_new(request: Request) -> HTMLResponse:
-    return templates.TemplateResponse(request, 
-        "lookups/form.html",
-        {
-            "request": request,
-            "entity_plural": "Containers",
-            "entity_singular": "Container",
-            "base_path": "/lookups/containers",
-            "mode": "new",
-            "item": None,
-            "prefill_name": "",
-            "error": None,
-        },
-    )
-
-
-@router.post("/containers/new", response_class=HTMLResponse)
-async def containers_create(
-    request: Request, db: Session = Depends(get_db)
-) -> HTMLResponse:
-    form = await request.form()
-    raw_name = str(form.get("name", ""))
-    name = re.sub(r"\s+", " ", raw_name.strip())
-    error = None
-    if not name:
-        error = "Name is required."
-    elif len(name) > 120:
-        error = "Name must be 120 characters or fewer."
-    else:
-        existing = db.execute(
-            select(Container).where(func.lower(Container.name) == func.lower(name))
-        ).scalar_one_or_none()
-        if existing:
-            error = "Name already exists."
-
-    if error:
-        return templates.TemplateResponse(request, 
-            "lookups/form.html",
-            {
-                "request": request,
-                "entity_plural": "Containers",
-                "entity_singular": "Container",
-                "base_path": "/lookups/containers",
-                "mode": "new",
-                "item": None,
-                "prefill_name": name,
-                "error": error,
-            },
-            status_code=400,
+            _resolve_hide_inactive(request, None),
+            "Select at least one row and an action.",
         )
 
-    container = Container(name=name, is_active=True)
-    db.add(container)
+    result = set_active(db, spec, ids, active=action == "activate")
     db.commit()
-    return RedirectResponse(
-        url=_lookup_redirect_url(request, "/lookups/containers"),
-        status_code=303,
-    )
-
-
-@router.get("/containers/{container_id}/edit", response_class=HTMLResponse)
-def containers_edit(
-    container_id: int, request: Request, db: Session = Depends(get_db)
-) -> HTMLResponse:
-    container = db.get(Container, container_id)
-    if not container:
-        return templates.TemplateResponse(request, 
-            "lookups/not_found.html",
-            {
-                "request": request,
-                "entity": "Container",
-                "entity_id": container_id,
-                "base_path": "/lookups/containers",
-            },
-            status_code=404,
-        )
-    return templates.TemplateResponse(request, 
-        "lookups/form.html",
-        {
-            "request": request,
-            "entity_plural": "Containers",
-            "entity_singular": "Container",
-            "base_path": "/lookups/containers",
-            "mode": "edit",
-            "item": container,
-            "prefill_name": None,
-            "error": None,
-        },
-    )
-
-
-@router.post("/containers/{container_id}/edit", response_class=HTMLResponse)
-async def containers_update(
-    container_id: int, request: Request, db: Session = Depends(get_db)
-) -> HTMLResponse:
-    container = db.get(Container, container_id)
-    if not container:
-        return templates.TemplateResponse(request, 
-            "lookups/not_found.html",
-            {
-                "request": request,
-                "entity": "Container",
-                "entity_id": container_id,
-                "base_path": "/lookups/containers",
-            },
-            status_code=404,
-        )
-    form = await request.form()
-    raw_name = str(form.get("name", ""))
-    name = re.sub(r"\s+", " ", raw_name.strip())
-    error = None
-    if not name:
-        error = "Name is required."
-    elif len(name) > 120:
-        error = "Name must be 120 characters or fewer."
-    else:
-        existing = db.execute(
-            select(Container).where(
-                func.lower(Container.name) == func.lower(name),
-                Container.id != container.id,
-            )
-        ).scalar_one_or_none()
-        if existing:
-            error = "Name already exists."
-
-    if error:
-        return templates.TemplateResponse(request, 
-            "lookups/form.html",
-            {
-                "request": request,
-                "entity_plural": "Containers",
-                "entity_singular": "Container",
-                "base_path": "/lookups/containers",
-                "mode": "edit",
-                "item": container,
-                "prefill_name": name,
-                "error": error,
-            },
-            status_code=400,
-        )
-
-    container.name = name
-    db.commit()
-    return RedirectResponse(
-        url=_lookup_redirect_url(request, "/lookups/containers"),
-        status_code=303,
-    )
-
-
-@router.post("/containers/{container_id}/deactivate", response_class=HTMLResponse)
-def containers_deactivate(
-    container_id: int, request: Request, db: Session = Depends(get_db)
-) -> HTMLResponse:
-    container = db.get(Container, container_id)
-    if not container:
-        return templates.TemplateResponse(request, 
-            "lookups/not_found.html",
-            {
-                "request": request,
-                "entity": "Container",
-                "entity_id": container_id,
-                "base_path": "/lookups/containers",
-            },
-            status_code=404,
-        )
-    in_use = db.execute(
-        select(func.count(Ticket.id)).where(Ticket.container_id == container.id)
-    ).scalar()
-    if in_use and in_use > 0:
-        resolved_hide = _resolve_hide_inactive(request, None)
+    invalidate_lookups(spec)
+    if result.blocked:
+        nouns = sorted(set(result.blocked.values()))
         return _render_lookup_list(
             request,
             db,
-            Container,
-            "Containers",
-            "Container",
-            "/lookups/containers",
+            spec,
             request.query_params.get("q"),
-            resolved_hide,
-            "Cannot deactivate: in use by tickets.",
-        )
-
-    container.is_active = False
-    db.commit()
-    return RedirectResponse(
-        url=_lookup_redirect_url(request, "/lookups/containers"),
-        status_code=303,
-    )
-
-
-@router.post("/containers/{container_id}/reactivate", response_class=HTMLResponse)
-def containers_reactivate(
-    container_id: int, request: Request, db: Session = Depends(get_db)
-) -> HTMLResponse:
-    container = db.get(Container, container_id)
-    if not container:
-        return templates.TemplateResponse(request, 
-            "lookups/not_found.html",
-            {
-                "request": request,
-                "entity": "Container",
-                "entity_id": container_id,
-                "base_path": "/lookups/containers",
-            },
-            status_code=404,
-        )
-    container.is_active = True
-    db.commit()
-    return RedirectResponse(
-        url=_lookup_redirect_url(request, "/lookups/containers"),
-        status_code=303,
-    )
-
-
-@router.get("/destinations", response_class=HTMLResponse)
-def destinations_list(
-    request: Request,
-    q: str | None = None,
-    hide_inactive: int | None = Query(None),
-    db: Session = Depends(get_db),
-) -> HTMLResponse:
-    resolved_hide = _resolve_hide_inactive(request, hide_inactive)
-    return _render_lookup_list(
-        request,
-        db,
-        Destination,
-        "Destinations",
-        "Destination",
-        "/lookups/destinations",
-        q,
-        resolved_hide,
-    )
-
-
-@router.get("/destinations/new", response_class=HTMLResponse)
-def destinations_new(request: Request) -> HTMLResponse:
-    return templates.TemplateResponse(request, 
-        "lookups/form.html",
-        {
-            "request": request,
-            "entity_plural": "Destinations",
-            "entity_singular": "Destination",
-            "base_path": "/lookups/destinations",
-            "mode": "new",
-            "item": None,
-            "prefill_name": "",
-            "error": None,
-        },
-    )
-
-
-@router.post("/destinations/new", response_class=HTMLResponse)
-async def destinations_create(
-    request: Request, db: Session = Depends(get_db)
-) -> HTMLResponse:
-    form = await request.form()
-    raw_name = str(form.get("name", ""))
-    name = re.sub(r"\s+", " ", raw_name.strip())
-    error = None
-    if not name:
-        error = "Name is required."
-    elif len(name) > 120:
-        error = "Name must be 120 characters or fewer."
-    else:
-        existing = db.execute(
-            select(Destination).where(
-                func.lower(Destination.name) == func.lower(name)
-            )
-        ).scalar_one_or_none()
-        if existing:
-            error = "Name already exists."
-
-    if error:
-        return templates.TemplateResponse(request, 
-            "lookups/form.html",
-            {
-                "request": request,
-                "entity_plural": "Destinations",
-                "entity_singular": "Destination",
-                "base_path": "/lookups/destinations",
-                "mode": "new",
-                "item": None,
-                "prefill_name": name,
-                "error": error,
-            },
-            status_code=400,
+            _resolve_hide_inactive(request, None),
+            f"{len(result.blocked)} not deactivated: in use by {', '.join(nouns)}.",
         )
-
-    destination = Destination(name=name, is_active=True)
-    db.add(destination)
-    db.commit()
     return RedirectResponse(
-        url=_lookup_redirect_url(request, "/lookups/destinations"),
+        url=_lookup_redirect_url(request, spec.base_path),
         status_code=303,
     )
 
 
-@router.get("/destinations/{destination_id}/edit", response_class=HTMLResponse)
-def destinations_edit(
-    destination_id: int, request: Request, db: Session = Depends(get_db)
+@router.get("/{slug}/{item_id}/edit", response_class=HTMLResponse)
+def lookups_edit(
+    slug: str, item_id: int, request: Request, db: Session = Depends(get_db)
 ) -> HTMLResponse:
-    destination = db.get(Destination, destination_id)
-    if not destination:
-        return templates.TemplateResponse(request, 
-            "lookups/not_found.html",
-            {
-                "request": request,
-                "entity": "Destination",
-                "entity_id": destination_id,
-                "base_path": "/lookups/destinations",
-            },
-            status_code=404,
-        )
-    return templates.TemplateResponse(request, 
-        "lookups/form.html",
-        {
-            "request": request,
-            "entity_plural": "Destinations",
-            "entity_singular": "Destination",
-            "base_path": "/lookups/destinations",
-            "mode": "edit",
-            "item": destination,
-            "prefill_name": None,
-            "error": None,
-        },
-    )
+    spec = LOOKUPS.get(slug)
+    item = db.get(spec.model, item_id) if spec else None
+    if not item:
+        return _not_found(request, spec, slug, item_id)
+    return _render_lookup_form(request, spec, "edit", item=item)
 
 
-@router.post("/destinations/{destination_id}/edit", response_class=HTMLResponse)
-async def destinations_update(
-    destination_id: int, request: Request, db: Session = Depends(get_db)
+@router.post("/{slug}/{item_id}/edit", response_class=HTMLResponse)
+async def lookups_update(
+    slug: str, item_id: int, request: Request, db: Session = Depends(get_db)
 ) -> HTMLResponse:
-    destination = db.get(Destination, destination_id)
-    if not destination:
-        return templates.TemplateResponse(request, 
-            "lookups/not_found.html",
-            {
-                "request": request,
-                "entity": "Destination",
-                "entity_id": destination_id,
-                "base_path": "/lookups/destinations",
-            },
-            status_code=404,
-        )
+    spec = LOOKUPS.get(slug)
+    item = db.get(spec.model, item_id) if spec else None
+    if not item:
+        return _not_found(request, spec, slug, item_id)
     form = await request.form()
-    raw_name = str(form.get("name", ""))
-    name = re.sub(r"\s+", " ", raw_name.strip())
-    error = None
-    if not name:
-        error = "Name is required."
-    elif len(name) > 120:
-        error = "Name must be 120 characters or fewer."
-    else:
-        existing = db.execute(
-            select(Destination).where(
-                func.lower(Destination.name) == func.lower(name),
-                Destination.id != destination.id,
-            )
-        ).scalar_one_or_none()
-        if existing:
-            error = "Name already exists."
-
+    values, error = parse_lookup_form(db, spec, form, current_id=item.id)
     if error:
-        return templates.TemplateResponse(request, 
-            "lookups/form.html",
-            {
-                "request": request,
-                "entity_plural": "Destinations",
-                "entity_singular": "Destination",
-                "base_path": "/lookups/destinations",
-                "mode": "edit",
-                "item": destination,
-                "prefill_name": name,
-                "error": error,
-            },
-            status_code=400,
+        return _render_lookup_form(
+            request, spec, "edit", item=item, values=values, error=error
         )
 
-    destination.name = name
+    for name, value in values.items():
+        setattr(item, name, value)
     db.commit()
+    invalidate_lookups(spec)
     return RedirectResponse(
-        url=_lookup_redirect_url(request, "/lookups/destinations"),
+        url=_lookup_redirect_url(request, spec.base_path),
         status_code=303,
     )
 
 
-@router.post("/destinations/{destination_id}/deactivate", response_class=HTMLResponse)
-def destinations_deactivate(
-    destination_id: int, request: Request, db: Session = Depends(get_db)
+@router.post("/{slug}/{item_id}/deactivate", response_class=HTMLResponse)
+def lookups_deactivate(
+    slug: str, item_id: int, request: Request, db: Session = Depends(get_db)
 ) -> HTMLResponse:
-    destination = db.get(Destination, destination_id)
-    if not destination:
-        return templates.TemplateResponse(request, 
-            "lookups/not_found.html",
-            {
-                "request": request,
-                "entity": "Destination",
-                "entity_id": destination_id,
-                "base_path": "/lookups/destinations",
-            },
-            status_code=404,
-        )
-    in_use = db.execute(
-        select(func.count(Ticket.id)).where(
-            Ticket.destination_id == destination.id
-        )
-    ).scalar()
-    if in_use and in_use > 0:
-        resolved_hide = _resolve_hide_inactive(request, None)
+    spec = LOOKUPS.get(slug)
+    item = db.get(spec.model, item_id) if spec else None
+    if not item:
+        return _not_found(request, spec, slug, item_id)
+    result = set_active(db, spec, [item.id], active=False)
+    if result.blocked:
         return _render_lookup_list(
             request,
             db,
-            Destination,
-            "Destinations",
-            "Destination",
-            "/lookups/destinations",
+            spec,
             request.query_params.get("q"),
-            resolved_hide,
-            "Cannot deactivate: in use by tickets.",
+            _resolve_hide_inactive(request, None),
+            usage_error(result.blocked[item.id]),
         )
 
-    destination.is_active = False
     db.commit()
+    invalidate_lookups(spec)
     return RedirectResponse(
-        url=_lookup_redirect_url(request, "/lookups/destinations"),
+        url=_lookup_redirect_url(request, spec.base_path),
         status_code=303,
     )
 
 
-@router.post("/destinations/{destination_id}/reactivate", response_class=HTMLResponse)
-def destinations_reactivate(
-    destination_id: int, request: Request, db: Session = Depends(get_db)
+@router.post("/{slug}/{item_id}/reactivate", response_class=HTMLResponse)
+def lookups_reactivate(
+    slug: str, item_id: int, request: Request, db: Session = Depends(get_db)
 ) -> HTMLResponse:
-    destination = db.get(Destination, destination_id)
-    if not destination:
-        return templates.TemplateResponse(request, 
-            "lookups/not_found.html",
-            {
-                "request": request,
-                "entity": "Destination",
-                "entity_id": destination_id,
-                "base_path": "/lookups/destinations",
-            },
-            status_code=404,
-        )
-    destination.is_active = True
+    spec = LOOKUPS.get(slug)
+    item = db.get(spec.model, item_id) if spec else None
+    if not item:
+        return _not_found(request, spec, slug, item_id)
+    set_active(db, spec, [item.id], active=True)
     db.commit()
+    invalidate_lookups(spec)
     return RedirectResponse(
-        url=_lookup_redirect_url(request, "/lookups/destinations"),
+        url=_lookup_redirect_url(request, spec.base_path),
         status_code=303,
     )
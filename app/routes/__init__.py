@@ -1,5 +1,8 @@
 from fastapi import APIRouter
 
+from .admin import router as admin_router
+from .archive import router as archive_router
+from .audit import router as audit_router
 from .customers import router as customers_router
 from .debug import router as debug_router
 from .items import router as items_router
@@ -16,3 +19,6 @@ api_router.include_router(products_router, tags=["products"])
 api_router.include_router(tickets_router, tags=["tickets"])
 api_router.include_router(vehicles_router, tags=["vehicles"])
 api_router.include_router(debug_router, tags=["debug"])
+api_router.include_router(admin_router, tags=["admin"])
+api_router.include_router(archive_router, tags=["archive"])
+api_router.include_router(audit_router, tags=["audit"])
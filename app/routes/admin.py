@@ -0,0 +1,16 @@
+from dataclasses import asdict
+
+from fastapi import APIRouter, HTTPException
+
+from ..config import settings
+from ..db import engine, pool_status
+
+router = APIRouter()
+
+
+@router.get("/admin/pool")
+def admin_pool() -> dict:
+    if not settings.debug:
+        raise HTTPException(status_code=404)
+    status = pool_status(engine)
+    return asdict(status) | {"wait_seconds_avg": status.wait_seconds_avg}
@@ -0,0 +1,52 @@
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+
+from fastapi import APIRouter, Request
+from fastapi.responses import HTMLResponse
+
+from ..config import settings
+from ..services.archive import ArchiveQuery, load_manifest, search_archive
+from ..templating import templates
+
+router = APIRouter()
+
+RESULT_LIMIT = 500
+
+
+@router.get("/archive/tickets", response_class=HTMLResponse)
+def archive_tickets_search(
+    request: Request,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    ticket_no: str = "",
+    customer_id: int | None = None,
+) -> HTMLResponse:
+    ticket_no = ticket_no.strip()
+    query = ArchiveQuery(
+        date_from=datetime.combine(date_from, time.min) if date_from else None,
+        date_to=datetime.combine(date_to + timedelta(days=1), time.min)
+        if date_to
+        else None,
+        ticket_no=ticket_no or None,
+        customer_id=customer_id,
+    )
+    searched = bool(date_from or date_to or ticket_no or customer_id)
+    rows, scanned = search_archive(query, limit=RESULT_LIMIT) if searched else ([], 0)
+    return templates.TemplateResponse(
+        request,
+        "archive/tickets.html",
+        {
+            "request": request,
+            "filters": {
+                "date_from": date_from.isoformat() if date_from else "",
+                "date_to": date_to.isoformat() if date_to else "",
+                "ticket_no": ticket_no,
+                "customer_id": customer_id or "",
+            },
+            "searched": searched,
+            "rows": rows,
+            "limit": RESULT_LIMIT,
+            "scanned": scanned,
+            "segments": len(load_manifest(Path(settings.archive_dir))["segments"]),
+        },
+    )
@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import HTMLResponse
+from sqlalchemy.orm import Session
+
+from ..db import get_read_db
+from ..services.audit import audit_history
+from ..templating import templates
+
+router = APIRouter()
+
+# Audited entity -> (label, edit page path prefix).
+ENTITY_PAGES = {
+    "ticket": ("Ticket", "/tickets"),
+    "invoice": ("Invoice", "/invoices"),
+    "customer": ("Customer", "/customers"),
+}
+
+
+@router.get("/audit/{entity}/{entity_id}", response_class=HTMLResponse)
+def audit_entity_history(
+    entity: str,
+    entity_id: int,
+    request: Request,
+    page: int = 1,
+    page_size: int = 50,
+    db: Session = Depends(get_read_db),
+) -> HTMLResponse:
+    if entity not in ENTITY_PAGES:
+        raise HTTPException(status_code=404)
+
+    page = max(page, 1)
+    page_size = min(max(page_size, 1), 200)
+    total_count, entries = audit_history(
+        db, entity, entity_id, page=page, page_size=page_size
+    )
+    total_pages = max((total_count + page_size - 1) // page_size, 1)
+    label, prefix = ENTITY_PAGES[entity]
+    return templates.TemplateResponse(
+        request,
+        "audit/history.html",
+        {
+            "request": request,
+            "label": label,
+            "record_url": f"{prefix}/{entity_id}",
+            "entity": entity,
+            "entity_id": entity_id,
+            "entries": entries,
+            "page": page,
+            "total_count": total_count,
+            "total_pages": total_pages,
+        },
+    )
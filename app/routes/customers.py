@@ -1,36 +1,80 @@
 from datetime import datetime
 from decimal import Decimal, InvalidOperation
 
-from fastapi import APIRouter, Depends, Request
-from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy import or_, select
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from ..db import get_db
+from ..db import get_db, get_read_db
 from ..models.base import utcnow
 from ..models import Customer, InvoiceFrequency
+from ..responses import not_modified, page_validators, with_validators
+from ..services.customer_search import customer_page
+from ..services.page_versions import table_versions
+from ..templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
+
+CUSTOMER_PAGE_SIZE = 50
+TYPEAHEAD_LIMIT = 10
 
 
 @router.get("/customers", response_class=HTMLResponse)
 def customers_list(
     request: Request,
     q: str | None = None,
-    db: Session = Depends(get_db),
+    after: int | None = None,
+    db: Session = Depends(get_read_db),
 ) -> HTMLResponse:
-    query = select(Customer).order_by(Customer.name)
-    if q:
-        like = f"%{q}%"
-        query = query.where(
-            or_(Customer.name.ilike(like), Customer.account_code.ilike(like))
-        )
-    customers = db.execute(query).scalars().all()
+    customers, next_after = customer_page(
+        db, q=q, after_id=after, limit=CUSTOMER_PAGE_SIZE
+    )
     return templates.TemplateResponse(request, 
         "customers/list.html",
-        {"request": request, "customers": customers, "q": q or ""},
+        {
+            "request": request,
+            "customers": customers,
+            "q": q or "",
+            "after": after,
+            "next_after": next_after,
+        },
+    )
+
+
+@router.get("/customers/typeahead")
+def customers_typeahead(
+    request: Request,
+    q: str | None = None,
+    fmt: str | None = Query(None, alias="format"),
+    db: Session = Depends(get_db),
+) -> Response:
+    customers, _ = customer_page(db, q=q, limit=TYPEAHEAD_LIMIT) if q else ([], None)
+    wants_json = fmt == "json" or (
+        fmt is None
+        and "HX-Request" not in request.headers
+        and "application/json" in request.headers.get("accept", "")
+    )
+    if wants_json:
+        return JSONResponse(
+            [
+                {
+                    "id": customer.id,
+                    "account_code": customer.account_code,
+                    "name": customer.name,
+                    "on_stop": customer.on_stop,
+                }
+                for customer in customers
+            ]
+        )
+    return templates.TemplateResponse(request, 
+        "customers/_typeahead.html",
+        {
+            "request": request,
+            "customers": customers,
+            "q": q or "",
+            "target": request.query_params.get("target", ""),
+        },
     )
 
 
@@ -100,7 +144,16 @@ def customers_edit(
             {"request": request, "customer_id": customer_id},
             status_code=404,
         )
-    return templates.TemplateResponse(request, 
+    validators = page_validators(
+        request,
+        customer.id,
+        customer.updated_at,
+        *table_versions(db, InvoiceFrequency),
+    )
+    cached = not_modified(request, validators)
+    if cached is not None:
+        return cached
+    response = templates.TemplateResponse(request, 
         "customers/edit.html",
         {
             "request": request,
@@ -110,6 +163,7 @@ def customers_edit(
             "options": _load_options(db),
         },
     )
+    return with_validators(response, validators)
 
 
 @router.post("/customers/{customer_id}", response_class=HTMLResponse)
@@ -3,12 +3,18 @@ import logging
 from decimal import Decimal, ROUND_HALF_UP
 
 from fastapi import APIRouter, Depends, Query, Request
-from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
+from fastapi.responses import HTMLResponse, RedirectResponse, Response
 from sqlalchemy import and_, func, or_, select, text
-from sqlalchemy.orm import Session
-
-from ..db import get_db
+from sqlalchemy.orm import Session, selectinload
+
+from ..db import get_db, get_read_db
+from ..responses import (
+    cached_file_response,
+    etag_matches,
+    not_modified,
+    page_validators,
+    with_validators,
+)
 from ..models.base import utcnow
 from ..models import (
     Customer,
@@ -16,14 +22,24 @@ from ..models import (
     InvoiceLine,
     InvoiceVoid,
     PaymentMethod,
-    Product,
-    TaxRate,
     Ticket,
     VoidReason,
 )
+from ..services import reference_data
+from ..services.credit import record_invoice_created, record_invoice_settled
+from ..services.customer_search import selected_customer_options
+from ..services.document_cache import get_document_cache
+from ..services.product_catalog import product_records, product_tax_rates
+from ..services.page_versions import table_versions
+from ..services.invoice_pdf import (
+    invoice_document_data,
+    invoice_fingerprint,
+    render_invoice_pdf,
+)
+from ..services.render_pool import run_render
+from ..templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 logger = logging.getLogger(__name__)
 
 
@@ -31,7 +47,7 @@ logger = logging.getLogger(__name__)
 def invoices_list(
     request: Request,
     q: str | None = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ) -> HTMLResponse:
     query = (
         select(Invoice, Customer)
@@ -53,13 +69,12 @@ def invoices_list(
 def invoices_generate_form(
     request: Request, db: Session = Depends(get_db)
 ) -> HTMLResponse:
-    customers = db.execute(select(Customer).order_by(Customer.name)).scalars().all()
     return templates.TemplateResponse(request, 
         "invoices/generate.html",
         {
             "request": request,
             "errors": [],
-            "customers": customers,
+            "customers": [],
             "form": {"customer_id": "", "date_from": "", "date_to": ""},
         },
     )
@@ -87,7 +102,7 @@ async def invoices_generate(
     if date_from and date_to and date_to < date_from:
         errors.append("Date range invalid.")
 
-    customers = db.execute(select(Customer).order_by(Customer.name)).scalars().all()
+    customers = selected_customer_options(db, customer_id)
     if errors:
         return templates.TemplateResponse(request, 
             "invoices/generate.html",
@@ -181,7 +196,7 @@ async def invoices_generate_confirm(
     if date_from and date_to and date_to < date_from:
         errors.append("Date range invalid.")
 
-    customers = db.execute(select(Customer).order_by(Customer.name)).scalars().all()
+    customers = selected_customer_options(db, customer_id)
     if errors:
         return templates.TemplateResponse(request, 
             "invoices/generate.html",
@@ -218,13 +233,18 @@ async def invoices_generate_confirm(
         ticket_filters.append(Ticket.datetime < end_exclusive)
 
     try:
-        ticket_rows = db.execute(
-            select(Ticket, Product, TaxRate)
-            .join(Product, Ticket.product_id == Product.id)
-            .outerjoin(TaxRate, Product.tax_rate_id == TaxRate.id)
-            .where(and_(*ticket_filters))
+        tickets = db.execute(
+            select(Ticket)
+            .where(and_(*ticket_filters), Ticket.product_id.is_not(None))
             .order_by(Ticket.datetime.asc())
-        ).all()
+        ).scalars().all()
+        products = product_records(db, (ticket.product_id for ticket in tickets))
+        tax_rates = product_tax_rates(db, products)
+        ticket_rows = [
+            (ticket, products[ticket.product_id])
+            for ticket in tickets
+            if ticket.product_id in products
+        ]
     except Exception:
         logger.exception("Invoice confirm query failed")
         return templates.TemplateResponse(request, 
@@ -271,9 +291,9 @@ async def invoices_generate_confirm(
 
         line_totals: list[tuple[Decimal, Decimal]] = []
 
-        for ticket, product, tax_rate in ticket_rows:
+        for ticket, product in ticket_rows:
             net = _money(ticket.total)
-            rate = _decimal(tax_rate.rate_percent) if tax_rate else Decimal("0")
+            rate = tax_rates[product.id]
             vat = _money(net * rate / Decimal("100"))
             gross = net + vat
 
@@ -296,6 +316,7 @@ async def invoices_generate_confirm(
         invoice.net_total = net_total
         invoice.vat_total = vat_total
         invoice.gross_total = _money(net_total + vat_total)
+        record_invoice_created(db, invoice, net_total)
 
         db.commit()
     except Exception:
@@ -325,41 +346,44 @@ def invoices_detail(
     created: int | None = Query(None),
     db: Session = Depends(get_db),
 ) -> HTMLResponse:
-    invoice = db.get(Invoice, invoice_id)
+    versions = _invoice_page_versions(db, invoice_id)
+    if versions is None:
+        return _render_invoice_not_found(request, invoice_id)
+    validators = page_validators(request, *versions)
+    cached = not_modified(request, validators)
+    if cached is not None:
+        return cached
+    response = _render_invoice_detail(
+        request, db, invoice_id, errors=[], created=created == 1
+    )
+    return with_validators(response, validators)
+
+
+@router.get("/invoices/{invoice_id}/pdf")
+async def invoices_pdf(
+    invoice_id: int, request: Request, db: Session = Depends(get_db)
+) -> Response:
+    invoice = _load_invoice_graph(db, invoice_id)
     if not invoice:
-        return templates.TemplateResponse(request, 
-            "invoices/not_found.html",
-            {"request": request, "invoice_id": invoice_id},
-            status_code=404,
-        )
-    customer = db.get(Customer, invoice.customer_id)
-    lines = db.execute(
-        select(InvoiceLine)
-        .where(InvoiceLine.invoice_id == invoice.id)
-        .order_by(InvoiceLine.id)
-    ).scalars().all()
-    tickets = db.execute(
-        select(Ticket).where(Ticket.invoice_id == invoice.id).order_by(Ticket.datetime)
-    ).scalars().all()
-    payment_methods = db.execute(
-        select(PaymentMethod).order_by(PaymentMethod.code)
-    ).scalars().all()
-    void_reasons = db.execute(
-        select(VoidReason).order_by(VoidReason.code)
-    ).scalars().all()
-    return templates.TemplateResponse(request, 
-        "invoices/detail.html",
-        {
-            "request": request,
-            "invoice": invoice,
-            "customer": customer,
-            "lines": lines,
-            "tickets": tickets,
-            "payment_methods": payment_methods,
-            "void_reasons": void_reasons,
-            "errors": [],
-            "created": created == 1,
-        },
+        return _render_invoice_not_found(request, invoice_id)
+
+    fingerprint = invoice_fingerprint(invoice)
+    etag = f'"{fingerprint}"'
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    cache = get_document_cache()
+    key = f"{invoice.id}-{fingerprint}"
+    path = cache.get("invoices", key, ".pdf")
+    if path is None:
+        content = await run_render(render_invoice_pdf, invoice_document_data(invoice))
+        path = cache.store("invoices", key, ".pdf", content)
+    return cached_file_response(
+        request,
+        path,
+        etag=etag,
+        media_type="application/pdf",
+        filename=f"{invoice.invoice_no}.pdf",
     )
 
 
@@ -369,42 +393,18 @@ async def invoices_mark_paid(
 ) -> HTMLResponse:
     invoice = db.get(Invoice, invoice_id)
     if not invoice:
-        return templates.TemplateResponse(request, 
-            "invoices/not_found.html",
-            {"request": request, "invoice_id": invoice_id},
-            status_code=404,
-        )
+        return _render_invoice_not_found(request, invoice_id)
 
     form = await request.form()
     payment_method_id = _parse_int(str(form.get("payment_method_id", "")).strip())
     paid_at_raw = str(form.get("paid_at", "")).strip()
 
     if not payment_method_id or not paid_at_raw:
-        payment_methods = db.execute(
-            select(PaymentMethod).order_by(PaymentMethod.code)
-        ).scalars().all()
-        customer = db.get(Customer, invoice.customer_id)
-        lines = db.execute(
-            select(InvoiceLine)
-            .where(InvoiceLine.invoice_id == invoice.id)
-            .order_by(InvoiceLine.id)
-        ).scalars().all()
-        tickets = db.execute(
-            select(Ticket)
-            .where(Ticket.invoice_id == invoice.id)
-            .order_by(Ticket.datetime)
-        ).scalars().all()
-        return templates.TemplateResponse(request, 
-            "invoices/detail.html",
-            {
-                "request": request,
-                "invoice": invoice,
-                "customer": customer,
-                "lines": lines,
-                "tickets": tickets,
-                "payment_methods": payment_methods,
-                "errors": ["Payment method and paid date are required."],
-            },
+        return _render_invoice_detail(
+            request,
+            db,
+            invoice_id,
+            errors=["Payment method and paid date are required."],
             status_code=400,
         )
 
@@ -414,34 +414,15 @@ async def invoices_mark_paid(
         paid_at = None
 
     if not paid_at:
-        payment_methods = db.execute(
-            select(PaymentMethod).order_by(PaymentMethod.code)
-        ).scalars().all()
-        customer = db.get(Customer, invoice.customer_id)
-        lines = db.execute(
-            select(InvoiceLine)
-            .where(InvoiceLine.invoice_id == invoice.id)
-            .order_by(InvoiceLine.id)
-        ).scalars().all()
-        tickets = db.execute(
-            select(Ticket)
-            .where(Ticket.invoice_id == invoice.id)
-            .order_by(Ticket.datetime)
-        ).scalars().all()
-        return templates.TemplateResponse(request, 
-            "invoices/detail.html",
-            {
-                "request": request,
-                "invoice": invoice,
-                "customer": customer,
-                "lines": lines,
-                "tickets": tickets,
-                "payment_methods": payment_methods,
-                "errors": ["Paid date must be valid."],
-            },
+        return _render_invoice_detail(
+            request,
+            db,
+            invoice_id,
+            errors=["Paid date must be valid."],
             status_code=400,
         )
 
+    record_invoice_settled(db, invoice, invoice.status)
     invoice.status = "PAID"
     invoice.payment_method_id = payment_method_id
     invoice.paid_at = paid_at
@@ -455,49 +436,22 @@ async def invoices_void(
 ) -> HTMLResponse:
     invoice = db.get(Invoice, invoice_id)
     if not invoice:
-        return templates.TemplateResponse(request, 
-            "invoices/not_found.html",
-            {"request": request, "invoice_id": invoice_id},
-            status_code=404,
-        )
+        return _render_invoice_not_found(request, invoice_id)
 
     form = await request.form()
     reason_id = _parse_int(str(form.get("void_reason_id", "")).strip())
     note = str(form.get("void_note", "")).strip()
 
     if not reason_id or not note:
-        customer = db.get(Customer, invoice.customer_id)
-        lines = db.execute(
-            select(InvoiceLine)
-            .where(InvoiceLine.invoice_id == invoice.id)
-            .order_by(InvoiceLine.id)
-        ).scalars().all()
-        tickets = db.execute(
-            select(Ticket)
-            .where(Ticket.invoice_id == invoice.id)
-            .order_by(Ticket.datetime)
-        ).scalars().all()
-        payment_methods = db.execute(
-            select(PaymentMethod).order_by(PaymentMethod.code)
-        ).scalars().all()
-        void_reasons = db.execute(
-            select(VoidReason).order_by(VoidReason.code)
-        ).scalars().all()
-        return templates.TemplateResponse(request, 
-            "invoices/detail.html",
-            {
-                "request": request,
-                "invoice": invoice,
-                "customer": customer,
-                "lines": lines,
-                "tickets": tickets,
-                "payment_methods": payment_methods,
-                "void_reasons": void_reasons,
-                "errors": ["Void reason and note are required."],
-            },
+        return _render_invoice_detail(
+            request,
+            db,
+            invoice_id,
+            errors=["Void reason and note are required."],
             status_code=400,
         )
 
+    record_invoice_settled(db, invoice, invoice.status)
     invoice.status = "VOID"
     db.add(
         InvoiceVoid(
@@ -512,6 +466,88 @@ async def invoices_void(
     return RedirectResponse(url=f"/invoices/{invoice.id}", status_code=303)
 
 
+def _load_invoice_graph(db: Session, invoice_id: int) -> Invoice | None:
+    # One query for the invoice plus one per relationship, regardless of size.
+    return db.execute(
+        select(Invoice)
+        .where(Invoice.id == invoice_id)
+        .options(
+            selectinload(Invoice.customer),
+            selectinload(Invoice.lines),
+            selectinload(Invoice.tickets),
+        )
+    ).scalar_one_or_none()
+
+
+def _invoice_page_versions(db: Session, invoice_id: int) -> tuple | None:
+    """Stamps covering everything the detail page shows."""
+    row = db.execute(
+        select(
+            Invoice.status,
+            Invoice.paid_at,
+            Invoice.updated_at,
+            Customer.updated_at,
+            select(func.count(Ticket.id))
+            .where(Ticket.invoice_id == invoice_id)
+            .scalar_subquery(),
+            select(func.max(Ticket.updated_at))
+            .where(Ticket.invoice_id == invoice_id)
+            .scalar_subquery(),
+            select(func.count(InvoiceLine.id))
+            .where(InvoiceLine.invoice_id == invoice_id)
+            .scalar_subquery(),
+        )
+        .join(Customer, Customer.id == Invoice.customer_id, isouter=True)
+        .where(Invoice.id == invoice_id)
+    ).one_or_none()
+    if row is None:
+        return None
+    return (invoice_id, *row, *table_versions(db, PaymentMethod, VoidReason))
+
+
+def _invoice_detail_context(db: Session, invoice: Invoice) -> dict:
+    return {
+        "invoice": invoice,
+        "customer": invoice.customer,
+        "lines": invoice.lines,
+        "tickets": invoice.tickets,
+        "payment_methods": reference_data.payment_methods(db),
+        "void_reasons": reference_data.void_reasons(db),
+    }
+
+
+def _render_invoice_detail(
+    request: Request,
+    db: Session,
+    invoice_id: int,
+    *,
+    errors: list[str],
+    created: bool = False,
+    status_code: int = 200,
+) -> HTMLResponse:
+    invoice = _load_invoice_graph(db, invoice_id)
+    if not invoice:
+        return _render_invoice_not_found(request, invoice_id)
+    return templates.TemplateResponse(request, 
+        "invoices/detail.html",
+        {
+            "request": request,
+            **_invoice_detail_context(db, invoice),
+            "errors": errors,
+            "created": created,
+        },
+        status_code=status_code,
+    )
+
+
+def _render_invoice_not_found(request: Request, invoice_id: int) -> HTMLResponse:
+    return templates.TemplateResponse(request, 
+        "invoices/not_found.html",
+        {"request": request, "invoice_id": invoice_id},
+        status_code=404,
+    )
+
+
 def _generate_invoice_no(db: Session) -> str:
     year = utcnow().year
     db.execute(
@@ -4,7 +4,6 @@ from decimal import Decimal, InvalidOperation
 
 from fastapi import APIRouter, Depends, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy import func, or_, select
 from sqlalchemy.orm import Session
 
@@ -18,9 +17,15 @@ from ..models import (
     Unit,
     WasteCode,
 )
+from ..responses import not_modified, page_validators, with_validators
+from ..services.lookups import LookupField, LookupRow
+from ..services.page_versions import table_versions
+from ..services.product_catalog import invalidate_product_catalog
+from ..templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
+
+UNIT_FIELDS = (LookupField("name", "Name", max_length=50, required=True),)
 
 
 @router.get("/products", response_class=HTMLResponse)
@@ -96,6 +101,7 @@ async def products_create(
     )
     db.add(product)
     db.commit()
+    invalidate_product_catalog()
     return RedirectResponse(url="/products", status_code=303)
 
 
@@ -113,7 +119,10 @@ def units_list(
     if q:
         like = f"%{q.lower()}%"
         query = query.where(func.lower(Unit.name).like(like))
-    items = db.execute(query.order_by(Unit.name.asc())).scalars().all()
+    items = [
+        LookupRow(unit.id, unit.is_active, (unit.name,))
+        for unit in db.execute(query.order_by(Unit.name.asc())).scalars()
+    ]
     return templates.TemplateResponse(request, 
         "lookups/list.html",
         {
@@ -121,6 +130,7 @@ def units_list(
             "entity_plural": "Units",
             "entity_singular": "Unit",
             "base_path": "/products/units",
+            "fields": UNIT_FIELDS,
             "items": items,
             "q": q or "",
             "hide_inactive": bool(resolved_hide),
@@ -141,7 +151,8 @@ def units_new(request: Request) -> HTMLResponse:
             "base_path": "/products/units",
             "mode": "new",
             "item": None,
-            "prefill_name": "",
+            "fields": UNIT_FIELDS,
+            "values": {"name": ""},
             "error": None,
         },
     )
@@ -164,7 +175,8 @@ async def units_create(
                 "base_path": "/products/units",
                 "mode": "new",
                 "item": None,
-                "prefill_name": name,
+                "fields": UNIT_FIELDS,
+                "values": {"name": name},
                 "error": error,
             },
             status_code=400,
@@ -200,7 +212,8 @@ def units_edit(
             "base_path": "/products/units",
             "mode": "edit",
             "item": unit,
-            "prefill_name": None,
+            "fields": UNIT_FIELDS,
+            "values": {"name": unit.name},
             "error": None,
         },
     )
@@ -235,7 +248,8 @@ async def units_update(
                 "base_path": "/products/units",
                 "mode": "edit",
                 "item": unit,
-                "prefill_name": name,
+                "fields": UNIT_FIELDS,
+                "values": {"name": name},
                 "error": error,
             },
             status_code=400,
@@ -243,6 +257,7 @@ async def units_update(
     unit.name = name
     unit.updated_at = utcnow()
     db.commit()
+    invalidate_product_catalog()
     return RedirectResponse(url="/products/units?saved=1", status_code=303)
 
 
@@ -310,7 +325,16 @@ def products_edit(
             {"request": request, "product_id": product_id},
             status_code=404,
         )
-    return templates.TemplateResponse(request, 
+    validators = page_validators(
+        request,
+        product.id,
+        product.updated_at,
+        *table_versions(db, ProductGroup, Unit, TaxRate, NominalCode, WasteCode),
+    )
+    cached = not_modified(request, validators)
+    if cached is not None:
+        return cached
+    response = templates.TemplateResponse(request, 
         "products/edit.html",
         {
             "request": request,
@@ -320,6 +344,7 @@ def products_edit(
             "options": _load_options(db, current_unit_id=product.unit_id),
         },
     )
+    return with_validators(response, validators)
 
 
 @router.post("/products/{product_id:int}", response_class=HTMLResponse)
@@ -374,6 +399,7 @@ async def products_update(
     product.default_waste_code_id = payload["default_waste_code_id"]
     product.updated_at = utcnow()
     db.commit()
+    invalidate_product_catalog()
     return RedirectResponse(url=f"/products/{product.id}", status_code=303)
 
 
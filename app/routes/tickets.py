@@ -1,14 +1,22 @@
 from datetime import date, datetime, time, timedelta
 from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+import json
 import logging
+from time import perf_counter
 
 from fastapi import APIRouter, Depends, Query, Request
-from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
+from fastapi.responses import HTMLResponse, RedirectResponse, Response
 from sqlalchemy import case, func, or_, select, text
 from sqlalchemy.orm import Session
 
-from ..db import get_db
+from ..db import get_db, get_read_db
+from ..responses import (
+    cached_file_response,
+    etag_matches,
+    not_modified,
+    page_validators,
+    with_validators,
+)
 from ..models.base import utcnow
 from ..models import (
     Area,
@@ -31,15 +39,45 @@ from ..models import (
     WasteProducer,
     Yard,
 )
+from ..services.credit import (
+    CreditStatus,
+    credit_status,
+    record_ticket_completed,
+    record_ticket_voided,
+)
+from ..services.document_cache import get_document_cache
+from ..services.metrics import record_weight_capture
+from ..services.page_versions import table_versions
+from ..services.pricing import customer_is_cash, default_unit_price, quote
+from ..services.product_catalog import product_catalog, product_record
+from ..services.render_pool import run_render
+from ..services.ticket_documents import (
+    DOCUMENT_FORMATS,
+    DOCUMENT_KINDS,
+    TICKET_LOAD_OPTIONS,
+    documents_fingerprint,
+    render_ticket_documents,
+    ticket_document_data,
+)
+from ..templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 logger = logging.getLogger(__name__)
 
 LOCKED_STATUSES = {TicketStatusEnum.COMPLETE.value, TicketStatusEnum.VOID.value}
 NEW_TICKET_DEDUP_SECONDS = 5
 WEIGHT_MAX_KG = Decimal("1000000")
 WEIGHT_QUANTIZE = Decimal("1")
+PRODUCT_DEFAULTS_CACHE_CONTROL = "private, max-age=60"
+# Independently rendered parts of the ticket edit page, by fragment name.
+TICKET_FRAGMENTS = {
+    "header": "tickets/_header.html",
+    "alerts": "tickets/_alerts.html",
+    "lookups": "tickets/_lookups.html",
+    "weights": "tickets/_weights_card.html",
+    "pricing": "tickets/_pricing.html",
+}
+SAVE_FRAGMENTS = ("header", "alerts", "weights", "pricing")
 
 
 @router.get("/tickets", response_class=HTMLResponse)
@@ -55,7 +93,7 @@ def tickets_list(
     q: str | None = None,
     page: int = 1,
     page_size: int = 20,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ) -> HTMLResponse:
     page = max(page, 1)
     page_size = min(max(page_size, 1), 100)
@@ -195,20 +233,28 @@ def tickets_quick_create(request: Request, db: Session = Depends(get_db)) -> HTM
 def ticket_product_defaults(
     request: Request,
     product_id: int | None = Query(None),
+    customer_id: int | None = Query(None),
     unit_price: str | None = Query(None),
     db: Session = Depends(get_db),
 ) -> HTMLResponse:
     if not product_id:
         return HTMLResponse("", status_code=204)
 
-    product = db.get(Product, product_id)
+    product = product_record(db, product_id)
     if not product:
         return HTMLResponse("", status_code=204)
 
     current_unit_price = unit_price.strip() if unit_price else ""
+    default_price = default_unit_price(db, product, customer_id, date.today())
+    # The fragment only depends on the product record, the customer's
+    # resolved price and the posted price, so all three go into the validator.
+    etag = f'"{product.etag}-{default_price}-{current_unit_price}"'
+    headers = {"ETag": etag, "Cache-Control": PRODUCT_DEFAULTS_CACHE_CONTROL}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
 
     unit_price_value = (
-        current_unit_price if current_unit_price != "" else product.unit_price
+        current_unit_price if current_unit_price != "" else default_price
     )
 
     return templates.TemplateResponse(request, 
@@ -219,6 +265,7 @@ def ticket_product_defaults(
             if unit_price_value is not None
             else "",
         },
+        headers=headers,
     )
 
 
@@ -237,6 +284,85 @@ def tickets_mismatch_warning(
     )
 
 
+@router.get("/tickets/documents/daily")
+async def tickets_documents_daily(
+    request: Request,
+    day: date = Query(..., alias="date"),
+    kind: str = Query("ticket"),
+    fmt: str = Query("pdf", alias="format"),
+    db: Session = Depends(get_read_db),
+) -> Response:
+    if kind not in DOCUMENT_KINDS or fmt not in DOCUMENT_FORMATS:
+        return HTMLResponse("Unknown document type.", status_code=400)
+    # Date filters are interpreted in server-local time (UTC by default).
+    start = datetime.combine(day, time.min)
+    tickets = (
+        db.execute(
+            select(Ticket)
+            .where(
+                Ticket.status == TicketStatusEnum.COMPLETE.value,
+                Ticket.datetime >= start,
+                Ticket.datetime < start + timedelta(days=1),
+            )
+            .options(*TICKET_LOAD_OPTIONS)
+            .order_by(Ticket.datetime.asc(), Ticket.id.asc())
+        )
+        .scalars()
+        .all()
+    )
+    if not tickets:
+        return HTMLResponse("No completed tickets for that date.", status_code=404)
+    return await _ticket_document_response(
+        request, tickets, kind, fmt, f"tickets-{day.isoformat()}-{kind}"
+    )
+
+
+@router.get("/tickets/{ticket_id}/document")
+async def tickets_document(
+    ticket_id: int,
+    request: Request,
+    kind: str = Query("ticket"),
+    fmt: str = Query("pdf", alias="format"),
+    db: Session = Depends(get_db),
+) -> Response:
+    if kind not in DOCUMENT_KINDS or fmt not in DOCUMENT_FORMATS:
+        return HTMLResponse("Unknown document type.", status_code=400)
+    ticket = db.execute(
+        select(Ticket).where(Ticket.id == ticket_id).options(*TICKET_LOAD_OPTIONS)
+    ).scalar_one_or_none()
+    if not ticket:
+        return HTMLResponse("Ticket not found.", status_code=404)
+    if _status_value(ticket.status) != TicketStatusEnum.COMPLETE.value:
+        return HTMLResponse("Only completed tickets can be printed.", status_code=409)
+    return await _ticket_document_response(
+        request, [ticket], kind, fmt, f"{ticket.ticket_no}-{kind}"
+    )
+
+
+async def _ticket_document_response(
+    request: Request, tickets: list[Ticket], kind: str, fmt: str, filename: str
+) -> Response:
+    documents = [ticket_document_data(ticket) for ticket in tickets]
+    fingerprint = documents_fingerprint(kind, fmt, documents)
+    etag = f'"{fingerprint}"'
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    suffix = ".pdf" if fmt == "pdf" else ".bin"
+    cache = get_document_cache()
+    path = cache.get("tickets", fingerprint, suffix)
+    if path is None:
+        content = await run_render(render_ticket_documents, kind, fmt, documents)
+        path = cache.store("tickets", fingerprint, suffix, content)
+    return cached_file_response(
+        request,
+        path,
+        etag=etag,
+        media_type="application/pdf" if fmt == "pdf" else "application/octet-stream",
+        filename=f"{filename}{suffix}",
+    )
+
+
 def _generate_ticket_no(db: Session, now: datetime | None = None) -> str:
     current_time = now or utcnow()
     year = current_time.year
@@ -280,7 +406,7 @@ def _load_ticket_options(db: Session | None) -> dict[str, list[tuple[int, str]]]
             lambda row: row.registration,
         ),
         "products": as_options(
-            db.execute(select(Product).order_by(Product.description)).scalars().all(),
+            product_catalog(db).values(),
             lambda row: row.description,
         ),
         "hauliers": as_options(
@@ -477,28 +603,63 @@ def tickets_edit(
             status_code=404,
         )
 
-    is_admin = True
-    invoice = db.get(Invoice, ticket.invoice_id) if ticket.invoice_id else None
-    return templates.TemplateResponse(request, 
-        "tickets/edit.html",
-        {
-            "request": request,
-            "errors": [],
-            "saved": request.query_params.get("saved") == "1",
-            "completed": request.query_params.get("completed") == "1",
-            "ticket": ticket,
-            "invoice": invoice,
-            "is_admin": is_admin,
-            "is_open": _is_open_ticket(ticket),
-            "weight_warning": _net_negative(ticket),
-            "direction_warning": _direction_transaction_warning(
-                ticket.direction, ticket.transaction_type
-            ),
-            "form": _ticket_to_form(ticket),
-            "options": _load_ticket_options(db),
-            "enums": _ticket_enums(),
-            **_active_lookup_options(ticket, db),
-        },
+    # Held until the render so the credit warning reuses this row.
+    customer = db.get(Customer, ticket.customer_id) if ticket.customer_id else None
+    validators = page_validators(request, *_ticket_page_versions(db, ticket, customer))
+    cached = not_modified(request, validators)
+    if cached is not None:
+        return cached
+    response = _render_ticket_edit(
+        request,
+        ticket,
+        db,
+        errors=[],
+        saved=request.query_params.get("saved") == "1",
+        completed=request.query_params.get("completed") == "1",
+        status_code=200,
+    )
+    return with_validators(response, validators)
+
+
+def _ticket_page_versions(
+    db: Session, ticket: Ticket, customer: Customer | None
+) -> tuple:
+    # The option lists show whole tables. The credit warning depends on the
+    # ticket customer's balances, which leave updated_at alone.
+    return (
+        ticket.id,
+        ticket.updated_at,
+        credit_status(customer),
+        *table_versions(
+            db,
+            Customer,
+            Vehicle,
+            Product,
+            Haulier,
+            Driver,
+            Container,
+            Destination,
+            Yard,
+            Area,
+            WasteCode,
+            WasteProducer,
+            Licence,
+            VoidReason,
+        ),
+    )
+
+
+@router.get("/tickets/{ticket_id}/fragments/{name}", response_class=HTMLResponse)
+def tickets_fragment(
+    ticket_id: int, name: str, request: Request, db: Session = Depends(get_db)
+) -> HTMLResponse:
+    ticket = db.get(Ticket, ticket_id)
+    if not ticket or name not in TICKET_FRAGMENTS:
+        return HTMLResponse("Fragment not found.", status_code=404)
+    return templates.TemplateResponse(
+        request,
+        TICKET_FRAGMENTS[name],
+        _ticket_context(request, ticket, db, errors=[], lookups=name == "lookups"),
     )
 
 
@@ -536,7 +697,12 @@ async def tickets_update(
         )
         lookup_errors = _validate_lookup_fields(ticket, payload, db)
         payload["errors"].extend(lookup_errors)
-        _apply_ticket_defaults(db, payload)
+        _apply_ticket_defaults(db, payload, ticket)
+        credit = credit_status(
+            db.get(Customer, payload["customer_id"]) if payload["customer_id"] else None
+        )
+        if credit and credit.on_stop:
+            payload["errors"].append("Customer is on stop.")
 
         if payload["vehicle_id"] is None:
             payload["errors"].append("Vehicle is required to complete a ticket.")
@@ -569,8 +735,13 @@ async def tickets_update(
 
         _apply_ticket_updates(ticket, payload)
         ticket.status = TicketStatusEnum.COMPLETE.value
+        record_ticket_completed(db, ticket)
         db.commit()
-        return RedirectResponse(url=f"/tickets/{ticket_id}?completed=1", status_code=303)
+        completed_url = f"/tickets/{ticket_id}?completed=1"
+        if _is_htmx_request(request):
+            # Completing locks the whole form, so reload the page.
+            return Response(status_code=204, headers={"HX-Redirect": completed_url})
+        return RedirectResponse(url=completed_url, status_code=303)
 
     if action == "void":
         reason_id = _parse_int(str(form.get("void_reason_id", "")).strip())
@@ -590,7 +761,9 @@ async def tickets_update(
                 status_code=400,
             )
 
+        previous_status = ticket.status
         ticket.status = TicketStatusEnum.VOID.value
+        record_ticket_voided(db, ticket, previous_status)
         db.add(
             TicketVoid(
                 ticket_id=ticket.id,
@@ -617,7 +790,7 @@ async def tickets_update(
             payload["direction"], payload["gross_kg"], payload["tare_kg"]
         )
     )
-    _apply_ticket_defaults(db, payload)
+    _apply_ticket_defaults(db, payload, ticket)
     if payload["errors"]:
         return _render_ticket_edit(
             request,
@@ -632,6 +805,21 @@ async def tickets_update(
 
     _apply_ticket_updates(ticket, payload)
     db.commit()
+    if _is_htmx_request(request):
+        headers = None
+        if payload["form"]["customer_id"] != _form_value(form, "customer_id"):
+            headers = {
+                "HX-Trigger": json.dumps(
+                    {
+                        "ticket:customer-defaulted": {
+                            "value": payload["form"]["customer_id"]
+                        }
+                    }
+                )
+            }
+        return _render_ticket_fragments(
+            request, ticket, db, SAVE_FRAGMENTS, errors=[], saved=True, headers=headers
+        )
     return RedirectResponse(url=f"/tickets/{ticket_id}?saved=1", status_code=303)
 
 
@@ -639,6 +827,7 @@ async def tickets_update(
 async def tickets_capture_gross(
     ticket_id: int, request: Request, db: Session = Depends(get_db)
 ) -> HTMLResponse:
+    started = perf_counter()
     ticket = db.get(Ticket, ticket_id)
     if not ticket:
         return HTMLResponse("Ticket not found.", status_code=404)
@@ -671,13 +860,10 @@ async def tickets_capture_gross(
         )
 
     ticket.gross_kg = gross_value
-    ticket.net_kg = (
-        ticket.gross_kg - ticket.tare_kg
-        if ticket.gross_kg is not None and ticket.tare_kg is not None
-        else None
-    )
+    ticket.net_kg = _net_weight(ticket.gross_kg, ticket.tare_kg)
     ticket.updated_at = utcnow()
     db.commit()
+    record_weight_capture("gross", perf_counter() - started)
     return _render_weights_partial(request, ticket, errors=[])
 
 
@@ -687,6 +873,7 @@ async def tickets_capture_gross(
 async def tickets_capture_tare(
     ticket_id: int, request: Request, db: Session = Depends(get_db)
 ) -> HTMLResponse:
+    started = perf_counter()
     ticket = db.get(Ticket, ticket_id)
     if not ticket:
         return HTMLResponse("Ticket not found.", status_code=404)
@@ -719,13 +906,10 @@ async def tickets_capture_tare(
         )
 
     ticket.tare_kg = tare_value
-    ticket.net_kg = (
-        ticket.gross_kg - ticket.tare_kg
-        if ticket.gross_kg is not None and ticket.tare_kg is not None
-        else None
-    )
+    ticket.net_kg = _net_weight(ticket.gross_kg, ticket.tare_kg)
     ticket.updated_at = utcnow()
     db.commit()
+    record_weight_capture("tare", perf_counter() - started)
     return _render_weights_partial(request, ticket, errors=[])
 
 
@@ -908,7 +1092,7 @@ def tickets_swap_weights(
     if not ticket:
         return HTMLResponse("Ticket not found.", status_code=404)
     if _is_ticket_locked(ticket):
-        if request.headers.get("HX-Request") == "true":
+        if _is_htmx_request(request):
             return _render_weights_partial(
                 request, ticket, errors=["Ticket is locked."], status_code=403
             )
@@ -920,7 +1104,7 @@ def tickets_swap_weights(
             status_code=403,
         )
     if ticket.gross_kg is None or ticket.tare_kg is None:
-        if request.headers.get("HX-Request") == "true":
+        if _is_htmx_request(request):
             return _render_weights_partial(
                 request,
                 ticket,
@@ -943,7 +1127,7 @@ def tickets_swap_weights(
     )
     ticket.updated_at = utcnow()
     db.commit()
-    if request.headers.get("HX-Request") == "true":
+    if _is_htmx_request(request):
         return templates.TemplateResponse(request, 
             "tickets/_weights_swap.html",
             {
@@ -982,6 +1166,7 @@ def _apply_ticket_updates(ticket: Ticket, payload: dict) -> None:
     ticket.qty = payload["qty"]
     ticket.unit_id = payload["unit_id"]
     ticket.unit_price = payload["unit_price"]
+    ticket.unit_price_overridden = payload["unit_price_overridden"]
     ticket.total = payload["total"]
     ticket.dont_invoice = payload["dont_invoice"]
     ticket.updated_at = utcnow()
@@ -1126,6 +1311,14 @@ def _ticket_to_form(ticket: Ticket) -> dict:
     }
 
 
+def _net_weight(gross_kg, tare_kg) -> Decimal | None:
+    # One side may be a freshly parsed float and the other a Decimal loaded
+    # from the database; compare them on the same footing.
+    if gross_kg is None or tare_kg is None:
+        return None
+    return Decimal(str(gross_kg)) - Decimal(str(tare_kg))
+
+
 def _form_value(form, key: str) -> str:
     return str(form.get(key, "")).strip()
 
@@ -1153,27 +1346,53 @@ def _parse_weight_value(raw: str, label: str, errors: list[str]) -> float | None
     return float(value)
 
 
-def _apply_ticket_defaults(db: Session, payload: dict) -> None:
+def _apply_ticket_defaults(db: Session, payload: dict, ticket: Ticket) -> None:
     if payload["customer_id"] is None and payload.get("vehicle_id"):
         vehicle = db.get(Vehicle, payload["vehicle_id"])
         if vehicle and vehicle.owner_customer_id:
             payload["customer_id"] = vehicle.owner_customer_id
             payload["form"]["customer_id"] = str(vehicle.owner_customer_id)
 
+    product = product_record(db, payload.get("product_id"))
+    cash_account = customer_is_cash(db, payload["customer_id"])
+    default_price = (
+        default_unit_price(db, product, payload["customer_id"], ticket.datetime.date())
+        if product
+        else None
+    )
+    payload["unit_price_overridden"] = False
     if payload.get("unit_price_raw") in ("", None) or payload.get("unit_price") is None:
-        product_id = payload.get("product_id")
-        if product_id:
-            product = db.get(Product, product_id)
-            if product and product.unit_price is not None:
-                payload["unit_price"] = product.unit_price
-                logger.info(
-                    "Defaulted unit_price from product_id=%s to %s",
-                    product_id,
-                    product.unit_price,
-                )
+        if default_price is not None:
+            payload["unit_price"] = default_price
+            logger.info(
+                "Defaulted unit_price from product_id=%s to %s",
+                product.id,
+                default_price,
+            )
+    elif payload["unit_price"] != default_price:
+        # The form posts back the stored price, so an unchanged price keeps
+        # whatever it was; anything else was typed by the operator.
+        payload["unit_price_overridden"] = (
+            ticket.unit_price_overridden
+            if payload["unit_price"] == ticket.unit_price
+            else True
+        )
 
     if payload.get("qty") is not None and payload.get("unit_price") is not None:
-        payload["total"] = Decimal(str(payload["qty"])) * payload["unit_price"]
+        priced = (
+            quote(
+                product,
+                payload["qty"],
+                cash_account=cash_account,
+                unit_price=payload["unit_price"],
+            )
+            if product
+            else None
+        )
+        if priced:
+            payload["total"] = priced.total
+        else:
+            payload["total"] = Decimal(str(payload["qty"])) * payload["unit_price"]
 
 
 def _net_negative(ticket: Ticket) -> bool:
@@ -1215,6 +1434,75 @@ def _direction_transaction_warning(direction, transaction_type) -> bool:
     return False
 
 
+def _ticket_context(
+    request: Request,
+    ticket: Ticket,
+    db: Session,
+    *,
+    errors: list[str],
+    form: dict | None = None,
+    weight_warning: bool | None = None,
+    direction_warning: bool | None = None,
+    saved: bool = False,
+    completed: bool = False,
+    lookups: bool = False,
+) -> dict:
+    """Context shared by the edit page and its fragments.
+
+    Option lists are the expensive part; only the full page and the lookups
+    fragment load them.
+    """
+    context = {
+        "request": request,
+        "errors": errors,
+        "saved": saved,
+        "completed": completed,
+        "ticket": ticket,
+        "invoice": db.get(Invoice, ticket.invoice_id) if ticket.invoice_id else None,
+        "is_admin": True,
+        "is_open": _is_open_ticket(ticket),
+        "weight_warning": _net_negative(ticket)
+        if weight_warning is None
+        else weight_warning,
+        "direction_warning": _direction_transaction_warning(
+            ticket.direction, ticket.transaction_type
+        )
+        if direction_warning is None
+        else direction_warning,
+        "form": form or _ticket_to_form(ticket),
+        "credit": _ticket_credit(db, ticket),
+    }
+    if lookups:
+        context.update(_active_lookup_options(ticket, db))
+    return context
+
+
+def _render_ticket_fragments(
+    request: Request,
+    ticket: Ticket,
+    db: Session,
+    names: tuple[str, ...],
+    *,
+    status_code: int = 200,
+    headers: dict[str, str] | None = None,
+    **context,
+) -> HTMLResponse:
+    """Render ``names`` as out-of-band swaps for an htmx request."""
+    return templates.TemplateResponse(
+        request,
+        "tickets/_fragments.html",
+        {
+            **_ticket_context(
+                request, ticket, db, lookups="lookups" in names, **context
+            ),
+            "fragments": [TICKET_FRAGMENTS[name] for name in names],
+            "oob": True,
+        },
+        status_code=status_code,
+        headers=headers,
+    )
+
+
 def _render_ticket_edit(
     request: Request,
     ticket: Ticket,
@@ -1224,37 +1512,46 @@ def _render_ticket_edit(
     form: dict | None = None,
     weight_warning: bool | None = None,
     direction_warning: bool | None = None,
+    saved: bool = False,
+    completed: bool = False,
     status_code: int = 400,
 ) -> HTMLResponse:
-    invoice = db.get(Invoice, ticket.invoice_id) if ticket.invoice_id else None
-    return templates.TemplateResponse(request, 
+    context = {
+        "errors": errors,
+        "form": form,
+        "weight_warning": weight_warning,
+        "direction_warning": direction_warning,
+        "saved": saved,
+        "completed": completed,
+    }
+    if _is_htmx_request(request):
+        # The inputs the user typed are still on the page; only the
+        # messages need replacing.
+        return _render_ticket_fragments(
+            request, ticket, db, ("alerts",), status_code=status_code, **context
+        )
+    return templates.TemplateResponse(
+        request,
         "tickets/edit.html",
         {
-            "request": request,
-            "errors": errors,
-            "saved": False,
-            "completed": False,
-            "ticket": ticket,
-            "invoice": invoice,
-            "is_admin": True,
-            "is_open": _is_open_ticket(ticket),
-            "weight_warning": _net_negative(ticket)
-            if weight_warning is None
-            else weight_warning,
-            "direction_warning": _direction_transaction_warning(
-                ticket.direction, ticket.transaction_type
-            )
-            if direction_warning is None
-            else direction_warning,
-            "form": form or _ticket_to_form(ticket),
+            **_ticket_context(request, ticket, db, lookups=True, **context),
             "options": _load_ticket_options(db),
             "enums": _ticket_enums(),
-            **_active_lookup_options(ticket, db),
         },
         status_code=status_code,
     )
 
 
+def _is_htmx_request(request: Request) -> bool:
+    return request.headers.get("HX-Request") == "true"
+
+
+def _ticket_credit(db: Session, ticket: Ticket) -> CreditStatus | None:
+    if not ticket.customer_id:
+        return None
+    return credit_status(db.get(Customer, ticket.customer_id))
+
+
 def _render_weights_partial(
     request: Request, ticket: Ticket, errors: list[str], status_code: int = 200
 ) -> HTMLResponse:
@@ -2,11 +2,13 @@ from datetime import datetime
 
 from fastapi import APIRouter, Depends, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from ..db import get_db
+from ..responses import not_modified, page_validators, with_validators
+from ..services.customer_search import selected_customer_options
+from ..services.page_versions import table_versions
 from ..models.base import utcnow
 from ..models import (
     Container,
@@ -17,9 +19,9 @@ from ..models import (
     VehicleTare,
     VehicleType,
 )
+from ..templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 
 
 @router.get("/vehicles", response_class=HTMLResponse)
@@ -70,7 +72,7 @@ async def vehicles_create(
                 "request": request,
                 "errors": payload["errors"],
                 "form": payload["form"],
-                "options": _load_options(db),
+                "options": _load_options(db, payload["form"]["owner_customer_id"]),
             },
             status_code=400,
         )
@@ -100,23 +102,37 @@ def vehicles_edit(
             {"request": request, "vehicle_id": vehicle_id},
             status_code=404,
         )
+    owner_updated_at = db.execute(
+        select(Customer.updated_at).where(Customer.id == vehicle.owner_customer_id)
+    ).scalar_one_or_none()
+    validators = page_validators(
+        request,
+        vehicle.id,
+        vehicle.updated_at,
+        owner_updated_at,
+        *table_versions(db, VehicleType, Haulier, Driver, Container),
+    )
+    cached = not_modified(request, validators)
+    if cached is not None:
+        return cached
     tares = db.execute(
         select(VehicleTare, Container)
         .join(Container, VehicleTare.container_id == Container.id)
         .where(VehicleTare.vehicle_id == vehicle.id)
         .order_by(Container.name)
     ).all()
-    return templates.TemplateResponse(request, 
+    response = templates.TemplateResponse(request, 
         "vehicles/edit.html",
         {
             "request": request,
             "errors": [],
             "vehicle": vehicle,
             "form": _vehicle_to_form(vehicle),
-            "options": _load_options(db),
+            "options": _load_options(db, str(vehicle.owner_customer_id or "")),
             "tares": tares,
         },
     )
+    return with_validators(response, validators)
 
 
 @router.post("/vehicles/{vehicle_id}", response_class=HTMLResponse)
@@ -146,7 +162,7 @@ async def vehicles_update(
                 "errors": payload["errors"],
                 "vehicle": vehicle,
                 "form": payload["form"],
-                "options": _load_options(db),
+                "options": _load_options(db, payload["form"]["owner_customer_id"]),
                 "tares": tares,
             },
             status_code=400,
@@ -194,6 +210,7 @@ async def vehicle_tares_add(
                     vehicle_id=vehicle.id, container_id=container_id, tare_kg=tare_kg
                 )
             )
+        vehicle.updated_at = utcnow()
         db.commit()
 
     return RedirectResponse(url=f"/vehicles/{vehicle.id}", status_code=303)
@@ -213,6 +230,7 @@ async def vehicle_tares_update(
     tare_kg = _parse_float(str(form.get("tare_kg", "")).strip())
     if tare_kg is not None:
         tare.tare_kg = tare_kg
+        _touch_vehicle(db, vehicle_id)
         db.commit()
     return RedirectResponse(url=f"/vehicles/{vehicle_id}", status_code=303)
 
@@ -226,18 +244,27 @@ def vehicle_tares_delete(
     tare = db.get(VehicleTare, tare_id)
     if tare and tare.vehicle_id == vehicle_id:
         db.delete(tare)
+        _touch_vehicle(db, vehicle_id)
         db.commit()
     return RedirectResponse(url=f"/vehicles/{vehicle_id}", status_code=303)
 
 
-def _load_options(db: Session) -> dict[str, list[tuple[str, str]]]:
-    customers = db.execute(select(Customer).order_by(Customer.name)).scalars()
+def _touch_vehicle(db: Session, vehicle_id: int) -> None:
+    # Tares show on the vehicle page, so they count as a vehicle edit.
+    vehicle = db.get(Vehicle, vehicle_id)
+    if vehicle is not None:
+        vehicle.updated_at = utcnow()
+
+
+def _load_options(
+    db: Session, owner_customer_id: str = ""
+) -> dict[str, list[tuple[str, str]]]:
     vehicle_types = db.execute(select(VehicleType).order_by(VehicleType.code)).scalars()
     hauliers = db.execute(select(Haulier).order_by(Haulier.name)).scalars()
     drivers = db.execute(select(Driver).order_by(Driver.name)).scalars()
     containers = db.execute(select(Container).order_by(Container.name)).scalars()
     return {
-        "customers": [(str(row.id), row.name) for row in customers],
+        "customers": selected_customer_options(db, owner_customer_id),
         "vehicle_types": [(str(row.id), row.code) for row in vehicle_types],
         "hauliers": [(str(row.id), row.name) for row in hauliers],
         "drivers": [(str(row.id), row.name) for row in drivers],
@@ -0,0 +1,321 @@
+"""Cold archive of closed tickets.
+
+``archive_tickets`` moves closed tickets older than the cutoff out of the
+live tables and into gzip-compressed NDJSON segments under ``ARCHIVE_DIR``.
+Closed means void, or complete and invoiced. ``manifest.json`` lists every
+segment with its row count, checksum and the min/max of ``ZONE_FIELDS``.
+``search_archive`` skips segments whose ranges cannot match and reads the
+rest through a memory map.
+
+Each archived row keeps every ticket column, its void record and the
+customer, vehicle and product labels. That way a row still reads correctly
+after those lookups change.
+"""
+
+import gzip
+import hashlib
+import json
+import mmap
+import os
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from enum import Enum
+from pathlib import Path
+
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models import (
+    Customer,
+    IntegrityFinding,
+    InvoiceLine,
+    Product,
+    Ticket,
+    TicketStatusEnum,
+    TicketVoid,
+    Vehicle,
+)
+from ..models.base import utcnow
+from .lookups import rebuild_lookup_usage
+
+MANIFEST = "manifest.json"
+MANIFEST_VERSION = 1
+ZONE_FIELDS = ("datetime", "id", "customer_id", "ticket_no")
+# Keeps IN (...) lists under SQLite's bound-parameter limit.
+ID_CHUNK = 500
+
+
+def archive_cutoff(today: date | None = None, days: int | None = None) -> datetime:
+    days = settings.archive_after_days if days is None else days
+    return datetime.combine((today or utcnow().date()) - timedelta(days=days), time.min)
+
+
+def archivable(cutoff: datetime):
+    """WHERE clause for tickets that may leave the live tables."""
+    return and_(
+        Ticket.datetime < cutoff,
+        or_(
+            Ticket.status == TicketStatusEnum.VOID.value,
+            and_(
+                Ticket.status == TicketStatusEnum.COMPLETE.value,
+                Ticket.invoice_id.is_not(None),
+            ),
+        ),
+    )
+
+
+@dataclass(frozen=True)
+class ArchiveQuery:
+    date_from: datetime | None = None
+    # Exclusive, like the live ticket filters.
+    date_to: datetime | None = None
+    ticket_id: int | None = None
+    ticket_no: str | None = None
+    customer_id: int | None = None
+
+    def _bounds(self) -> dict[str, tuple]:
+        bounds = {}
+        if self.date_from or self.date_to:
+            bounds["datetime"] = (
+                self.date_from.isoformat() if self.date_from else None,
+                self.date_to.isoformat() if self.date_to else None,
+            )
+        for name in ("id", "customer_id", "ticket_no"):
+            value = getattr(self, "ticket_id" if name == "id" else name)
+            if value is not None:
+                bounds[name] = (value, value)
+        return bounds
+
+    def may_match(self, segment: dict) -> bool:
+        for name, (low, high) in self._bounds().items():
+            zone = segment["zones"].get(name)
+            if zone is None:
+                # Every row in the segment has no value for this field.
+                return False
+            if high is not None and zone[0] > high:
+                return False
+            if low is not None and zone[1] < low:
+                return False
+        return True
+
+    def matches(self, row: dict) -> bool:
+        stamp = row["datetime"]
+        if self.date_from and stamp < self.date_from.isoformat():
+            return False
+        if self.date_to and stamp >= self.date_to.isoformat():
+            return False
+        if self.ticket_id is not None and row["id"] != self.ticket_id:
+            return False
+        if self.ticket_no is not None and row["ticket_no"] != self.ticket_no:
+            return False
+        if self.customer_id is not None and row["customer_id"] != self.customer_id:
+            return False
+        return True
+
+
+@dataclass
+class ArchiveResult:
+    segments: list[str] = field(default_factory=list)
+    tickets: int = 0
+
+
+def _json_default(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Cannot archive {type(value).__name__}")
+
+
+def load_manifest(directory: Path) -> dict:
+    path = directory / MANIFEST
+    if not path.exists():
+        return {"version": MANIFEST_VERSION, "segments": []}
+    return json.loads(path.read_text())
+
+
+def _write_atomically(path: Path, data: bytes) -> None:
+    partial = path.with_name(f".{path.name}.tmp")
+    with open(partial, "wb") as handle:
+        handle.write(data)
+        handle.flush()
+        os.fsync(handle.fileno())
+    partial.replace(path)
+
+
+def _save_manifest(directory: Path, manifest: dict) -> None:
+    _write_atomically(
+        directory / MANIFEST, json.dumps(manifest, indent=2).encode("utf-8")
+    )
+
+
+def _zones(rows: list[dict]) -> dict[str, list | None]:
+    zones: dict[str, list | None] = {}
+    for name in ZONE_FIELDS:
+        values = [row[name] for row in rows if row[name] is not None]
+        if values and isinstance(values[0], datetime):
+            values = [value.isoformat() for value in values]
+        zones[name] = [min(values), max(values)] if values else None
+    return zones
+
+
+def _write_segment(directory: Path, manifest: dict, rows: list[dict]) -> dict:
+    numbers = [segment["number"] for segment in manifest["segments"]]
+    number = max(numbers, default=0) + 1
+    name = f"tickets-{number:06d}.ndjson.gz"
+    lines = b"".join(
+        json.dumps(row, default=_json_default, sort_keys=True).encode("utf-8") + b"\n"
+        for row in rows
+    )
+    data = gzip.compress(lines, compresslevel=9, mtime=0)
+    _write_atomically(directory / name, data)
+    segment = {
+        "number": number,
+        "file": name,
+        "rows": len(rows),
+        "bytes": len(data),
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "created_at": utcnow().isoformat(),
+        # "pending" until the rows are gone from the live tables.
+        "state": "pending",
+        "zones": _zones(rows),
+    }
+    manifest["segments"].append(segment)
+    _save_manifest(directory, manifest)
+    return segment
+
+
+def _chunks(ids: list[int]) -> Iterator[list[int]]:
+    for start in range(0, len(ids), ID_CHUNK):
+        yield ids[start : start + ID_CHUNK]
+
+
+def _load_batch(db: Session, cutoff: datetime, limit: int) -> list[dict]:
+    rows = db.execute(
+        select(
+            Ticket.__table__,
+            Customer.name.label("customer_name"),
+            Vehicle.registration.label("vehicle_registration"),
+            Product.description.label("product_description"),
+        )
+        .outerjoin(Customer, Customer.id == Ticket.customer_id)
+        .outerjoin(Vehicle, Vehicle.id == Ticket.vehicle_id)
+        .outerjoin(Product, Product.id == Ticket.product_id)
+        .where(archivable(cutoff))
+        .order_by(Ticket.datetime, Ticket.id)
+        .limit(limit)
+    ).mappings()
+    batch = [dict(row) for row in rows]
+    voids: dict[int, dict] = {}
+    for ids in _chunks([row["id"] for row in batch]):
+        for void in db.execute(
+            select(TicketVoid.__table__).where(TicketVoid.ticket_id.in_(ids))
+        ).mappings():
+            voids[void["ticket_id"]] = dict(void)
+    for row in batch:
+        row["void"] = voids.get(row["id"])
+    return batch
+
+
+def _delete_live(db: Session, ids: list[int]) -> None:
+    for chunk in _chunks(ids):
+        # Invoice lines keep their own copy of the ticket details, and the
+        # archived row keeps its invoice_id, so only the foreign key goes.
+        db.execute(
+            update(InvoiceLine)
+            .where(InvoiceLine.ticket_id.in_(chunk))
+            .values(ticket_id=None)
+        )
+        db.execute(delete(IntegrityFinding).where(IntegrityFinding.ticket_id.in_(chunk)))
+        db.execute(delete(TicketVoid).where(TicketVoid.ticket_id.in_(chunk)))
+        db.execute(delete(Ticket).where(Ticket.id.in_(chunk)))
+
+
+def _segment_ids(directory: Path, segment: dict) -> list[int]:
+    return [row["id"] for row in read_segment(directory / segment["file"])]
+
+
+def _finish_pending(db: Session, directory: Path, manifest: dict) -> None:
+    # A run that stopped between writing a segment and committing the delete
+    # leaves its rows in both places; the segment is complete, so finish it.
+    for segment in manifest["segments"]:
+        if segment["state"] == "pending":
+            _delete_live(db, _segment_ids(directory, segment))
+            db.commit()
+            segment["state"] = "archived"
+            _save_manifest(directory, manifest)
+
+
+def archive_tickets(
+    db: Session,
+    *,
+    cutoff: datetime | None = None,
+    directory: str | Path | None = None,
+    segment_rows: int | None = None,
+) -> ArchiveResult:
+    """Move archivable tickets into new segments, committing per segment."""
+    cutoff = cutoff or archive_cutoff()
+    directory = Path(directory or settings.archive_dir)
+    segment_rows = segment_rows or settings.archive_segment_rows
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(directory)
+    _finish_pending(db, directory, manifest)
+
+    result = ArchiveResult()
+    while batch := _load_batch(db, cutoff, segment_rows):
+        segment = _write_segment(directory, manifest, batch)
+        _delete_live(db, [row["id"] for row in batch])
+        db.commit()
+        segment["state"] = "archived"
+        _save_manifest(directory, manifest)
+        result.segments.append(segment["file"])
+        result.tickets += len(batch)
+
+    if result.tickets:
+        # The deletes above bypass the ORM hook that maintains usage counts.
+        rebuild_lookup_usage(db)
+        db.commit()
+    return result
+
+
+def count_archivable(db: Session, cutoff: datetime | None = None) -> int:
+    cutoff = cutoff or archive_cutoff()
+    return db.execute(
+        select(func.count()).select_from(Ticket).where(archivable(cutoff))
+    ).scalar_one()
+
+
+def read_segment(path: Path) -> Iterator[dict]:
+    """Decompress a segment straight from a read-only memory map."""
+    with open(path, "rb") as handle:
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with gzip.GzipFile(fileobj=mapped, mode="rb") as lines:
+                for line in lines:
+                    yield json.loads(line)
+
+
+def search_archive(
+    query: ArchiveQuery,
+    *,
+    directory: str | Path | None = None,
+    limit: int = 500,
+) -> tuple[list[dict], int]:
+    """Matching archived tickets (oldest first) and how many segments were read."""
+    directory = Path(directory or settings.archive_dir)
+    rows: list[dict] = []
+    scanned = 0
+    for segment in load_manifest(directory)["segments"]:
+        if not query.may_match(segment):
+            continue
+        scanned += 1
+        for row in read_segment(directory / segment["file"]):
+            if query.matches(row):
+                rows.append(row)
+                if len(rows) >= limit:
+                    return rows, scanned
+    return rows, scanned
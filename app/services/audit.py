@@ -0,0 +1,220 @@
+"""Field-level audit trail for tickets, invoices and customers.
+
+A flush hook diffs every new, changed and deleted audited object and parks
+the rows on the session. When the transaction commits they are handed to
+``audit_writer``, which inserts them into ``audit_log`` in batches from a
+background thread, so saving a record costs no extra round trip. A
+rollback discards them. Without the writer thread (jobs, scripts) rows are
+written straight after the commit.
+
+Bulk ``update()`` and ``delete()`` statements bypass the hook and are not
+audited.
+"""
+
+import logging
+import queue
+import threading
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+
+from sqlalchemy import event, func, insert, inspect, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from ..models import AuditEntry, Customer, Invoice, Ticket
+from ..models.base import track_previous_values, utcnow
+
+logger = logging.getLogger(__name__)
+
+AUDITED: dict[type, str] = {Ticket: "ticket", Invoice: "invoice", Customer: "customer"}
+# Bumped on every save; the entry's changed_at already says when.
+IGNORED_FIELDS = frozenset({"created_at", "updated_at"})
+# There are no logins yet; matches the ``voided_by`` recorded on voids.
+DEFAULT_ACTOR = "admin"
+_PENDING = "audit_pending"
+
+
+def _plain(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _first(*values: tuple):
+    for candidates in values:
+        if candidates:
+            return candidates[0]
+    return None
+
+
+def _diff(obj, action: str) -> dict[str, list]:
+    state = inspect(obj)
+    changes = {}
+    for attribute in state.mapper.column_attrs:
+        if attribute.key in IGNORED_FIELDS:
+            continue
+        history = state.attrs[attribute.key].history
+        if action == "create":
+            old, new = None, _first(history.added, history.unchanged)
+        elif action == "delete":
+            old, new = _first(history.unchanged, history.deleted), None
+        elif history.has_changes():
+            old, new = _first(history.deleted), _first(history.added)
+        else:
+            continue
+        old, new = _plain(old), _plain(new)
+        if old != new:
+            changes[attribute.key] = [old, new]
+    return changes
+
+
+for _audited_class in AUDITED:
+    track_previous_values(
+        *(column.class_attribute for column in inspect(_audited_class).column_attrs)
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_audit_rows(session: Session, flush_context) -> None:
+    rows = []
+    changed_at = utcnow()
+    changed_by = session.info.get("actor", DEFAULT_ACTOR)
+    for action, objects in (
+        ("create", session.new),
+        ("update", session.dirty),
+        ("delete", session.deleted),
+    ):
+        for obj in objects:
+            entity = AUDITED.get(type(obj))
+            if entity is None:
+                continue
+            changes = _diff(obj, action)
+            if not changes and action == "update":
+                continue
+            rows.append(
+                {
+                    "entity": entity,
+                    "entity_id": obj.id,
+                    "action": action,
+                    "changes": changes,
+                    "changed_by": changed_by,
+                    "changed_at": changed_at,
+                }
+            )
+    if rows:
+        session.info.setdefault(_PENDING, []).extend(rows)
+
+
+@event.listens_for(Session, "after_commit")
+def _submit_audit_rows(session: Session) -> None:
+    rows = session.info.pop(_PENDING, None)
+    if rows:
+        audit_writer.submit(session.get_bind(), rows)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_audit_rows(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+
+
+class AuditWriter:
+    """Inserts committed audit rows in batches from a daemon thread.
+
+    Rows still queued when the process dies are lost; ``stop`` writes them
+    out on a clean shutdown.
+    """
+
+    def __init__(self) -> None:
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._queued = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: threading.Thread | None = None
+        self.batch_size = 500
+
+    def start(self, interval_seconds: float, batch_size: int) -> None:
+        if self._thread is not None:
+            return
+        self.batch_size = batch_size
+        self._stopping = False
+
+        def loop() -> None:
+            while not self._stopping:
+                self._wake.wait(interval_seconds)
+                self._wake.clear()
+                self.flush()
+
+        self._thread = threading.Thread(target=loop, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stopping = True
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+        self.flush()
+
+    def submit(self, engine: Engine, rows: list[dict]) -> None:
+        if self._thread is None:
+            self._write(engine, rows)
+            return
+        self._queue.put((engine, rows))
+        with self._lock:
+            self._queued += len(rows)
+            if self._queued >= self.batch_size:
+                self._wake.set()
+
+    def flush(self) -> int:
+        """Write everything queued so far; returns the number of rows."""
+        pending: dict[Engine, list[dict]] = defaultdict(list)
+        with self._lock:
+            while True:
+                try:
+                    engine, rows = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                pending[engine].extend(rows)
+            self._queued = 0
+        for engine, rows in pending.items():
+            self._write(engine, rows)
+        return sum(len(rows) for rows in pending.values())
+
+    def _write(self, engine: Engine, rows: list[dict]) -> None:
+        try:
+            with engine.begin() as connection:
+                for start in range(0, len(rows), self.batch_size):
+                    connection.execute(
+                        insert(AuditEntry), rows[start : start + self.batch_size]
+                    )
+        except Exception:
+            logger.exception("Audit write failed; %d entries lost", len(rows))
+
+
+audit_writer = AuditWriter()
+
+
+def audit_history(
+    db: Session, entity: str, entity_id: int, *, page: int = 1, page_size: int = 50
+) -> tuple[int, list[AuditEntry]]:
+    """Total entries for one record and a page of them, newest first."""
+    filters = (AuditEntry.entity == entity, AuditEntry.entity_id == entity_id)
+    total = db.execute(
+        select(func.count()).select_from(AuditEntry).where(*filters)
+    ).scalar_one()
+    entries = db.execute(
+        select(AuditEntry)
+        .where(*filters)
+        .order_by(AuditEntry.id.desc())
+        .offset((page - 1) * page_size)
+        .limit(page_size)
+    ).scalars()
+    return total, list(entries)
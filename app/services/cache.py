@@ -0,0 +1,49 @@
+import threading
+import time
+from collections.abc import Callable
+from typing import Generic, TypeVar
+
+from sqlalchemy.orm import Session
+
+T = TypeVar("T")
+
+
+class BindCache(Generic[T]):
+    """Process-local cache of a value loaded through a session.
+
+    Entries are keyed by the session's database URL so separate databases
+    (tests, replicas) never share state. Entries expire after ``ttl_seconds``
+    so changes made by other workers are picked up eventually; writes made
+    in this process should call ``invalidate()``.
+    """
+
+    def __init__(self, loader: Callable[[Session], T], ttl_seconds: float = 300.0) -> None:
+        self._loader = loader
+        self._ttl_seconds = ttl_seconds
+        self._entries: dict[str, tuple[float, T]] = {}
+        self._lock = threading.Lock()
+        self.version = 0
+
+    def get(self, db: Session) -> T:
+        key = _bind_key(db)
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        version = self.version
+        value = self._loader(db)
+        with self._lock:
+            # Skip storing a value that was loaded across an invalidation.
+            if version == self.version:
+                self._entries[key] = (now + self._ttl_seconds, value)
+        return value
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.version += 1
+
+
+def _bind_key(db: Session) -> str:
+    return str(db.get_bind().url)
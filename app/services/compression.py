@@ -0,0 +1,110 @@
+"""Gzip compression for text responses above a size threshold."""
+
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from ..config import settings
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+def _accepts_gzip(scope) -> bool:
+    header = Headers(scope=scope).get("accept-encoding", "")
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        if coding.strip() not in ("gzip", "*"):
+            continue
+        name, _, value = params.strip().partition("=")
+        try:
+            return name != "q" or float(value) > 0
+        except ValueError:
+            return False
+    return False
+
+
+def _compressible(status: int, headers: Headers) -> bool:
+    # Precompressed static files already carry Content-Encoding; ranges refer
+    # to offsets in the uncompressed body.
+    if status in (204, 206, 304) or "content-encoding" in headers:
+        return False
+    return headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """Gzip text responses of at least ``COMPRESSION_MIN_BYTES``.
+
+    Smaller bodies are sent as they are; compressing them costs more than
+    it saves. Streaming responses are compressed chunk by chunk.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] == "HEAD"
+            or settings.compression_min_bytes <= 0
+            or not _accepts_gzip(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor = None
+
+        async def send_wrapper(message) -> None:
+            nonlocal start_message, compressor
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start_message is not None:
+                start, start_message = start_message, None
+                headers = MutableHeaders(scope=start)
+                if not _compressible(start["status"], headers) or (
+                    not more_body and len(body) < settings.compression_min_bytes
+                ):
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = zlib.compressobj(
+                    settings.compression_level, zlib.DEFLATED, zlib.MAX_WBITS | 16
+                )
+                data = compressor.compress(body)
+                if not more_body:
+                    data += compressor.flush()
+                    headers["Content-Length"] = str(len(data))
+                elif "content-length" in headers:
+                    del headers["Content-Length"]
+                headers["Content-Encoding"] = "gzip"
+                headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    # The bytes differ from the identity encoding.
+                    headers["ETag"] = f"W/{etag}"
+                await send(start)
+                await send({**message, "body": data})
+                return
+
+            if compressor is None:
+                await send(message)
+                return
+            data = compressor.compress(body)
+            if not more_body:
+                data += compressor.flush()
+            await send({**message, "body": data})
+
+        await self.app(scope, receive, send_wrapper)
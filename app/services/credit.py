@@ -0,0 +1,173 @@
+from dataclasses import dataclass
+from decimal import Decimal
+
+from sqlalchemy import and_, func, select, update
+from sqlalchemy.orm import Session
+
+from ..models import Customer, Invoice, Ticket, TicketStatusEnum
+
+ZERO = Decimal("0.00")
+SETTLED_INVOICE_STATUSES = ("PAID", "VOID")
+
+
+@dataclass(frozen=True, slots=True)
+class CreditStatus:
+    on_stop: bool
+    credit_limit: Decimal | None
+    exposure: Decimal
+
+    @property
+    def over_limit(self) -> bool:
+        return self.credit_limit is not None and self.exposure > self.credit_limit
+
+
+def credit_status(customer: Customer | None) -> CreditStatus | None:
+    """Read exposure from the customer's maintained balances (no aggregation)."""
+    if customer is None:
+        return None
+    return CreditStatus(
+        on_stop=bool(customer.on_stop),
+        credit_limit=customer.credit_limit,
+        exposure=(customer.uninvoiced_balance or ZERO)
+        + (customer.unpaid_invoice_balance or ZERO),
+    )
+
+
+def adjust_balances(
+    db: Session,
+    customer_id: int | None,
+    *,
+    uninvoiced: Decimal = ZERO,
+    unpaid_invoices: Decimal = ZERO,
+) -> None:
+    """Apply deltas with a single UPDATE so concurrent requests cannot lose one.
+
+    ``updated_at`` is left alone: it versions the customer record's own
+    fields, which pages and cached invoice PDFs revalidate against.
+    """
+    if not customer_id or (not uninvoiced and not unpaid_invoices):
+        return
+    db.execute(
+        update(Customer)
+        .where(Customer.id == customer_id)
+        .values(
+            uninvoiced_balance=Customer.uninvoiced_balance + uninvoiced,
+            unpaid_invoice_balance=Customer.unpaid_invoice_balance + unpaid_invoices,
+            updated_at=Customer.updated_at,
+        )
+    )
+
+
+def _ticket_exposure(ticket: Ticket) -> Decimal:
+    if ticket.dont_invoice or ticket.invoice_id or ticket.total is None:
+        return ZERO
+    return Decimal(str(ticket.total))
+
+
+def record_ticket_completed(db: Session, ticket: Ticket) -> None:
+    adjust_balances(db, ticket.customer_id, uninvoiced=_ticket_exposure(ticket))
+
+
+def record_ticket_voided(db: Session, ticket: Ticket, previous_status) -> None:
+    if previous_status != TicketStatusEnum.COMPLETE.value:
+        return
+    adjust_balances(db, ticket.customer_id, uninvoiced=-_ticket_exposure(ticket))
+
+
+def record_invoice_created(
+    db: Session, invoice: Invoice, invoiced_ticket_total: Decimal
+) -> None:
+    """Move the invoiced tickets' value from uninvoiced to unpaid invoices."""
+    adjust_balances(
+        db,
+        invoice.customer_id,
+        uninvoiced=-invoiced_ticket_total,
+        unpaid_invoices=invoice.gross_total or ZERO,
+    )
+
+
+def record_invoice_settled(db: Session, invoice: Invoice, previous_status: str) -> None:
+    """Drop an invoice from exposure when it is paid or voided."""
+    if previous_status in SETTLED_INVOICE_STATUSES:
+        return
+    adjust_balances(
+        db, invoice.customer_id, unpaid_invoices=-(invoice.gross_total or ZERO)
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class BalanceMismatch:
+    customer_id: int
+    account_code: str
+    uninvoiced_balance: Decimal
+    expected_uninvoiced: Decimal
+    unpaid_invoice_balance: Decimal
+    expected_unpaid_invoices: Decimal
+
+
+def reconcile_balances(db: Session, *, fix: bool = False) -> list[BalanceMismatch]:
+    """Recompute every balance from tickets and invoices and report drift.
+
+    With ``fix`` the stored balances are overwritten; the caller commits.
+    """
+    uninvoiced = (
+        select(func.coalesce(func.sum(Ticket.total), 0))
+        .where(
+            and_(
+                Ticket.customer_id == Customer.id,
+                Ticket.status == TicketStatusEnum.COMPLETE.value,
+                Ticket.invoice_id.is_(None),
+                Ticket.dont_invoice.is_(False),
+                Ticket.total.is_not(None),
+            )
+        )
+        .scalar_subquery()
+    )
+    unpaid = (
+        select(func.coalesce(func.sum(Invoice.gross_total), 0))
+        .where(
+            Invoice.customer_id == Customer.id,
+            Invoice.status.not_in(SETTLED_INVOICE_STATUSES),
+        )
+        .scalar_subquery()
+    )
+    rows = db.execute(
+        select(
+            Customer.id,
+            Customer.account_code,
+            Customer.uninvoiced_balance,
+            uninvoiced,
+            Customer.unpaid_invoice_balance,
+            unpaid,
+        ).order_by(Customer.id)
+    ).all()
+
+    mismatches = []
+    for row in rows:
+        stored_uninvoiced = Decimal(str(row[2] or 0)).quantize(ZERO)
+        expected_uninvoiced = Decimal(str(row[3] or 0)).quantize(ZERO)
+        stored_unpaid = Decimal(str(row[4] or 0)).quantize(ZERO)
+        expected_unpaid = Decimal(str(row[5] or 0)).quantize(ZERO)
+        if (stored_uninvoiced, stored_unpaid) == (expected_uninvoiced, expected_unpaid):
+            continue
+        mismatches.append(
+            BalanceMismatch(
+                customer_id=row[0],
+                account_code=row[1],
+                uninvoiced_balance=stored_uninvoiced,
+                expected_uninvoiced=expected_uninvoiced,
+                unpaid_invoice_balance=stored_unpaid,
+                expected_unpaid_invoices=expected_unpaid,
+            )
+        )
+        if fix:
+            db.execute(
+                update(Customer)
+                .where(Customer.id == row[0])
+                .values(
+                    uninvoiced_balance=expected_uninvoiced,
+                    unpaid_invoice_balance=expected_unpaid,
+                    updated_at=Customer.updated_at,
+                )
+            )
+    return mismatches
@@ -0,0 +1,134 @@
+import re
+import unicodedata
+
+from sqlalchemy import and_, delete, event, insert, or_, select
+from sqlalchemy.orm import Session
+
+from ..models import Customer, CustomerSearchTerm
+
+TERM_MAX_LENGTH = 100
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_search_text(value: str | None) -> str:
+    """Lowercase, strip accents and collapse punctuation to single spaces."""
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _NON_ALNUM.sub(" ", stripped.lower()).strip()
+
+
+def search_words(value: str | None) -> list[str]:
+    return [word[:TERM_MAX_LENGTH] for word in normalize_search_text(value).split()]
+
+
+def customer_search_terms(account_code: str | None, name: str | None) -> set[str]:
+    terms = set(search_words(account_code)) | set(search_words(name))
+    compact_code = normalize_search_text(account_code).replace(" ", "")
+    if compact_code:
+        terms.add(compact_code[:TERM_MAX_LENGTH])
+    return terms
+
+
+def customer_search_filter(q: str | None):
+    """Return a WHERE clause matching every query word as a term prefix."""
+    words = search_words(q)
+    if not words:
+        return None
+    clauses = [
+        Customer.id.in_(
+            select(CustomerSearchTerm.customer_id).where(
+                CustomerSearchTerm.term.like(f"{word}%")
+            )
+        )
+        for word in dict.fromkeys(words)
+    ]
+    return and_(*clauses)
+
+
+def customer_page(
+    db: Session,
+    *,
+    q: str | None = None,
+    after_id: int | None = None,
+    limit: int = 50,
+) -> tuple[list[Customer], int | None]:
+    """Fetch one keyset page ordered by (name, id).
+
+    Returns the page and the cursor for the next page, or None when the
+    page is the last one.
+    """
+    query = select(Customer).order_by(Customer.name, Customer.id)
+    search = customer_search_filter(q)
+    if search is not None:
+        query = query.where(search)
+    if after_id:
+        anchor = db.execute(
+            select(Customer.name).where(Customer.id == after_id)
+        ).scalar_one_or_none()
+        if anchor is not None:
+            query = query.where(
+                or_(
+                    Customer.name > anchor,
+                    and_(Customer.name == anchor, Customer.id > after_id),
+                )
+            )
+    rows = db.execute(query.limit(limit + 1)).scalars().all()
+    if len(rows) > limit:
+        return list(rows[:limit]), rows[limit - 1].id
+    return list(rows), None
+
+
+def selected_customer_options(
+    db: Session, customer_id: int | str | None
+) -> list[tuple[str, str]]:
+    """Return the (id, label) option for a picker's current value, if any."""
+    try:
+        customer_id = int(customer_id) if customer_id else None
+    except (TypeError, ValueError):
+        return []
+    if not customer_id:
+        return []
+    name = db.execute(
+        select(Customer.name).where(Customer.id == customer_id)
+    ).scalar_one_or_none()
+    if name is None:
+        return []
+    return [(str(customer_id), name)]
+
+
+def rebuild_customer_search_terms(db: Session) -> int:
+    db.execute(delete(CustomerSearchTerm))
+    rows = db.execute(select(Customer.id, Customer.account_code, Customer.name)).all()
+    values = [
+        {"customer_id": customer_id, "term": term}
+        for customer_id, account_code, name in rows
+        for term in customer_search_terms(account_code, name)
+    ]
+    if values:
+        db.execute(insert(CustomerSearchTerm), values)
+    return len(values)
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_customer_search_terms(session: Session, flush_context) -> None:
+    changed = [
+        obj
+        for obj in (*session.new, *session.dirty)
+        if isinstance(obj, Customer) and obj.id is not None
+    ]
+    if not changed:
+        return
+    connection = session.connection()
+    ids = [customer.id for customer in changed]
+    connection.execute(
+        delete(CustomerSearchTerm).where(CustomerSearchTerm.customer_id.in_(ids))
+    )
+    values = [
+        {"customer_id": customer.id, "term": term}
+        for customer in changed
+        for term in customer_search_terms(customer.account_code, customer.name)
+    ]
+    if values:
+        connection.execute(insert(CustomerSearchTerm), values)
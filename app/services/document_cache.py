@@ -0,0 +1,41 @@
+import os
+import tempfile
+from pathlib import Path
+
+from ..config import settings
+
+
+class DocumentCache:
+    """Rendered documents stored on disk, keyed by content fingerprint.
+
+    A key must change whenever the rendered output would change, so a cache
+    hit can be streamed straight from disk without re-rendering.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+
+    def path_for(self, kind: str, key: str, suffix: str) -> Path:
+        return self.root / kind / f"{key}{suffix}"
+
+    def get(self, kind: str, key: str, suffix: str) -> Path | None:
+        path = self.path_for(kind, key, suffix)
+        return path if path.is_file() else None
+
+    def store(self, kind: str, key: str, suffix: str, content: bytes) -> Path:
+        path = self.path_for(kind, key, suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file first so concurrent readers never see a partial file.
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(content)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        return path
+
+
+def get_document_cache() -> DocumentCache:
+    return DocumentCache(settings.document_cache_dir)
@@ -0,0 +1,456 @@
+import logging
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import (
+    String,
+    cast,
+    delete,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    union_all,
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models import (
+    Container,
+    Destination,
+    Driver,
+    Haulier,
+    IntegrityFinding,
+    IntegrityScanState,
+    Invoice,
+    InvoiceLine,
+    Product,
+    Ticket,
+    TicketVoid,
+    Unit,
+)
+from ..models.base import utcnow
+
+logger = logging.getLogger(__name__)
+
+ISSUE_LABELS = {
+    "negative_net": "Negative net weight",
+    "complete_missing_weights": "Complete ticket missing weights",
+    "net_mismatch": "Net does not equal gross minus tare",
+    "void_invoice_ticket": "Ticket linked to a void invoice",
+    "inactive_haulier": "Haulier inactive",
+    "inactive_driver": "Driver inactive",
+    "inactive_container": "Container inactive",
+    "inactive_destination": "Destination inactive",
+    "inactive_unit": "Unit inactive",
+    "inactive_product_unit": "Product unit inactive",
+    "invoice_totals_mismatch": "Invoice totals differ from lines",
+    "orphan_invoice_line": "Invoice line for a missing ticket",
+    "orphan_ticket_void": "Void record for a missing ticket",
+}
+# Checked in full on every scan: the delete that orphans a row leaves
+# nothing behind for an incremental scan to notice.
+ORPHAN_ISSUES = ("orphan_invoice_line", "orphan_ticket_void")
+NET_TOLERANCE_KG = 0.5
+SCAN_NAME = "integrity"
+# Rows committed just before a scan can carry an updated_at older than the
+# scan start, so each incremental run re-checks a short window behind it.
+WATERMARK_OVERLAP = timedelta(minutes=5)
+TICKET_FINDING_COLUMNS = [
+    "ticket_id",
+    "issue_code",
+    "detail",
+    "reference",
+    "occurred_at",
+]
+
+
+def _as_text(column):
+    return cast(column, String)
+
+
+def ticket_issues(*criteria):
+    """Every ticket rule as one UNION ALL of (ticket_id, issue_code, detail) rows.
+
+    ``criteria`` restrict the tickets checked (an id scope, a date range).
+    """
+
+    def rule(code: str, detail):
+        return select(
+            Ticket.id.label("ticket_id"),
+            literal(code).label("issue_code"),
+            detail.label("detail"),
+        ).where(*criteria)
+
+    def inactive(code: str, model, foreign_key):
+        return (
+            rule(code, model.name)
+            .join(model, foreign_key == model.id)
+            .where(model.is_active.is_(False))
+        )
+
+    return union_all(
+        rule(
+            "negative_net",
+            literal("gross ")
+            + _as_text(Ticket.gross_kg)
+            + literal(", tare ")
+            + _as_text(Ticket.tare_kg),
+        ).where(
+            Ticket.gross_kg.is_not(None),
+            Ticket.tare_kg.is_not(None),
+            Ticket.gross_kg < Ticket.tare_kg,
+        ),
+        rule("complete_missing_weights", literal("")).where(
+            Ticket.status == "COMPLETE",
+            or_(Ticket.gross_kg.is_(None), Ticket.tare_kg.is_(None)),
+        ),
+        rule(
+            "net_mismatch",
+            literal("net ")
+            + _as_text(Ticket.net_kg)
+            + literal(", gross - tare ")
+            + _as_text(Ticket.gross_kg - Ticket.tare_kg),
+        ).where(
+            Ticket.net_kg.is_not(None),
+            Ticket.gross_kg.is_not(None),
+            Ticket.tare_kg.is_not(None),
+            func.abs(Ticket.net_kg - (Ticket.gross_kg - Ticket.tare_kg))
+            > NET_TOLERANCE_KG,
+        ),
+        rule("void_invoice_ticket", Invoice.invoice_no)
+        .join(Invoice, Ticket.invoice_id == Invoice.id)
+        .where(Invoice.status == "VOID"),
+        inactive("inactive_haulier", Haulier, Ticket.haulier_id),
+        inactive("inactive_driver", Driver, Ticket.driver_id),
+        inactive("inactive_container", Container, Ticket.container_id),
+        inactive("inactive_destination", Destination, Ticket.destination_id),
+        inactive("inactive_unit", Unit, Ticket.unit_id),
+        rule(
+            "inactive_product_unit",
+            Product.code + literal(" (") + Unit.name + literal(")"),
+        )
+        .join(Product, Ticket.product_id == Product.id)
+        .join(Unit, Product.unit_id == Unit.id)
+        .where(Unit.is_active.is_(False)),
+    ).subquery("ticket_issues")
+
+
+def invoice_issues(*criteria):
+    """Invoices whose header totals disagree with the sum of their lines."""
+    lines = (
+        select(
+            InvoiceLine.invoice_id,
+            func.sum(InvoiceLine.net).label("net"),
+            func.sum(InvoiceLine.vat).label("vat"),
+            func.sum(InvoiceLine.gross).label("gross"),
+        )
+        .group_by(InvoiceLine.invoice_id)
+        .subquery()
+    )
+    line_net = func.coalesce(lines.c.net, 0)
+    line_vat = func.coalesce(lines.c.vat, 0)
+    line_gross = func.coalesce(lines.c.gross, 0)
+    return (
+        select(
+            Invoice.id.label("invoice_id"),
+            literal("invoice_totals_mismatch").label("issue_code"),
+            (
+                literal("net ")
+                + _as_text(Invoice.net_total)
+                + literal(" vs lines ")
+                + _as_text(line_net)
+                + literal(", gross ")
+                + _as_text(Invoice.gross_total)
+                + literal(" vs lines ")
+                + _as_text(line_gross)
+            ).label("detail"),
+        )
+        .outerjoin(lines, lines.c.invoice_id == Invoice.id)
+        .where(
+            or_(
+                Invoice.net_total != line_net,
+                Invoice.vat_total != line_vat,
+                Invoice.gross_total != line_gross,
+            ),
+            *criteria,
+        )
+        .subquery("invoice_issues")
+    )
+
+
+def orphan_findings(db: Session) -> list[dict]:
+    """Invoice lines and voids pointing at a ticket that no longer exists.
+
+    Nothing else enforces this on PostgreSQL, where partitioned tickets
+    cannot be the target of a foreign key.
+    """
+
+    def missing(ticket_id):
+        return ~select(Ticket.id).where(Ticket.id == ticket_id).exists()
+
+    lines = db.execute(
+        select(
+            InvoiceLine.id,
+            InvoiceLine.ticket_id,
+            Invoice.id,
+            Invoice.invoice_no,
+            Invoice.invoice_date,
+        )
+        .join(Invoice, Invoice.id == InvoiceLine.invoice_id)
+        .where(InvoiceLine.ticket_id.is_not(None), missing(InvoiceLine.ticket_id))
+    )
+    voids = db.execute(
+        select(TicketVoid.id, TicketVoid.ticket_id, TicketVoid.voided_at).where(
+            missing(TicketVoid.ticket_id)
+        )
+    )
+    return [
+        {
+            "invoice_id": invoice_id,
+            "issue_code": "orphan_invoice_line",
+            "detail": f"line {line_id}, ticket {ticket_id}",
+            "reference": invoice_no,
+            "occurred_at": datetime.combine(invoice_date, time.min)
+            if invoice_date
+            else None,
+        }
+        for line_id, ticket_id, invoice_id, invoice_no, invoice_date in lines
+    ] + [
+        {
+            "invoice_id": None,
+            "issue_code": "orphan_ticket_void",
+            "detail": f"ticket {ticket_id}",
+            "reference": f"Void {void_id}",
+            "occurred_at": voided_at,
+        }
+        for void_id, ticket_id, voided_at in voids
+    ]
+
+
+def _changed_ticket_ids(since: datetime):
+    """Tickets edited since ``since`` or pointing at something that was."""
+
+    # The scopes are embedded in rule queries that select from the same
+    # tables, so correlation is switched off to keep them self-contained.
+    def changed(model):
+        return select(model.id).where(model.updated_at > since).correlate(None)
+
+    changed_units = changed(Unit)
+    changed_products = select(Product.id).where(
+        or_(Product.updated_at > since, Product.unit_id.in_(changed_units))
+    )
+    return (
+        select(Ticket.id)
+        .where(
+            or_(
+                Ticket.updated_at > since,
+                Ticket.haulier_id.in_(changed(Haulier)),
+                Ticket.driver_id.in_(changed(Driver)),
+                Ticket.container_id.in_(changed(Container)),
+                Ticket.destination_id.in_(changed(Destination)),
+                Ticket.unit_id.in_(changed_units),
+                Ticket.product_id.in_(changed_products.correlate(None)),
+                Ticket.invoice_id.in_(changed(Invoice)),
+            )
+        )
+        .correlate(None)
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class ScanResult:
+    full: bool
+    watermark: datetime
+    findings: int
+
+
+def _lock_scan_state(db: Session) -> IntegrityScanState | None:
+    """Lock the scan state row for this transaction, creating it if needed.
+
+    Returns None when another process holds the lock, i.e. is scanning.
+    """
+    state = db.execute(
+        select(IntegrityScanState)
+        .where(IntegrityScanState.name == SCAN_NAME)
+        .with_for_update(skip_locked=True)
+    ).scalar_one_or_none()
+    if state is not None:
+        return state
+    exists = db.execute(
+        select(IntegrityScanState.name).where(IntegrityScanState.name == SCAN_NAME)
+    ).first()
+    if exists:
+        return None
+    state = IntegrityScanState(name=SCAN_NAME)
+    try:
+        # A concurrent first run blocks on the key until the other commits.
+        with db.begin_nested():
+            db.add(state)
+    except IntegrityError:
+        return None
+    return state
+
+
+def run_integrity_scan(db: Session, *, full: bool = False) -> ScanResult | None:
+    """Refresh stored findings for everything changed since the last scan.
+
+    The first run (or ``full``) checks every ticket and invoice. Findings for
+    the rechecked rows are replaced in the same transaction; the caller
+    commits. The scan state row stays locked until then, so a scan started
+    meanwhile by another worker or the CLI returns None without scanning.
+    """
+    started = utcnow()
+    state = _lock_scan_state(db)
+    if state is None:
+        logger.info("Integrity scan skipped: another scan is running")
+        return None
+    full = full or state.watermark is None
+
+    if full:
+        ticket_scope: list = []
+        invoice_scope: list = []
+        db.execute(delete(IntegrityFinding))
+    else:
+        since = state.watermark - WATERMARK_OVERLAP
+        ticket_ids = _changed_ticket_ids(since)
+        invoice_ids = (
+            select(Invoice.id).where(Invoice.updated_at > since).correlate(None)
+        )
+        ticket_scope = [Ticket.id.in_(ticket_ids)]
+        invoice_scope = [Invoice.id.in_(invoice_ids)]
+        db.execute(
+            delete(IntegrityFinding).where(IntegrityFinding.ticket_id.in_(ticket_ids))
+        )
+        db.execute(
+            delete(IntegrityFinding).where(
+                IntegrityFinding.invoice_id.in_(invoice_ids)
+            )
+        )
+
+    tickets = ticket_issues(*ticket_scope)
+    ticket_rows = db.execute(
+        insert(IntegrityFinding).from_select(
+            TICKET_FINDING_COLUMNS,
+            select(
+                tickets.c.ticket_id,
+                tickets.c.issue_code,
+                tickets.c.detail,
+                Ticket.ticket_no,
+                Ticket.datetime,
+            ).join(Ticket, Ticket.id == tickets.c.ticket_id),
+        )
+    ).rowcount
+    invoices = invoice_issues(*invoice_scope)
+    invoice_rows = [
+        {
+            "invoice_id": invoice_id,
+            "issue_code": issue_code,
+            "detail": detail,
+            "reference": invoice_no,
+            "occurred_at": datetime.combine(invoice_date, time.min),
+        }
+        for invoice_id, issue_code, detail, invoice_no, invoice_date in db.execute(
+            select(
+                invoices.c.invoice_id,
+                invoices.c.issue_code,
+                invoices.c.detail,
+                Invoice.invoice_no,
+                Invoice.invoice_date,
+            ).join(Invoice, Invoice.id == invoices.c.invoice_id)
+        )
+    ]
+    if invoice_rows:
+        db.execute(insert(IntegrityFinding), invoice_rows)
+    db.execute(
+        delete(IntegrityFinding).where(IntegrityFinding.issue_code.in_(ORPHAN_ISSUES))
+    )
+    orphan_rows = orphan_findings(db)
+    if orphan_rows:
+        db.execute(insert(IntegrityFinding), orphan_rows)
+
+    state.watermark = started
+    state.last_run_at = utcnow()
+    state.last_findings = db.execute(
+        select(func.count()).select_from(IntegrityFinding)
+    ).scalar_one()
+    db.flush()
+    logger.info(
+        "Integrity scan (%s) rechecked findings: %s ticket, %s invoice, %s orphan",
+        "full" if full else "incremental",
+        ticket_rows,
+        len(invoice_rows),
+        len(orphan_rows),
+    )
+    return ScanResult(full=full, watermark=started, findings=state.last_findings)
+
+
+def findings_page(
+    db: Session,
+    *,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    issue: str | None = None,
+    page: int = 1,
+    page_size: int = 50,
+) -> tuple[dict[str, int], list[IntegrityFinding]]:
+    """Return per-issue counts and one page of stored findings."""
+    # Date filters are interpreted in server-local time (UTC by default).
+    filters = []
+    if date_from:
+        filters.append(
+            IntegrityFinding.occurred_at >= datetime.combine(date_from, time.min)
+        )
+    if date_to:
+        end_exclusive = datetime.combine(date_to + timedelta(days=1), time.min)
+        filters.append(IntegrityFinding.occurred_at < end_exclusive)
+
+    counts = {code: 0 for code in ISSUE_LABELS}
+    counts.update(
+        db.execute(
+            select(IntegrityFinding.issue_code, func.count())
+            .where(*filters)
+            .group_by(IntegrityFinding.issue_code)
+        ).all()
+    )
+    query = select(IntegrityFinding).where(*filters)
+    if issue:
+        query = query.where(IntegrityFinding.issue_code == issue)
+    findings = (
+        db.execute(
+            query.order_by(
+                IntegrityFinding.occurred_at.desc(), IntegrityFinding.id.desc()
+            )
+            .limit(page_size)
+            .offset((page - 1) * page_size)
+        )
+        .scalars()
+        .all()
+    )
+    return counts, list(findings)
+
+
+def last_scan(db: Session) -> IntegrityScanState | None:
+    return db.get(IntegrityScanState, SCAN_NAME)
+
+
+def start_integrity_scheduler(
+    session_factory: Callable[[], Session], interval_seconds: float
+) -> threading.Event:
+    """Run incremental scans on a daemon thread until the returned event is set."""
+    stop = threading.Event()
+
+    def loop() -> None:
+        while not stop.wait(interval_seconds):
+            try:
+                with session_factory() as session:
+                    run_integrity_scan(session)
+                    session.commit()
+            except Exception:
+                logger.exception("Integrity scan failed")
+
+    threading.Thread(target=loop, name="integrity-scanner", daemon=True).start()
+    return stop
@@ -0,0 +1,193 @@
+import hashlib
+from decimal import Decimal
+
+from ..models import Invoice
+from .pdf import A4, PdfText, build_pdf
+
+# Bump when the layout changes so cached PDFs are re-rendered.
+LAYOUT_VERSION = "1"
+LINES_PER_PAGE = 40
+DESCRIPTION_CHARS = 48
+
+
+def invoice_fingerprint(invoice: Invoice) -> str:
+    """Hash of everything printed on the invoice.
+
+    Built from the printed fields rather than ``updated_at``, so saves that
+    change nothing on the page (a customer's running balances, say) keep the
+    cached PDF.
+    """
+    customer = invoice.customer
+    parts = [
+        LAYOUT_VERSION,
+        str(invoice.id),
+        invoice.invoice_no,
+        invoice.status,
+        invoice.invoice_date.isoformat() if invoice.invoice_date else "",
+        invoice.paid_at.isoformat() if invoice.paid_at else "",
+        str(invoice.net_total),
+        str(invoice.vat_total),
+        str(invoice.gross_total),
+    ]
+    if customer:
+        parts.extend(
+            str(value or "")
+            for value in (
+                customer.account_code,
+                customer.name,
+                customer.vat_number,
+                customer.address_line1,
+                customer.address_line2,
+                customer.city,
+                customer.postcode,
+                customer.country,
+            )
+        )
+    for line in invoice.lines:
+        parts.extend(
+            [
+                str(line.id),
+                line.description,
+                str(line.quantity),
+                str(line.unit_price),
+                str(line.gross),
+            ]
+        )
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:32]
+
+
+def invoice_document_data(invoice: Invoice) -> dict:
+    """Plain, picklable snapshot of an invoice for the render workers."""
+    customer = invoice.customer
+    address = []
+    if customer:
+        address = [
+            value
+            for value in (
+                customer.address_line1,
+                customer.address_line2,
+                customer.city,
+                customer.postcode,
+                customer.country,
+            )
+            if value
+        ]
+    return {
+        "invoice_no": invoice.invoice_no,
+        "invoice_date": invoice.invoice_date.strftime("%d/%m/%Y")
+        if invoice.invoice_date
+        else "",
+        "status": invoice.status,
+        "paid_at": invoice.paid_at.strftime("%d/%m/%Y") if invoice.paid_at else "",
+        "customer_name": customer.name if customer else "",
+        "account_code": customer.account_code if customer else "",
+        "vat_number": customer.vat_number if customer and customer.vat_number else "",
+        "address": address,
+        "lines": [
+            {
+                "description": line.description,
+                "quantity": _format_qty(line.quantity),
+                "unit_price": _format_money(line.unit_price),
+                "net": _format_money(line.net),
+                "vat": _format_money(line.vat),
+                "gross": _format_money(line.gross),
+            }
+            for line in invoice.lines
+        ],
+        "net_total": _format_money(invoice.net_total),
+        "vat_total": _format_money(invoice.vat_total),
+        "gross_total": _format_money(invoice.gross_total),
+    }
+
+
+def render_invoice_pdf(data: dict) -> bytes:
+    lines = data["lines"]
+    chunks = [
+        lines[start : start + LINES_PER_PAGE]
+        for start in range(0, len(lines), LINES_PER_PAGE)
+    ] or [[]]
+    pages = []
+    for number, chunk in enumerate(chunks, start=1):
+        texts = _header(data, number, len(chunks))
+        y = 560.0
+        for line in chunk:
+            texts.extend(_line_row(line, y))
+            y -= 12
+        if number == len(chunks):
+            texts.extend(_totals(data, y - 12))
+        pages.append(texts)
+    return build_pdf(pages, page_size=A4)
+
+
+def _header(data: dict, page: int, page_count: int) -> list[PdfText]:
+    texts = [
+        PdfText(40, 790, "INVOICE", size=20, bold=True),
+        PdfText(400, 796, f"Invoice no: {data['invoice_no']}", bold=True),
+        PdfText(400, 782, f"Date: {data['invoice_date']}"),
+        PdfText(400, 768, f"Status: {data['status']}"),
+        PdfText(40, 740, data["customer_name"], size=12, bold=True),
+        PdfText(40, 726, f"Account: {data['account_code']}"),
+    ]
+    y = 712.0
+    for value in data["address"]:
+        texts.append(PdfText(40, y, value))
+        y -= 12
+    if data["vat_number"]:
+        texts.append(PdfText(40, y, f"VAT no: {data['vat_number']}"))
+    if data["paid_at"]:
+        texts.append(PdfText(400, 754, f"Paid: {data['paid_at']}"))
+    texts.append(PdfText(500, 30, f"Page {page} of {page_count}", size=8))
+
+    for x, label in _COLUMNS:
+        texts.append(PdfText(x, 580, label, size=9, bold=True))
+    return texts
+
+
+_COLUMNS = (
+    (40, "Description"),
+    (300, "Qty"),
+    (350, "Unit price"),
+    (415, "Net"),
+    (465, "VAT"),
+    (515, "Gross"),
+)
+
+
+def _line_row(line: dict, y: float) -> list[PdfText]:
+    description = line["description"]
+    if len(description) > DESCRIPTION_CHARS:
+        description = description[: DESCRIPTION_CHARS - 3] + "..."
+    values = (
+        description,
+        line["quantity"],
+        line["unit_price"],
+        line["net"],
+        line["vat"],
+        line["gross"],
+    )
+    return [
+        PdfText(x, y, value, size=9) for (x, _), value in zip(_COLUMNS, values)
+    ]
+
+
+def _totals(data: dict, y: float) -> list[PdfText]:
+    return [
+        PdfText(400, y, "Net total:", bold=True),
+        PdfText(500, y, data["net_total"]),
+        PdfText(400, y - 14, "VAT total:", bold=True),
+        PdfText(500, y - 14, data["vat_total"]),
+        PdfText(400, y - 28, "Gross total:", bold=True),
+        PdfText(500, y - 28, data["gross_total"]),
+    ]
+
+
+def _format_money(value) -> str:
+    if value is None:
+        return ""
+    return f"{Decimal(str(value)):.2f}"
+
+
+def _format_qty(value) -> str:
+    if value is None:
+        return ""
+    return f"{Decimal(str(value)).normalize():f}"
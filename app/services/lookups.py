@@ -0,0 +1,497 @@
+import re
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from functools import partial
+
+from sqlalchemy import (
+    bindparam,
+    delete,
+    event,
+    func,
+    insert,
+    inspect,
+    literal,
+    select,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ..models import (
+    Area,
+    Container,
+    Contractor,
+    CostCenter,
+    Customer,
+    Destination,
+    Driver,
+    Haulier,
+    HazCode,
+    Invoice,
+    InvoiceFrequency,
+    InvoiceVoid,
+    Licence,
+    LookupUsageCount,
+    NominalCode,
+    PaymentMethod,
+    Product,
+    ProductGroup,
+    Recycler,
+    SICCode,
+    Supplier,
+    TaxRate,
+    Ticket,
+    TicketVoid,
+    VehicleType,
+    VoidReason,
+    WasteCode,
+    WasteProducer,
+    Yard,
+)
+from ..models.base import track_previous_values
+from .cache import BindCache
+from .product_catalog import invalidate_product_catalog
+from .reference_data import invalidate_reference_data
+
+
+@dataclass(frozen=True, slots=True)
+class LookupField:
+    name: str
+    label: str
+    max_length: int | None = None
+    required: bool = False
+    numeric: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class LookupUsage:
+    """A foreign key column that keeps a lookup row from being deactivated."""
+
+    column: object
+    noun: str
+
+    @property
+    def source(self) -> str:
+        return self.column.class_.__tablename__
+
+
+@dataclass(frozen=True, slots=True)
+class LookupSpec:
+    """Declarative description of one lookup table and its admin pages.
+
+    The first field is the unique, searchable key the list is sorted by.
+    ``on_change`` clears other caches built from the table after a write.
+    """
+
+    slug: str
+    singular: str
+    plural: str
+    model: type
+    fields: tuple[LookupField, ...]
+    usages: tuple[LookupUsage, ...] = ()
+    on_change: tuple[Callable[[], None], ...] = ()
+
+    @property
+    def base_path(self) -> str:
+        return f"/lookups/{self.slug}"
+
+    @property
+    def table(self) -> str:
+        return self.model.__tablename__
+
+    @property
+    def key_field(self) -> LookupField:
+        return self.fields[0]
+
+    def column(self, name: str):
+        return getattr(self.model, name)
+
+
+@dataclass(frozen=True, slots=True)
+class LookupRow:
+    id: int
+    is_active: bool
+    values: tuple
+
+    @property
+    def label(self) -> str:
+        return self.values[0]
+
+
+@dataclass
+class LookupActivation:
+    changed: list[int] = field(default_factory=list)
+    blocked: dict[int, str] = field(default_factory=dict)
+
+
+NAME_FIELDS = (LookupField("name", "Name", max_length=120, required=True),)
+DESCRIBED_FIELDS = (
+    LookupField("name", "Name", max_length=150, required=True),
+    LookupField("description", "Description", max_length=255),
+)
+CODE_FIELDS = (
+    LookupField("code", "Code", max_length=50, required=True),
+    LookupField("description", "Description", max_length=255),
+)
+
+
+def _named(slug, singular, plural, model, *usages) -> LookupSpec:
+    return LookupSpec(slug, singular, plural, model, NAME_FIELDS, usages)
+
+
+def _described(slug, singular, plural, model, *usages) -> LookupSpec:
+    return LookupSpec(slug, singular, plural, model, DESCRIBED_FIELDS, usages)
+
+
+def _coded(
+    slug, singular, plural, model, *usages, extra=(), on_change=()
+) -> LookupSpec:
+    return LookupSpec(
+        slug, singular, plural, model, CODE_FIELDS + extra, usages, on_change
+    )
+
+
+LOOKUP_SPECS = (
+    _named(
+        "hauliers",
+        "Haulier",
+        "Hauliers",
+        Haulier,
+        LookupUsage(Ticket.haulier_id, "tickets"),
+    ),
+    _named(
+        "drivers",
+        "Driver",
+        "Drivers",
+        Driver,
+        LookupUsage(Ticket.driver_id, "tickets"),
+    ),
+    _named(
+        "containers",
+        "Container",
+        "Containers",
+        Container,
+        LookupUsage(Ticket.container_id, "tickets"),
+    ),
+    _named(
+        "destinations",
+        "Destination",
+        "Destinations",
+        Destination,
+        LookupUsage(Ticket.destination_id, "tickets"),
+    ),
+    _coded("yards", "Yard", "Yards", Yard, LookupUsage(Ticket.yard_id, "tickets")),
+    _coded("areas", "Area", "Areas", Area, LookupUsage(Ticket.area_id, "tickets")),
+    _coded(
+        "waste-codes",
+        "Waste code",
+        "Waste codes",
+        WasteCode,
+        LookupUsage(Ticket.waste_code_id, "tickets"),
+        LookupUsage(Product.default_waste_code_id, "products"),
+        on_change=(invalidate_product_catalog,),
+    ),
+    _coded("haz-codes", "Hazard code", "Hazard codes", HazCode),
+    _coded("sic-codes", "SIC code", "SIC codes", SICCode),
+    _coded(
+        "licences",
+        "Licence",
+        "Licences",
+        Licence,
+        LookupUsage(Ticket.licence_id, "tickets"),
+    ),
+    _described(
+        "waste-producers",
+        "Waste producer",
+        "Waste producers",
+        WasteProducer,
+        LookupUsage(Ticket.waste_producer_id, "tickets"),
+    ),
+    _described("recyclers", "Recycler", "Recyclers", Recycler),
+    _described("suppliers", "Supplier", "Suppliers", Supplier),
+    _described("contractors", "Contractor", "Contractors", Contractor),
+    _coded(
+        "tax-rates",
+        "Tax rate",
+        "Tax rates",
+        TaxRate,
+        LookupUsage(Product.tax_rate_id, "products"),
+        extra=(LookupField("rate_percent", "Rate %", numeric=True),),
+        on_change=(invalidate_product_catalog,),
+    ),
+    _coded(
+        "payment-methods",
+        "Payment method",
+        "Payment methods",
+        PaymentMethod,
+        LookupUsage(Invoice.payment_method_id, "invoices"),
+        on_change=(invalidate_reference_data,),
+    ),
+    _coded(
+        "nominal-codes",
+        "Nominal code",
+        "Nominal codes",
+        NominalCode,
+        LookupUsage(Product.nominal_code_id, "products"),
+    ),
+    _coded("cost-centers", "Cost centre", "Cost centres", CostCenter),
+    _coded(
+        "invoice-frequencies",
+        "Invoice frequency",
+        "Invoice frequencies",
+        InvoiceFrequency,
+        LookupUsage(Customer.invoice_frequency_id, "customers"),
+    ),
+    _coded(
+        "void-reasons",
+        "Void reason",
+        "Void reasons",
+        VoidReason,
+        LookupUsage(TicketVoid.reason_id, "ticket voids"),
+        LookupUsage(InvoiceVoid.reason_id, "invoice voids"),
+        on_change=(invalidate_reference_data,),
+    ),
+    _coded("vehicle-types", "Vehicle type", "Vehicle types", VehicleType),
+    _coded(
+        "product-groups",
+        "Product group",
+        "Product groups",
+        ProductGroup,
+        LookupUsage(Product.group_id, "products"),
+    ),
+)
+LOOKUPS = {spec.slug: spec for spec in LOOKUP_SPECS}
+
+
+def _load_rows(spec: LookupSpec, db: Session) -> tuple[LookupRow, ...]:
+    key = spec.column(spec.key_field.name)
+    rows = db.execute(
+        select(
+            spec.model.id,
+            spec.model.is_active,
+            *(spec.column(lookup_field.name) for lookup_field in spec.fields),
+        ).order_by(func.lower(key), spec.model.id)
+    ).all()
+    return tuple(
+        LookupRow(id=row[0], is_active=bool(row[1]), values=tuple(row[2:]))
+        for row in rows
+    )
+
+
+_row_caches = {spec.slug: BindCache(partial(_load_rows, spec)) for spec in LOOKUP_SPECS}
+
+
+def lookup_rows(
+    db: Session, spec: LookupSpec, *, q: str | None = None, hide_inactive: bool = True
+) -> list[LookupRow]:
+    """Filter the cached rows for a lookup list page."""
+    needle = (q or "").strip().lower()
+    return [
+        row
+        for row in _row_caches[spec.slug].get(db)
+        if (row.is_active or not hide_inactive)
+        and (
+            not needle
+            or any(needle in str(value).lower() for value in row.values if value)
+        )
+    ]
+
+
+def invalidate_lookups(spec: LookupSpec | None = None) -> None:
+    specs = LOOKUP_SPECS if spec is None else (spec,)
+    hooks = []
+    for changed in specs:
+        _row_caches[changed.slug].invalidate()
+        for hook in changed.on_change:
+            if hook not in hooks:
+                hooks.append(hook)
+    for hook in hooks:
+        hook()
+
+
+def lookups_in_use(db: Session, spec: LookupSpec, ids) -> dict[int, str]:
+    """Map each referenced id to the first usage noun, read from the counters."""
+    ids = set(ids)
+    if not ids or not spec.usages:
+        return {}
+    referenced = db.execute(
+        select(LookupUsageCount.lookup_id, LookupUsageCount.source).where(
+            LookupUsageCount.lookup == spec.table,
+            LookupUsageCount.lookup_id.in_(ids),
+            LookupUsageCount.usage_count > 0,
+        )
+    ).all()
+    in_use: dict[int, str] = {}
+    for usage in spec.usages:
+        for lookup_id, source in referenced:
+            if source == usage.source:
+                in_use.setdefault(lookup_id, usage.noun)
+    return in_use
+
+
+def lookup_usage_totals(db: Session, spec: LookupSpec) -> dict[int, int]:
+    """Return how many records reference each row of a lookup."""
+    return dict(
+        db.execute(
+            select(LookupUsageCount.lookup_id, func.sum(LookupUsageCount.usage_count))
+            .where(LookupUsageCount.lookup == spec.table)
+            .group_by(LookupUsageCount.lookup_id)
+        ).all()
+    )
+
+
+def usage_error(noun: str) -> str:
+    return f"Cannot deactivate: in use by {noun}."
+
+
+def set_active(db: Session, spec: LookupSpec, ids, active: bool) -> LookupActivation:
+    """Activate or deactivate many rows with one UPDATE; the caller commits.
+
+    Rows still referenced elsewhere are left active and reported in
+    ``blocked``.
+    """
+    result = LookupActivation()
+    wanted = {int(lookup_id) for lookup_id in ids}
+    if not active:
+        result.blocked = lookups_in_use(db, spec, wanted)
+        wanted -= result.blocked.keys()
+    if not wanted:
+        return result
+    result.changed = list(
+        db.execute(
+            update(spec.model)
+            .where(spec.model.id.in_(wanted), spec.model.is_active.is_not(active))
+            .values(is_active=active)
+            .returning(spec.model.id)
+        ).scalars()
+    )
+    return result
+
+
+def parse_lookup_form(
+    db: Session, spec: LookupSpec, form, current_id: int | None = None
+) -> tuple[dict, str | None]:
+    """Normalise submitted values and return them with the first error."""
+    values: dict = {}
+    for lookup_field in spec.fields:
+        raw = re.sub(r"\s+", " ", str(form.get(lookup_field.name, "")).strip())
+        if not raw:
+            if lookup_field.required:
+                return values | {lookup_field.name: raw}, (
+                    f"{lookup_field.label} is required."
+                )
+            values[lookup_field.name] = None
+            continue
+        if lookup_field.numeric:
+            try:
+                values[lookup_field.name] = Decimal(raw)
+            except InvalidOperation:
+                return values | {lookup_field.name: raw}, (
+                    f"{lookup_field.label} must be a number."
+                )
+            continue
+        values[lookup_field.name] = raw
+        if lookup_field.max_length and len(raw) > lookup_field.max_length:
+            return values, (
+                f"{lookup_field.label} must be {lookup_field.max_length} "
+                "characters or fewer."
+            )
+
+    key = spec.key_field
+    duplicate = select(spec.model.id).where(
+        func.lower(spec.column(key.name)) == func.lower(values[key.name])
+    )
+    if current_id is not None:
+        duplicate = duplicate.where(spec.model.id != current_id)
+    if db.execute(duplicate.limit(1)).first():
+        return values, f"{key.label} already exists."
+    return values, None
+
+
+# Usage counters: (source class) -> [(attribute, lookup table, source table)].
+_TRACKED_REFERENCES: dict[type, list[tuple[str, str, str]]] = {}
+for _spec in LOOKUP_SPECS:
+    for _usage in _spec.usages:
+        _TRACKED_REFERENCES.setdefault(_usage.column.class_, []).append(
+            (_usage.column.key, _spec.table, _usage.source)
+        )
+
+
+for _usage_class, _references in _TRACKED_REFERENCES.items():
+    track_previous_values(
+        *(getattr(_usage_class, attribute) for attribute, _, _ in _references)
+    )
+
+
+def _reference_deltas(session: Session) -> Counter:
+    deltas: Counter = Counter()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        references = _TRACKED_REFERENCES.get(type(obj), ())
+        for attribute, lookup, source in references:
+            history = inspect(obj).attrs[attribute].history
+            if obj in session.deleted:
+                removed, added = history.unchanged or history.deleted, ()
+            else:
+                removed, added = history.deleted, history.added
+            for value in removed:
+                if value is not None:
+                    deltas[(lookup, value, source)] -= 1
+            for value in added:
+                if value is not None:
+                    deltas[(lookup, value, source)] += 1
+    return deltas
+
+
+def _upsert(dialect_name: str):
+    return (postgresql if dialect_name == "postgresql" else sqlite).insert
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_lookup_usage(session: Session, flush_context) -> None:
+    deltas = [
+        {"lookup": lookup, "lookup_id": lookup_id, "source": source, "delta": delta}
+        for (lookup, lookup_id, source), delta in _reference_deltas(session).items()
+        if delta
+    ]
+    if not deltas:
+        return
+    connection = session.connection()
+    statement = _upsert(connection.dialect.name)(LookupUsageCount).values(
+        lookup=bindparam("lookup"),
+        lookup_id=bindparam("lookup_id"),
+        source=bindparam("source"),
+        usage_count=bindparam("delta"),
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=["lookup", "lookup_id", "source"],
+        set_={"usage_count": LookupUsageCount.usage_count + statement.excluded.usage_count},
+    )
+    connection.execute(statement, deltas)
+
+
+def rebuild_lookup_usage(db: Session) -> int:
+    """Recount every reference from scratch; the caller commits.
+
+    Needed after bulk SQL that bypasses the ORM flush hook.
+    """
+    db.execute(delete(LookupUsageCount))
+    for spec in LOOKUP_SPECS:
+        for usage in spec.usages:
+            db.execute(
+                insert(LookupUsageCount).from_select(
+                    ["lookup", "lookup_id", "source", "usage_count"],
+                    select(
+                        literal(spec.table),
+                        usage.column,
+                        literal(usage.source),
+                        func.count(),
+                    )
+                    .where(usage.column.is_not(None))
+                    .group_by(usage.column),
+                )
+            )
+    return db.execute(
+        select(func.count()).select_from(LookupUsageCount)
+    ).scalar_one()
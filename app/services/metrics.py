@@ -0,0 +1,239 @@
+"""Process-local Prometheus metrics.
+
+Every thread records into its own shard, so the request path never takes a
+lock; ``/metrics`` sums the shards when it is scraped.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+import jinja2
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+HISTOGRAMS = {
+    "http_request_duration_seconds": "Request latency by route.",
+    "db_statement_duration_seconds": "SQL statement time by route.",
+    "db_statements_per_request": "SQL statements issued per request.",
+    "template_render_duration_seconds": "Jinja template render time.",
+    "weight_capture_duration_seconds": "Time to record a captured weight.",
+}
+STATEMENT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+COUNTERS = {
+    "http_requests_total": "Requests served by route and status.",
+    "db_statements_total": "SQL statements executed by route.",
+}
+GAUGES = {"http_requests_in_flight": "Requests currently being served."}
+
+
+class _Shard:
+    __slots__ = ("counters", "histograms")
+
+    def __init__(self) -> None:
+        self.counters: dict[tuple, float] = defaultdict(float)
+        # key -> [bucket counts..., +Inf count, sum]
+        self.histograms: dict[tuple, list[float]] = {}
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._shards: list[_Shard] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def inc(self, name: str, labels: tuple = (), amount: float = 1.0) -> None:
+        self._shard().counters[(name, labels)] += amount
+
+    def observe(
+        self,
+        name: str,
+        value: float,
+        labels: tuple = (),
+        buckets: tuple = LATENCY_BUCKETS,
+    ) -> None:
+        histograms = self._shard().histograms
+        key = (name, labels, buckets)
+        series = histograms.get(key)
+        if series is None:
+            series = histograms[key] = [0.0] * (len(buckets) + 2)
+        series[bisect_left(buckets, value)] += 1
+        series[-1] += value
+
+    def reset(self) -> None:
+        with self._shards_lock:
+            for shard in self._shards:
+                shard.counters.clear()
+                shard.histograms.clear()
+
+    def snapshot(self) -> tuple[dict, dict]:
+        counters: dict[tuple, float] = defaultdict(float)
+        histograms: dict[tuple, list[float]] = {}
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for key, value in list(shard.counters.items()):
+                counters[key] += value
+            for key, series in list(shard.histograms.items()):
+                total = histograms.setdefault(key, [0.0] * len(series))
+                for index, value in enumerate(series):
+                    total[index] += value
+        return counters, histograms
+
+
+registry = MetricsRegistry()
+
+
+@dataclass
+class RequestMetrics:
+    scope: dict
+    statements: int = 0
+    statement_seconds: float = 0.0
+
+    @property
+    def route(self) -> str:
+        # The router stores the matched route in the scope; label by its
+        # template so path parameters do not explode the series count.
+        return getattr(self.scope.get("route"), "path", "unmatched")
+
+
+current_request: ContextVar[RequestMetrics | None] = ContextVar(
+    "current_request_metrics", default=None
+)
+
+
+def record_weight_capture(kind: str, seconds: float) -> None:
+    registry.observe("weight_capture_duration_seconds", seconds, (("kind", kind),))
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("metrics_started")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    request = current_request.get()
+    route = request.route if request else "background"
+    if request is not None:
+        request.statements += 1
+        request.statement_seconds += elapsed
+    registry.inc("db_statements_total", (("route", route),))
+    registry.observe("db_statement_duration_seconds", elapsed, (("route", route),))
+
+
+class TimedTemplate(jinja2.Template):
+    def render(self, *args, **kwargs) -> str:
+        started = time.perf_counter()
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            registry.observe(
+                "template_render_duration_seconds",
+                time.perf_counter() - started,
+                (("template", self.name or "string"),),
+            )
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and SQL use per route."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        request = RequestMetrics(scope)
+        token = current_request.set(request)
+        status = {"code": 500}
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        registry.inc("http_requests_in_flight")
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            registry.inc("http_requests_in_flight", amount=-1)
+            current_request.reset(token)
+            labels = (("method", scope["method"]), ("route", request.route))
+            registry.observe("http_request_duration_seconds", elapsed, labels)
+            registry.inc(
+                "http_requests_total", labels + (("status", str(status["code"])),)
+            )
+            registry.observe(
+                "db_statements_per_request",
+                request.statements,
+                (("route", request.route),),
+                STATEMENT_BUCKETS,
+            )
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: tuple, extra: tuple = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def render_metrics() -> str:
+    counters, histograms = registry.snapshot()
+    lines: list[str] = []
+    for kind, described in (("counter", COUNTERS), ("gauge", GAUGES)):
+        for name, help_text in described.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(
+                        f"{name}{_format_labels(labels)} {_format_number(value)}"
+                    )
+    for name, help_text in HISTOGRAMS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for (metric, labels, buckets), series in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0.0
+            for bound, count in zip((*buckets, "+Inf"), series[:-1]):
+                cumulative += count
+                lines.append(
+                    f"{name}_bucket{_format_labels(labels, (('le', bound),))} "
+                    f"{_format_number(cumulative)}"
+                )
+            lines.append(f"{name}_sum{_format_labels(labels)} {series[-1]!r}")
+            lines.append(
+                f"{name}_count{_format_labels(labels)} {_format_number(cumulative)}"
+            )
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,17 @@
+"""Cheap version stamps for pages that list whole lookup tables."""
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+
+def table_versions(db: Session, *models) -> tuple:
+    """Row count and latest ``updated_at`` of each table, in one statement.
+
+    Inserts and edits move the latest ``updated_at``; the count catches
+    deletes.
+    """
+    columns = []
+    for model in models:
+        columns.append(select(func.count()).select_from(model).scalar_subquery())
+        columns.append(select(func.max(model.updated_at)).scalar_subquery())
+    return tuple(db.execute(select(*columns)).one())
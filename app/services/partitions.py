@@ -0,0 +1,200 @@
+"""Range partitions of ``tickets`` on PostgreSQL.
+
+Migration ``e1f2a3b4c5d6`` turns ``tickets`` into a table partitioned on
+``datetime``, with one partition per year plus ``tickets_default`` for
+anything outside them. ``ensure_ticket_partitions`` creates upcoming
+partitions (per month with ``TICKET_PARTITION_PERIOD=month``) and gives
+rows that fell into the default partition a home. It runs at startup
+and from ``python -m app.jobs create-ticket-partitions``.
+
+On other databases ``tickets`` is a plain table and these helpers do nothing.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from ..config import settings
+from ..models.base import utcnow
+
+PERIODS = ("year", "month")
+PARENT = "tickets"
+DEFAULT_PARTITION = "tickets_default"
+# Serialises partition maintenance between workers starting together.
+_LOCK_KEY = 0x7469636B  # "tick"
+
+
+@dataclass(frozen=True, slots=True)
+class Partition:
+    name: str
+    start: date
+    end: date
+
+    @property
+    def year(self) -> int:
+        return self.start.year
+
+
+def _check_period(period: str) -> None:
+    if period not in PERIODS:
+        raise ValueError(f"Partition period must be one of {', '.join(PERIODS)}.")
+
+
+def partition_for(when: date, period: str) -> Partition:
+    _check_period(period)
+    if period == "year":
+        return Partition(
+            f"{PARENT}_y{when.year}", date(when.year, 1, 1), date(when.year + 1, 1, 1)
+        )
+    start = date(when.year, when.month, 1)
+    end = date(when.year + (when.month == 12), when.month % 12 + 1, 1)
+    return Partition(f"{PARENT}_m{when.year}_{when.month:02d}", start, end)
+
+
+def partitions_between(first: date, last: date, period: str) -> list[Partition]:
+    """Consecutive partitions covering ``first`` through ``last`` inclusive."""
+    partitions = []
+    current = partition_for(first, period)
+    while current.start <= last:
+        partitions.append(current)
+        current = partition_for(current.end, period)
+    return partitions
+
+
+def _covered(partition: Partition, existing: set[str]) -> bool:
+    # A site that switched period keeps its old partitions; never create one
+    # that would overlap them.
+    if partition.name in existing:
+        return True
+    if f"{PARENT}_y{partition.year}" in existing:
+        return True
+    return any(name.startswith(f"{PARENT}_m{partition.year}_") for name in existing)
+
+
+def is_partitioned(conn: Connection) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    relkind = conn.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"),
+        {"table": PARENT},
+    ).scalar_one_or_none()
+    return relkind == "p"
+
+
+def existing_partitions(conn: Connection) -> set[str]:
+    rows = conn.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass(:table)"
+        ),
+        {"table": PARENT},
+    )
+    return set(rows.scalars())
+
+
+def create_partition(conn: Connection, partition: Partition) -> None:
+    """Create and attach ``partition``, moving its rows out of the default.
+
+    Attaching fails while the default partition still holds rows in the new
+    range, so they are copied across first. ``ticket_no`` can only be unique
+    per partition: Postgres requires unique indexes on the parent to include
+    the partition key.
+    """
+    bounds = {
+        "start": datetime.combine(partition.start, datetime.min.time()),
+        "end": datetime.combine(partition.end, datetime.min.time()),
+    }
+    conn.execute(
+        text(
+            f"CREATE TABLE {partition.name} "
+            f"(LIKE {PARENT} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+    )
+    if DEFAULT_PARTITION in existing_partitions(conn):
+        in_range = "datetime >= :start AND datetime < :end"
+        conn.execute(
+            text(
+                f"INSERT INTO {partition.name} "
+                f"SELECT * FROM {DEFAULT_PARTITION} WHERE {in_range}"
+            ),
+            bounds,
+        )
+        conn.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}"), bounds)
+    conn.execute(
+        text(
+            f"ALTER TABLE {PARENT} ATTACH PARTITION {partition.name} "
+            f"FOR VALUES FROM ('{bounds['start'].isoformat(' ')}') "
+            f"TO ('{bounds['end'].isoformat(' ')}')"
+        )
+    )
+    conn.execute(
+        text(
+            f"CREATE UNIQUE INDEX {partition.name}_ticket_no_key "
+            f"ON {partition.name} (ticket_no)"
+        )
+    )
+
+
+def create_default_partition(conn: Connection) -> None:
+    conn.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} "
+            f"PARTITION OF {PARENT} DEFAULT"
+        )
+    )
+    conn.execute(
+        text(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {DEFAULT_PARTITION}_ticket_no_key "
+            f"ON {DEFAULT_PARTITION} (ticket_no)"
+        )
+    )
+
+
+def ensure_ticket_partitions(
+    conn: Connection,
+    *,
+    today: date | None = None,
+    period: str | None = None,
+    ahead: int | None = None,
+) -> list[str]:
+    """Create missing partitions up to ``ahead`` periods past ``today``.
+
+    Periods with rows in the default partition (backdated tickets, or dates
+    past the last partition) get a partition too. Returns the names created;
+    the caller commits.
+    """
+    if not is_partitioned(conn):
+        return []
+    period = period or settings.ticket_partition_period
+    ahead = settings.ticket_partitions_ahead if ahead is None else ahead
+    _check_period(period)
+    conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _LOCK_KEY})
+
+    create_default_partition(conn)
+    wanted: dict[str, Partition] = {}
+    current = partition_for(today or utcnow().date(), period)
+    for _ in range(ahead + 1):
+        wanted[current.name] = current
+        current = partition_for(current.end, period)
+    stranded = conn.execute(
+        text(
+            f"SELECT DISTINCT CAST(date_trunc('{period}', datetime) AS date) "
+            f"FROM {DEFAULT_PARTITION}"
+        )
+    ).scalars()
+    for when in stranded:
+        partition = partition_for(when, period)
+        wanted[partition.name] = partition
+
+    created = []
+    existing = existing_partitions(conn)
+    for partition in sorted(wanted.values(), key=lambda item: item.start):
+        if _covered(partition, existing):
+            continue
+        create_partition(conn, partition)
+        existing.add(partition.name)
+        created.append(partition.name)
+    return created
@@ -0,0 +1,101 @@
+"""Minimal PDF writer for text-only documents.
+
+Only the standard Helvetica fonts are used, so no font files are embedded
+and output stays small. Text is encoded as WinAnsi (Latin-1), which covers
+the characters used on invoices and tickets, including the pound sign.
+"""
+
+from dataclasses import dataclass
+
+A4 = (595.0, 842.0)
+
+
+@dataclass(frozen=True, slots=True)
+class PdfText:
+    x: float
+    y: float
+    text: str
+    size: float = 10.0
+    bold: bool = False
+
+
+def build_pdf(
+    pages: list[list[PdfText]], page_size: tuple[float, float] = A4
+) -> bytes:
+    if not pages:
+        pages = [[]]
+    width, height = page_size
+
+    # Objects 1-4 are fixed; each page adds a page object and a content stream.
+    page_ids = [5 + index * 2 for index in range(len(pages))]
+    objects: list[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        (
+            "<< /Type /Pages /Kids [%s] /Count %d >>"
+            % (" ".join(f"{page_id} 0 R" for page_id in page_ids), len(pages))
+        ).encode("ascii"),
+        _font("Helvetica"),
+        _font("Helvetica-Bold"),
+    ]
+    for page_id, texts in zip(page_ids, pages):
+        objects.append(
+            (
+                "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %s %s] "
+                "/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> "
+                "/Contents %d 0 R >>" % (_num(width), _num(height), page_id + 1)
+            ).encode("ascii")
+        )
+        stream = _content_stream(texts)
+        objects.append(
+            b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+        )
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets: list[int] = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref_at = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref_at,
+    )
+    return bytes(out)
+
+
+def _font(name: str) -> bytes:
+    return (
+        "<< /Type /Font /Subtype /Type1 /BaseFont /%s "
+        "/Encoding /WinAnsiEncoding >>" % name
+    ).encode("ascii")
+
+
+def _content_stream(texts: list[PdfText]) -> bytes:
+    parts: list[bytes] = []
+    for item in texts:
+        font = "/F2" if item.bold else "/F1"
+        parts.append(
+            b"BT %s %s Tf %s %s Td (%s) Tj ET"
+            % (
+                font.encode("ascii"),
+                _num(item.size).encode("ascii"),
+                _num(item.x).encode("ascii"),
+                _num(item.y).encode("ascii"),
+                _escape(item.text),
+            )
+        )
+    return b"\n".join(parts)
+
+
+def _escape(text: str) -> bytes:
+    encoded = text.encode("cp1252", errors="replace")
+    return (
+        encoded.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+    )
+
+
+def _num(value: float) -> str:
+    return f"{value:.2f}".rstrip("0").rstrip(".")
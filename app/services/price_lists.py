@@ -0,0 +1,232 @@
+import csv
+from bisect import bisect_right
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..models import Customer, CustomerPrice, Product
+from .cache import BindCache
+
+PRICE_CSV_COLUMNS = (
+    "account_code",
+    "product_code",
+    "unit_price",
+    "effective_from",
+    "effective_to",
+)
+
+
+class PriceSchedule:
+    """Non-overlapping price intervals for one customer and product.
+
+    Intervals are sorted by start date so a lookup is a single bisect.
+    ``effective_to`` is inclusive; ``None`` means open-ended.
+    """
+
+    __slots__ = ("starts", "ends", "prices")
+
+    def __init__(self, intervals: Iterable[tuple[date, date | None, Decimal]]) -> None:
+        ordered = sorted(intervals, key=lambda interval: interval[0])
+        self.starts = tuple(start for start, _, _ in ordered)
+        self.ends = tuple(end for _, end, _ in ordered)
+        self.prices = tuple(price for _, _, price in ordered)
+
+    def price_on(self, day: date) -> Decimal | None:
+        index = bisect_right(self.starts, day) - 1
+        if index < 0:
+            return None
+        end = self.ends[index]
+        if end is not None and day > end:
+            return None
+        return self.prices[index]
+
+
+def _load_price_index(db: Session) -> dict[int, dict[int, PriceSchedule]]:
+    rows = db.execute(
+        select(
+            CustomerPrice.customer_id,
+            CustomerPrice.product_id,
+            CustomerPrice.effective_from,
+            CustomerPrice.effective_to,
+            CustomerPrice.unit_price,
+        )
+    ).all()
+    grouped: dict[int, dict[int, list]] = defaultdict(lambda: defaultdict(list))
+    for customer_id, product_id, start, end, price in rows:
+        grouped[customer_id][product_id].append((start, end, Decimal(str(price))))
+    return {
+        customer_id: {
+            product_id: PriceSchedule(intervals)
+            for product_id, intervals in products.items()
+        }
+        for customer_id, products in grouped.items()
+    }
+
+
+_price_index = BindCache(_load_price_index)
+
+
+def customer_price(
+    db: Session, customer_id: int | None, product_id: int | None, day: date
+) -> Decimal | None:
+    """Return the negotiated price in force on ``day``, if there is one."""
+    if not customer_id or not product_id:
+        return None
+    schedule = _price_index.get(db).get(customer_id, {}).get(product_id)
+    if schedule is None:
+        return None
+    return schedule.price_on(day)
+
+
+def invalidate_price_lists() -> None:
+    _price_index.invalidate()
+
+
+@dataclass
+class PriceImportResult:
+    created: int = 0
+    updated: int = 0
+    errors: list[str] = field(default_factory=list)
+
+
+def read_price_csv(stream) -> list[dict[str, str]]:
+    reader = csv.DictReader(stream)
+    columns = reader.fieldnames or []
+    missing = [name for name in PRICE_CSV_COLUMNS[:4] if name not in columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    return list(reader)
+
+
+def import_price_list(db: Session, rows: list[dict[str, str]]) -> PriceImportResult:
+    """Create or update customer prices from parsed CSV rows.
+
+    A row whose customer, product and start date match an existing price
+    updates it; any other overlap, including two rows in the file with the
+    same start date, is an error. Nothing is written unless every row is
+    valid. The caller commits.
+    """
+    result = PriceImportResult()
+    account_codes = {str(row.get("account_code", "")).strip() for row in rows}
+    product_codes = {str(row.get("product_code", "")).strip() for row in rows}
+    customers = dict(
+        db.execute(
+            select(Customer.account_code, Customer.id).where(
+                Customer.account_code.in_(account_codes)
+            )
+        ).all()
+    )
+    products = dict(
+        db.execute(
+            select(Product.code, Product.id).where(Product.code.in_(product_codes))
+        ).all()
+    )
+
+    parsed: list[tuple[int, int, Decimal, date, date | None]] = []
+    seen: dict[tuple[int, int, date], int] = {}
+    for line_no, row in enumerate(rows, start=2):
+        account_code = str(row.get("account_code", "")).strip()
+        product_code = str(row.get("product_code", "")).strip()
+        customer_id = customers.get(account_code)
+        product_id = products.get(product_code)
+        if customer_id is None:
+            result.errors.append(f"Line {line_no}: unknown customer {account_code!r}.")
+        if product_id is None:
+            result.errors.append(f"Line {line_no}: unknown product {product_code!r}.")
+        unit_price = _parse_price(row.get("unit_price"))
+        if unit_price is None:
+            result.errors.append(f"Line {line_no}: unit price must be 0 or greater.")
+        effective_from = _parse_iso_date(row.get("effective_from"))
+        if effective_from is None:
+            result.errors.append(f"Line {line_no}: effective from must be a date.")
+        effective_to_raw = str(row.get("effective_to") or "").strip()
+        effective_to = _parse_iso_date(effective_to_raw)
+        if effective_to_raw and effective_to is None:
+            result.errors.append(f"Line {line_no}: effective to must be a date.")
+        if effective_from and effective_to and effective_to < effective_from:
+            result.errors.append(f"Line {line_no}: date range invalid.")
+        if customer_id and product_id and effective_from:
+            first_line = seen.setdefault(
+                (customer_id, product_id, effective_from), line_no
+            )
+            if first_line != line_no:
+                result.errors.append(
+                    f"Line {line_no}: same customer, product and effective from "
+                    f"as line {first_line}."
+                )
+        if customer_id and product_id and unit_price is not None and effective_from:
+            parsed.append(
+                (customer_id, product_id, unit_price, effective_from, effective_to)
+            )
+    if result.errors:
+        return result
+
+    keys = {(customer_id, product_id) for customer_id, product_id, *_ in parsed}
+    existing: dict[tuple[int, int, date], CustomerPrice] = {}
+    for price in db.execute(
+        select(CustomerPrice).where(
+            CustomerPrice.customer_id.in_({customer_id for customer_id, _ in keys})
+        )
+    ).scalars():
+        if (price.customer_id, price.product_id) in keys:
+            existing[(price.customer_id, price.product_id, price.effective_from)] = price
+
+    intervals: dict[tuple[int, int], dict[date, date | None]] = defaultdict(dict)
+    for (customer_id, product_id, start), price in existing.items():
+        intervals[(customer_id, product_id)][start] = price.effective_to
+    for customer_id, product_id, _, start, end in parsed:
+        intervals[(customer_id, product_id)][start] = end
+    for (customer_id, product_id), spans in intervals.items():
+        previous_end: date | None = None
+        for position, start in enumerate(sorted(spans)):
+            if position and (previous_end is None or start <= previous_end):
+                result.errors.append(
+                    f"Overlapping prices for customer {customer_id}, "
+                    f"product {product_id} from {start.isoformat()}."
+                )
+                break
+            previous_end = spans[start]
+    if result.errors:
+        return result
+
+    for customer_id, product_id, unit_price, start, end in parsed:
+        price = existing.get((customer_id, product_id, start))
+        if price is None:
+            db.add(
+                CustomerPrice(
+                    customer_id=customer_id,
+                    product_id=product_id,
+                    unit_price=unit_price,
+                    effective_from=start,
+                    effective_to=end,
+                )
+            )
+            result.created += 1
+        else:
+            price.unit_price = unit_price
+            price.effective_to = end
+            result.updated += 1
+    db.flush()
+    return result
+
+
+def _parse_price(value) -> Decimal | None:
+    try:
+        price = Decimal(str(value or "").strip())
+    except (InvalidOperation, ValueError):
+        return None
+    if not price.is_finite() or price < 0:
+        return None
+    return price
+
+
+def _parse_iso_date(value) -> date | None:
+    try:
+        return date.fromisoformat(str(value or "").strip())
+    except ValueError:
+        return None
@@ -0,0 +1,159 @@
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..models import Customer, Ticket
+from .price_lists import customer_price
+from .product_catalog import ProductRecord, product_records
+
+MONEY = Decimal("0.01")
+ZERO = Decimal("0")
+
+
+@dataclass(frozen=True, slots=True)
+class PriceQuote:
+    unit_price: Decimal
+    chargeable_qty: Decimal
+    excess_qty: Decimal
+    total: Decimal
+
+
+def _as_decimal(value) -> Decimal:
+    if isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+
+def base_unit_price(product: ProductRecord, cash_account: bool) -> Decimal | None:
+    """Pick the cash or account price for the customer, else the list price."""
+    tier_price = product.cash_price if cash_account else product.account_price
+    if tier_price is not None:
+        return tier_price
+    return product.unit_price
+
+
+def default_unit_price(
+    db: Session,
+    product: ProductRecord,
+    customer_id: int | None,
+    day: date,
+) -> Decimal | None:
+    """Resolve the price a new line starts from.
+
+    A customer price list entry in force on ``day`` wins; otherwise the
+    customer's cash or account tier applies.
+    """
+    negotiated = customer_price(db, customer_id, product.id, day)
+    if negotiated is not None:
+        return negotiated
+    return base_unit_price(product, customer_is_cash(db, customer_id))
+
+
+def quote(
+    product: ProductRecord,
+    qty,
+    *,
+    cash_account: bool = False,
+    unit_price: Decimal | None = None,
+) -> PriceQuote | None:
+    """Price one ticket line.
+
+    ``unit_price`` overrides the tier price when the operator typed one.
+    Quantity above ``max_qty`` is not charged, quantity above
+    ``excess_trigger`` is charged at ``excess_price``, and the line total is
+    then clamped to ``min_price``/``max_price``.
+    """
+    price = unit_price
+    if price is None:
+        price = base_unit_price(product, cash_account)
+    if price is None or qty is None:
+        return None
+
+    chargeable = _as_decimal(qty)
+    if product.max_qty is not None and chargeable > product.max_qty:
+        chargeable = product.max_qty
+
+    excess = ZERO
+    if (
+        product.excess_trigger is not None
+        and product.excess_price is not None
+        and chargeable > product.excess_trigger
+    ):
+        excess = chargeable - product.excess_trigger
+        total = product.excess_trigger * price + excess * product.excess_price
+    else:
+        total = chargeable * price
+
+    if product.min_price is not None and total < product.min_price:
+        total = product.min_price
+    if product.max_price is not None and total > product.max_price:
+        total = product.max_price
+
+    return PriceQuote(
+        unit_price=price,
+        chargeable_qty=chargeable,
+        excess_qty=excess,
+        total=total.quantize(MONEY, rounding=ROUND_HALF_UP),
+    )
+
+
+def quote_many(
+    lines: Iterable[tuple[ProductRecord | None, object, bool, Decimal | None]],
+) -> list[PriceQuote | None]:
+    """Price many (product, qty, cash_account, unit_price) lines in one pass."""
+    return [
+        quote(product, qty, cash_account=cash_account, unit_price=unit_price)
+        if product is not None
+        else None
+        for product, qty, cash_account, unit_price in lines
+    ]
+
+
+def price_tickets(
+    db: Session, tickets: Sequence[Ticket], *, keep_unit_price: bool = False
+) -> list[PriceQuote | None]:
+    """Price a batch of tickets with one catalogue read and one customer query.
+
+    Each ticket starts from the customer price list entry in force on the
+    ticket date, else the customer's tier. With ``keep_unit_price`` the
+    ticket's stored unit price is honoured instead and only the excess
+    tiers and clamps are re-applied.
+    """
+    products = product_records(db, (ticket.product_id for ticket in tickets))
+    customer_ids = {ticket.customer_id for ticket in tickets if ticket.customer_id}
+    cash_accounts: dict[int, bool] = {}
+    if customer_ids:
+        cash_accounts = dict(
+            db.execute(
+                select(Customer.id, Customer.cash_account).where(
+                    Customer.id.in_(customer_ids)
+                )
+            ).all()
+        )
+    return quote_many(
+        (
+            products.get(ticket.product_id),
+            ticket.qty,
+            cash_accounts.get(ticket.customer_id, False),
+            ticket.unit_price
+            if keep_unit_price
+            else customer_price(
+                db, ticket.customer_id, ticket.product_id, ticket.datetime.date()
+            ),
+        )
+        for ticket in tickets
+    )
+
+
+def customer_is_cash(db: Session, customer_id: int | None) -> bool:
+    if not customer_id:
+        return False
+    return bool(
+        db.execute(
+            select(Customer.cash_account).where(Customer.id == customer_id)
+        ).scalar_one_or_none()
+    )
@@ -0,0 +1,123 @@
+import hashlib
+from dataclasses import astuple, dataclass
+from decimal import Decimal
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..models import Product, TaxRate, Unit, WasteCode
+from .cache import BindCache
+
+
+@dataclass(frozen=True, slots=True)
+class ProductRecord:
+    id: int
+    code: str
+    description: str
+    unit_price: Decimal | None
+    account_price: Decimal | None
+    cash_price: Decimal | None
+    min_price: Decimal | None
+    max_price: Decimal | None
+    max_qty: Decimal | None
+    excess_trigger: Decimal | None
+    excess_price: Decimal | None
+    unit_name: str | None
+    tax_rate_percent: Decimal
+    default_waste_code_id: int | None
+    default_waste_code: str | None
+
+    @property
+    def etag(self) -> str:
+        digest = hashlib.sha1(repr(astuple(self)).encode("utf-8")).hexdigest()
+        return digest[:16]
+
+
+def _decimal(value) -> Decimal | None:
+    if value is None:
+        return None
+    return Decimal(str(value))
+
+
+def _load_catalog(db: Session) -> dict[int, ProductRecord]:
+    rows = db.execute(
+        select(Product, Unit.name, TaxRate.rate_percent, WasteCode.code)
+        .outerjoin(Unit, Product.unit_id == Unit.id)
+        .outerjoin(TaxRate, Product.tax_rate_id == TaxRate.id)
+        .outerjoin(WasteCode, Product.default_waste_code_id == WasteCode.id)
+        .order_by(Product.description)
+    ).all()
+    return {
+        product.id: ProductRecord(
+            id=product.id,
+            code=product.code,
+            description=product.description,
+            unit_price=_decimal(product.unit_price),
+            account_price=_decimal(product.account_price),
+            cash_price=_decimal(product.cash_price),
+            min_price=_decimal(product.min_price),
+            max_price=_decimal(product.max_price),
+            max_qty=_decimal(product.max_qty),
+            excess_trigger=_decimal(product.excess_trigger),
+            excess_price=_decimal(product.excess_price),
+            unit_name=unit_name,
+            tax_rate_percent=_decimal(rate_percent) or Decimal("0"),
+            default_waste_code_id=product.default_waste_code_id,
+            default_waste_code=waste_code,
+        )
+        for product, unit_name, rate_percent, waste_code in rows
+    }
+
+
+_catalog = BindCache(_load_catalog)
+
+
+def product_catalog(db: Session) -> dict[int, ProductRecord]:
+    """Return every product keyed by id, in description order."""
+    return _catalog.get(db)
+
+
+def product_record(db: Session, product_id: int | None) -> ProductRecord | None:
+    if not product_id:
+        return None
+    return product_catalog(db).get(product_id)
+
+
+def product_records(db: Session, product_ids) -> dict[int, ProductRecord]:
+    """Resolve a batch of product ids, reloading once if any are missing.
+
+    Batch callers (invoice runs) must not drop rows because a product was
+    added by another worker since the catalogue was loaded.
+    """
+    wanted = {product_id for product_id in product_ids if product_id}
+    catalog = product_catalog(db)
+    if not wanted.issubset(catalog):
+        _catalog.invalidate()
+        catalog = product_catalog(db)
+    return {
+        product_id: catalog[product_id] for product_id in wanted if product_id in catalog
+    }
+
+
+def product_tax_rates(db: Session, product_ids) -> dict[int, Decimal]:
+    """Read the current VAT rate of each product, bypassing the catalogue.
+
+    Another worker's catalogue may still hold a rate edited up to its TTL
+    ago; invoices must be charged at the rate in force when they are raised.
+    """
+    wanted = {product_id for product_id in product_ids if product_id}
+    if not wanted:
+        return {}
+    rows = db.execute(
+        select(Product.id, TaxRate.rate_percent)
+        .outerjoin(TaxRate, Product.tax_rate_id == TaxRate.id)
+        .where(Product.id.in_(wanted))
+    ).all()
+    return {
+        product_id: _decimal(rate_percent) or Decimal("0")
+        for product_id, rate_percent in rows
+    }
+
+
+def invalidate_product_catalog() -> None:
+    _catalog.invalidate()
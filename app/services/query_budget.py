@@ -0,0 +1,150 @@
+"""Per-request SQL statement counting and N+1 detection for debug mode."""
+
+import html
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from ..config import settings
+
+# A statement shape seen this many times in one request is reported as N+1.
+N_PLUS_ONE_THRESHOLD = 3
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAMETER = r"(?:\?|%\([^)]*\)s)"
+_PARAMETER_LIST = re.compile(rf"\(\s*{_PARAMETER}(?:\s*,\s*{_PARAMETER})*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """Reduce a statement to its shape: literals and IN-lists become ``?``."""
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _PARAMETER_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryTracker:
+    def __init__(self) -> None:
+        self.shapes: Counter[str] = Counter()
+
+    @property
+    def count(self) -> int:
+        return sum(self.shapes.values())
+
+    def record(self, statement: str) -> None:
+        self.shapes[fingerprint(statement)] += 1
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> list[tuple[str, int]]:
+        return [
+            (shape, seen)
+            for shape, seen in self.shapes.most_common()
+            if seen >= threshold
+        ]
+
+
+current_tracker: ContextVar[QueryTracker | None] = ContextVar(
+    "current_query_tracker", default=None
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _track_statement(conn, cursor, statement, parameters, context, executemany):
+    tracker = current_tracker.get()
+    if tracker is not None:
+        tracker.record(statement)
+
+
+@contextmanager
+def track_engine(engine: Engine):
+    """Record every statement ``engine`` runs, from any thread."""
+    tracker = QueryTracker()
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        tracker.record(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield tracker
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def render_panel(tracker: QueryTracker) -> str:
+    rows = "".join(
+        f"<li><strong>{seen}&times;</strong> <code>{html.escape(shape)}</code></li>"
+        for shape, seen in tracker.repeated()
+    )
+    repeated = f"<ul>{rows}</ul>" if rows else ""
+    return (
+        '<aside class="query-budget-panel" style="position:fixed;bottom:0;right:0;'
+        'max-width:40rem;max-height:50vh;overflow:auto;padding:0.5rem 1rem;'
+        'background:#fff8e1;border:1px solid #e0c060;font-size:0.8rem">'
+        f"<strong>{tracker.count} SQL statements</strong>"
+        f" ({len(tracker.shapes)} distinct){repeated}</aside>"
+    )
+
+
+class QueryBudgetMiddleware:
+    """In DEBUG mode, report each request's statements in headers and a panel."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not settings.debug:
+            await self.app(scope, receive, send)
+            return
+
+        tracker = QueryTracker()
+        token = current_tracker.set(tracker)
+        start_message = None
+        body: list[bytes] = []
+
+        def headers_with_counts(message, length: int | None = None):
+            headers = [
+                (name, value)
+                for name, value in message.get("headers", [])
+                if length is None or name.lower() != b"content-length"
+            ]
+            headers.append((b"x-query-count", str(tracker.count).encode()))
+            headers.append(
+                (b"x-query-repeated", str(len(tracker.repeated())).encode())
+            )
+            if length is not None:
+                headers.append((b"content-length", str(length).encode()))
+            return {**message, "headers": headers}
+
+        async def send_wrapper(message) -> None:
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                content_type = dict(message.get("headers", [])).get(
+                    b"content-type", b""
+                )
+                if content_type.startswith(b"text/html"):
+                    start_message = message
+                    return
+                await send(headers_with_counts(message))
+                return
+            if start_message is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+            body.append(message.get("body", b""))
+            if message.get("more_body"):
+                return
+            content = b"".join(body)
+            if b"</body>" in content:
+                panel = render_panel(tracker).encode()
+                content = content.replace(b"</body>", panel + b"</body>", 1)
+            await send(headers_with_counts(start_message, len(content)))
+            await send({"type": "http.response.body", "body": content})
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_tracker.reset(token)
@@ -0,0 +1,48 @@
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..models import PaymentMethod, VoidReason
+from .cache import BindCache
+
+
+@dataclass(frozen=True, slots=True)
+class ReferenceOption:
+    id: int
+    code: str
+    description: str | None
+    is_active: bool
+
+
+def _code_loader(model):
+    def load(db: Session) -> tuple[ReferenceOption, ...]:
+        rows = db.execute(select(model).order_by(model.code)).scalars()
+        return tuple(
+            ReferenceOption(
+                id=row.id,
+                code=row.code,
+                description=row.description,
+                is_active=row.is_active,
+            )
+            for row in rows
+        )
+
+    return load
+
+
+_payment_methods = BindCache(_code_loader(PaymentMethod))
+_void_reasons = BindCache(_code_loader(VoidReason))
+
+
+def payment_methods(db: Session) -> tuple[ReferenceOption, ...]:
+    return _payment_methods.get(db)
+
+
+def void_reasons(db: Session) -> tuple[ReferenceOption, ...]:
+    return _void_reasons.get(db)
+
+
+def invalidate_reference_data() -> None:
+    _payment_methods.invalidate()
+    _void_reasons.invalidate()
@@ -0,0 +1,42 @@
+import asyncio
+import threading
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from typing import TypeVar
+
+from starlette.concurrency import run_in_threadpool
+
+from ..config import settings
+
+T = TypeVar("T")
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=settings.render_workers)
+        return _pool
+
+
+async def run_render(fn: Callable[..., T], *args) -> T:
+    """Run a CPU-bound render function off the request thread.
+
+    ``fn`` and its arguments must be picklable. With ``render_workers`` set
+    to 0 the render runs in the threadpool instead of a separate process.
+    """
+    if settings.render_workers <= 0:
+        return await run_in_threadpool(fn, *args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_pool(), fn, *args)
+
+
+def shutdown_render_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
@@ -0,0 +1,224 @@
+import hashlib
+import json
+from decimal import Decimal
+
+from jinja2 import Environment, StrictUndefined
+from sqlalchemy.orm import selectinload
+
+from ..models import Product, Ticket
+from .pdf import A4, PdfText, build_pdf
+
+# Bump when a layout changes so cached documents are re-rendered.
+LAYOUT_VERSION = "1"
+
+DOCUMENT_KINDS = ("ticket", "wtn")
+DOCUMENT_FORMATS = ("pdf", "escpos")
+
+TICKET_LOAD_OPTIONS = (
+    selectinload(Ticket.customer),
+    selectinload(Ticket.vehicle),
+    selectinload(Ticket.product).selectinload(Product.unit),
+    selectinload(Ticket.haulier),
+    selectinload(Ticket.driver),
+    selectinload(Ticket.container),
+    selectinload(Ticket.destination),
+    selectinload(Ticket.waste_code),
+    selectinload(Ticket.waste_producer),
+    selectinload(Ticket.licence),
+)
+
+# Layouts are plain-text line templates shared by the PDF and ESC/POS
+# outputs. Lines starting with "# " are headings. They are compiled once at
+# import, so each render worker pays the compile cost a single time.
+_LAYOUTS = {
+    "ticket": """\
+# WEIGHBRIDGE TICKET
+Ticket no: {{ d.ticket_no }}
+Date/time: {{ d.datetime }}
+Direction: {{ d.direction }}  Type: {{ d.transaction_type }}
+---
+Customer: {{ d.customer }}
+Vehicle: {{ d.vehicle }}
+{% if d.haulier %}Haulier: {{ d.haulier }}
+{% endif %}{% if d.driver %}Driver: {{ d.driver }}
+{% endif %}{% if d.container %}Container: {{ d.container }}
+{% endif %}{% if d.destination %}Destination: {{ d.destination }}
+{% endif %}Product: {{ d.product }}
+---
+Gross: {{ d.gross_kg }} kg
+Tare: {{ d.tare_kg }} kg
+# Net: {{ d.net_kg }} kg
+{% if d.total %}---
+Qty: {{ d.qty }} {{ d.unit }}
+Unit price: {{ d.unit_price }}
+Total: {{ d.total }}
+{% endif %}---
+Driver signature: ____________________
+""",
+    "wtn": """\
+# WASTE TRANSFER NOTE
+Ticket no: {{ d.ticket_no }}
+Date/time: {{ d.datetime }}
+---
+Waste producer: {{ d.waste_producer }}
+Customer: {{ d.customer }}
+{% for line in d.customer_address %}  {{ line }}
+{% endfor %}Carrier: {{ d.haulier or d.customer }}
+Vehicle: {{ d.vehicle }}
+---
+Description: {{ d.product }}
+EWC code: {{ d.waste_code }}
+{% if d.waste_code_description %}  {{ d.waste_code_description }}
+{% endif %}Hazardous: {{ "Yes" if d.is_hazardous else "No" }}
+Quantity: {{ d.net_kg }} kg
+---
+Permit/licence: {{ d.licence }}
+{% if d.licence_description %}  {{ d.licence_description }}
+{% endif %}---
+Transferor signature: ____________________
+Transferee signature: ____________________
+""",
+}
+
+_env = Environment(
+    autoescape=False, undefined=StrictUndefined, keep_trailing_newline=True
+)
+_TEMPLATES = {kind: _env.from_string(source) for kind, source in _LAYOUTS.items()}
+
+# ESC/POS control sequences (Epson-compatible printers).
+_ESC_INIT = b"\x1b@\x1bt\x10"  # reset, select WPC1252 code page
+_ESC_HEADING_ON = b"\x1bE\x01\x1d!\x11"  # bold, double width and height
+_ESC_HEADING_OFF = b"\x1bE\x00\x1d!\x00"
+_ESC_FEED_AND_CUT = b"\x1bd\x04\x1dV\x01"
+
+_THERMAL_PAGE = (227.0, 600.0)  # 80 mm roll
+_PDF_LINE_HEIGHT = 14.0
+
+
+def ticket_document_data(ticket: Ticket) -> dict:
+    """Plain, picklable snapshot of a ticket for the render workers."""
+    customer = ticket.customer
+    product = ticket.product
+    return {
+        "ticket_no": ticket.ticket_no,
+        "updated_at": ticket.updated_at.isoformat() if ticket.updated_at else "",
+        "datetime": ticket.datetime.strftime("%d/%m/%Y %H:%M")
+        if ticket.datetime
+        else "",
+        "direction": _enum_value(ticket.direction),
+        "transaction_type": _enum_value(ticket.transaction_type),
+        "customer": customer.name if customer else "",
+        "customer_address": [
+            value
+            for value in (
+                customer.address_line1,
+                customer.address_line2,
+                customer.city,
+                customer.postcode,
+            )
+            if value
+        ]
+        if customer
+        else [],
+        "vehicle": ticket.vehicle.registration if ticket.vehicle else "",
+        "haulier": ticket.haulier.name if ticket.haulier else "",
+        "driver": ticket.driver.name if ticket.driver else "",
+        "container": ticket.container.name if ticket.container else "",
+        "destination": ticket.destination.name if ticket.destination else "",
+        "product": product.description if product else "",
+        "is_hazardous": bool(product and product.is_hazardous),
+        "unit": product.unit.name if product and product.unit else "",
+        "gross_kg": _format_weight(ticket.gross_kg),
+        "tare_kg": _format_weight(ticket.tare_kg),
+        "net_kg": _format_weight(ticket.net_kg),
+        "qty": _format_plain(ticket.qty),
+        "unit_price": _format_money(ticket.unit_price),
+        "total": _format_money(ticket.total),
+        "waste_code": ticket.waste_code.code if ticket.waste_code else "",
+        "waste_code_description": ticket.waste_code.description
+        if ticket.waste_code and ticket.waste_code.description
+        else "",
+        "waste_producer": ticket.waste_producer.name if ticket.waste_producer else "",
+        "licence": ticket.licence.code if ticket.licence else "",
+        "licence_description": ticket.licence.description
+        if ticket.licence and ticket.licence.description
+        else "",
+    }
+
+
+def documents_fingerprint(kind: str, fmt: str, documents: list[dict]) -> str:
+    payload = json.dumps(
+        [LAYOUT_VERSION, kind, fmt, documents], sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def render_ticket_documents(kind: str, fmt: str, documents: list[dict]) -> bytes:
+    """Render one or more tickets into a single PDF or ESC/POS stream."""
+    template = _TEMPLATES[kind]
+    rendered = [_layout_lines(template.render(d=data)) for data in documents]
+    if fmt == "escpos":
+        return b"".join(_escpos(lines) for lines in rendered)
+    page_size = A4 if kind == "wtn" else _THERMAL_PAGE
+    return build_pdf([_pdf_page(lines, page_size) for lines in rendered], page_size)
+
+
+def _layout_lines(text: str) -> list[tuple[str, bool]]:
+    lines = []
+    for raw in text.splitlines():
+        if raw.startswith("# "):
+            lines.append((raw[2:], True))
+        else:
+            lines.append((raw, False))
+    return lines
+
+
+def _pdf_page(lines: list[tuple[str, bool]], page_size: tuple[float, float]) -> list[PdfText]:
+    width, height = page_size
+    margin = 14.0 if width < 300 else 40.0
+    y = height - margin - 12
+    texts = []
+    for text, heading in lines:
+        if text == "---":
+            text = "-" * (32 if width < 300 else 80)
+        texts.append(PdfText(margin, y, text, size=12 if heading else 9, bold=heading))
+        y -= _PDF_LINE_HEIGHT + (4 if heading else 0)
+    return texts
+
+
+def _escpos(lines: list[tuple[str, bool]]) -> bytes:
+    out = bytearray(_ESC_INIT)
+    for text, heading in lines:
+        if text == "---":
+            text = "-" * 42
+        encoded = text.encode("cp1252", errors="replace")
+        if heading:
+            out += _ESC_HEADING_ON + encoded + b"\n" + _ESC_HEADING_OFF
+        else:
+            out += encoded + b"\n"
+    out += _ESC_FEED_AND_CUT
+    return bytes(out)
+
+
+def _enum_value(value) -> str:
+    if value is None:
+        return ""
+    return value.value if hasattr(value, "value") else str(value)
+
+
+def _format_weight(value) -> str:
+    if value is None:
+        return ""
+    return f"{Decimal(str(value)):,.0f}"
+
+
+def _format_money(value) -> str:
+    if value is None:
+        return ""
+    return f"{Decimal(str(value)):.2f}"
+
+
+def _format_plain(value) -> str:
+    if value is None:
+        return ""
+    return f"{Decimal(str(value)).normalize():f}"
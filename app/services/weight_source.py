@@ -1,3 +1,4 @@
+import random
 from abc import ABC, abstractmethod
 
 from ..config import settings
@@ -32,5 +33,32 @@ class StubIndicatorWeightSource(WeightSource):
         return None
 
 
+class SimulatedIndicatorWeightSource(WeightSource):
+    """Reports whatever is on the bridge, in whole divisions with some jitter."""
+
+    def __init__(
+        self, rng: random.Random | None = None, division_kg: int = 20
+    ) -> None:
+        self._rng = rng or random.Random()
+        self._division_kg = division_kg
+        self._load_kg: float | None = None
+
+    def drive_on(self, load_kg: float) -> None:
+        self._load_kg = load_kg
+
+    def drive_off(self) -> None:
+        self._load_kg = None
+
+    def is_connected(self) -> bool:
+        return True
+
+    def get_weight_kg(self) -> float | None:
+        if self._load_kg is None:
+            return None
+        jitter = self._rng.uniform(-self._division_kg, self._division_kg)
+        divisions = round((self._load_kg + jitter) / self._division_kg)
+        return float(divisions * self._division_kg)
+
+
 def get_indicator_source() -> WeightSource:
     return StubIndicatorWeightSource(settings.indicator_connected)
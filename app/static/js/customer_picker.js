@@ -0,0 +1,29 @@
+document.addEventListener("click", function (event) {
+  var option = event.target.closest(".typeahead-option");
+  if (!option) {
+    return;
+  }
+  var target = option.dataset.target;
+  var search = document.getElementById(target);
+  var hidden = document.getElementById(target + "_value");
+  var results = document.getElementById(target + "_results");
+  if (!search || !hidden) {
+    return;
+  }
+  hidden.value = option.dataset.id;
+  search.value = option.dataset.label;
+  if (results) {
+    results.innerHTML = "";
+  }
+});
+
+document.addEventListener("input", function (event) {
+  if (!event.target.matches("[data-customer-search]")) {
+    return;
+  }
+  // Editing the text drops the previous selection until a result is picked.
+  var hidden = document.getElementById(event.target.id + "_value");
+  if (hidden) {
+    hidden.value = "";
+  }
+});
@@ -0,0 +1,59 @@
+import functools
+import hashlib
+import json
+from pathlib import Path
+
+import jinja2
+from fastapi.templating import Jinja2Templates
+
+from . import assets
+from .assets import static_url
+from .config import Settings, settings
+from .services.metrics import TimedTemplate
+
+TEMPLATE_DIR = "app/templates"
+
+
+def build_environment(config: Settings = settings) -> jinja2.Environment:
+    """The Jinja environment shared by every route module.
+
+    Compiled templates are written to ``template_cache_dir`` so other workers
+    and later restarts load bytecode instead of parsing. Outside debug,
+    templates are not checked for changes on each render. Renders are timed
+    for ``/metrics``.
+    """
+    bytecode_cache = None
+    if config.template_cache_dir:
+        Path(config.template_cache_dir).mkdir(parents=True, exist_ok=True)
+        bytecode_cache = jinja2.FileSystemBytecodeCache(config.template_cache_dir)
+    env = jinja2.Environment(
+        loader=jinja2.FileSystemLoader(TEMPLATE_DIR),
+        autoescape=True,
+        auto_reload=config.debug,
+        bytecode_cache=bytecode_cache,
+    )
+    env.template_class = TimedTemplate
+    env.globals["static_url"] = static_url
+    return env
+
+
+templates = Jinja2Templates(env=build_environment())
+
+
+def precompile_templates(env: jinja2.Environment = templates.env) -> int:
+    """Load every HTML template up front; returns how many were compiled."""
+    names = env.list_templates(extensions=["html"])
+    for name in names:
+        env.get_template(name)
+    return len(names)
+
+
+@functools.cache
+def render_version() -> str:
+    """Hash of the template sources and static manifest, for page ETags."""
+    digest = hashlib.sha256()
+    for path in sorted(Path(TEMPLATE_DIR).rglob("*.html")):
+        digest.update(path.as_posix().encode("utf-8"))
+        digest.update(path.read_bytes())
+    digest.update(json.dumps(assets.manifest.files, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()[:16]
@@ -0,0 +1,297 @@
+"""Deterministic synthetic dataset for benchmarks.
+
+The same ``seed`` and ``Scale`` always produce the same rows, so timings from
+different runs describe the same data. Rows are written with Core bulk
+inserts; derived tables (lookup usage, customer balances and search terms,
+integrity findings) are rebuilt afterwards.
+"""
+
+import random
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models import (
+    Container,
+    Customer,
+    Destination,
+    DirectionEnum,
+    Driver,
+    Haulier,
+    Product,
+    TaxRate,
+    Ticket,
+    TicketStatusEnum,
+    TransactionTypeEnum,
+    Unit,
+    Vehicle,
+)
+from app.services.credit import reconcile_balances
+from app.services.customer_search import rebuild_customer_search_terms
+from app.services.integrity import run_integrity_scan
+from app.services.lookups import rebuild_lookup_usage
+
+BATCH_SIZE = 10_000
+START = datetime(2024, 1, 1, 6, 0, 0)
+DAYS = 730
+END = START + timedelta(days=DAYS)
+MONEY = Decimal("0.01")
+# Customers reserved for invoice-confirm runs, one per iteration.
+CONFIRM_TICKETS_PER_CUSTOMER = 20
+# Share of each weekday's traffic, Monday first.
+WEEKDAY_WEIGHTS = (1.0, 1.0, 1.0, 1.0, 0.9, 0.35, 0.05)
+CUSTOMER_TRADES = ("Skips", "Waste", "Haulage", "Recycling", "Builders")
+HOUR_WEIGHTS = (0.6, 1.0, 1.0, 0.9, 0.7, 0.8, 0.9, 0.8, 0.6, 0.4, 0.2)
+
+
+@dataclass(frozen=True)
+class Scale:
+    tickets: int = 1_000_000
+    customers: int = 2_000
+    vehicles: int = 6_000
+    products: int = 60
+    hauliers: int = 200
+    drivers: int = 800
+    containers: int = 40
+    destinations: int = 25
+    capture_tickets: int = 200
+    confirm_customers: int = 20
+
+
+@dataclass(frozen=True)
+class DatasetInfo:
+    seed: int
+    tickets: int
+    busiest_customer_id: int
+    capture_ticket_ids: tuple[int, ...]
+    confirm_customer_ids: tuple[int, ...]
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def _insert(db: Session, model, rows) -> None:
+    batch: list[dict] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            db.execute(insert(model.__table__), batch)
+            batch = []
+    if batch:
+        db.execute(insert(model.__table__), batch)
+
+
+def _ids(db: Session, model) -> list[int]:
+    return list(db.execute(select(model.id).order_by(model.id)).scalars())
+
+
+def _pick_datetime(rng: random.Random) -> datetime:
+    while True:
+        day = START + timedelta(days=rng.randrange(DAYS))
+        if rng.random() < WEEKDAY_WEIGHTS[day.weekday()]:
+            break
+    hour = rng.choices(range(len(HOUR_WEIGHTS)), HOUR_WEIGHTS)[0]
+    return day + timedelta(hours=hour, seconds=rng.randrange(3600))
+
+
+def generate(db: Session, *, seed: int = 42, scale: Scale = Scale()) -> DatasetInfo:
+    """Fill an empty database; the caller commits."""
+    if db.execute(select(func.count()).select_from(Ticket)).scalar_one():
+        raise ValueError("Benchmark dataset needs an empty database.")
+    rng = random.Random(seed)
+
+    unit_id = db.execute(
+        insert(Unit).values(name="tonne", is_active=True).returning(Unit.id)
+    ).scalar_one()
+    tax_rate_id = db.execute(
+        insert(TaxRate)
+        .values(code="S", description="Standard", rate_percent=Decimal("20"))
+        .returning(TaxRate.id)
+    ).scalar_one()
+    for model, count in (
+        (Haulier, scale.hauliers),
+        (Driver, scale.drivers),
+        (Container, scale.containers),
+        (Destination, scale.destinations),
+    ):
+        _insert(
+            db,
+            model,
+            (
+                {"name": f"{model.__name__} {number:05d}", "is_active": True}
+                for number in range(1, count + 1)
+            ),
+        )
+    _insert(
+        db,
+        Product,
+        (
+            {
+                "code": f"P{number:03d}",
+                "description": f"Material {number:03d}",
+                "unit_id": unit_id,
+                "tax_rate_id": tax_rate_id,
+                "unit_price": Decimal(rng.randrange(1500, 12000)) / 100,
+                "account_price": Decimal(rng.randrange(1400, 11000)) / 100,
+                "cash_price": Decimal(rng.randrange(1600, 13000)) / 100,
+                "min_price": Decimal("10.00") if number % 4 == 0 else None,
+                "is_hazardous": number % 15 == 0,
+                "final_disposal": False,
+                "used_on_site": False,
+            }
+            for number in range(1, scale.products + 1)
+        ),
+    )
+    total_customers = scale.customers + scale.confirm_customers
+    _insert(
+        db,
+        Customer,
+        (
+            {
+                "account_code": f"C{number:06d}",
+                "name": f"Customer {number:06d} {rng.choice(CUSTOMER_TRADES)}",
+                "cash_account": rng.random() < 0.15,
+                "credit_limit": Decimal(rng.choice((5000, 10000, 25000, 50000))),
+                "on_stop": False,
+                "do_not_invoice": False,
+                "must_have_po": False,
+            }
+            for number in range(1, total_customers + 1)
+        ),
+    )
+    customer_ids = _ids(db, Customer)
+    regular_customers = customer_ids[: scale.customers]
+    confirm_customers = customer_ids[scale.customers :]
+    haulier_ids = _ids(db, Haulier)
+    driver_ids = _ids(db, Driver)
+    container_ids = _ids(db, Container)
+    destination_ids = _ids(db, Destination)
+    _insert(
+        db,
+        Vehicle,
+        (
+            {
+                "registration": f"BN{number:05d}",
+                "owner_customer_id": rng.choice(regular_customers),
+                "default_tare_kg": Decimal(rng.randrange(7000, 16000)),
+                "haulier_id": rng.choice(haulier_ids),
+                "driver_id": rng.choice(driver_ids),
+            }
+            for number in range(1, scale.vehicles + 1)
+        ),
+    )
+    vehicle_ids = _ids(db, Vehicle)
+    products = db.execute(select(Product.id, Product.unit_price)).all()
+
+    # A few customers bring most of the traffic (Pareto), as on a real site.
+    customer_weights = [
+        1 / (rank**1.1) for rank in range(1, len(regular_customers) + 1)
+    ]
+    open_after = END - timedelta(days=3)
+
+    def ticket_row(number: int, customer_id: int, when: datetime, status: str) -> dict:
+        product_id, price = rng.choice(products)
+        direction = (
+            DirectionEnum.INWARD.value
+            if rng.random() < 0.7
+            else DirectionEnum.OUTWARD.value
+        )
+        tare = Decimal(rng.randrange(7000, 16000))
+        net = Decimal(int(rng.lognormvariate(8.6, 0.6)))
+        qty = (net / 1000).quantize(Decimal("0.001"))
+        row = {
+            "ticket_no": f"{str(when.year)[2:]}-{number:07d}",
+            "created_at": when,
+            "updated_at": when,
+            "datetime": when,
+            "status": status,
+            "direction": direction,
+            "transaction_type": TransactionTypeEnum.WASTEIN.value
+            if direction == DirectionEnum.INWARD.value
+            else rng.choice(
+                (TransactionTypeEnum.WASTEOUT.value, TransactionTypeEnum.SALE.value)
+            ),
+            "customer_id": customer_id,
+            "vehicle_id": rng.choice(vehicle_ids),
+            "product_id": product_id,
+            "haulier_id": rng.choice(haulier_ids) if rng.random() < 0.6 else None,
+            "driver_id": rng.choice(driver_ids) if rng.random() < 0.4 else None,
+            "container_id": rng.choice(container_ids) if rng.random() < 0.3 else None,
+            "destination_id": rng.choice(destination_ids)
+            if rng.random() < 0.2
+            else None,
+            "gross_kg": tare + net,
+            "tare_kg": tare,
+            "net_kg": net,
+            "qty": qty,
+            "unit_id": unit_id,
+            "unit_price": price,
+            "total": (qty * price).quantize(MONEY),
+            "dont_invoice": rng.random() < 0.02,
+            "paid": False,
+        }
+        if status == TicketStatusEnum.OPEN.value:
+            row.update(gross_kg=None, tare_kg=None, net_kg=None, total=None)
+        return row
+
+    def tickets():
+        for number in range(1, scale.tickets + 1):
+            when = _pick_datetime(rng)
+            roll = rng.random()
+            if when >= open_after and roll < 0.5:
+                status = TicketStatusEnum.OPEN.value
+            elif roll < 0.03:
+                status = TicketStatusEnum.VOID.value
+            else:
+                status = TicketStatusEnum.COMPLETE.value
+            customer_id = rng.choices(regular_customers, customer_weights)[0]
+            yield ticket_row(number, customer_id, when, status)
+
+        number = scale.tickets
+        last_day = END - timedelta(days=1)
+        for customer_id in confirm_customers:
+            for _ in range(CONFIRM_TICKETS_PER_CUSTOMER):
+                number += 1
+                row = ticket_row(
+                    number,
+                    customer_id,
+                    _pick_datetime(rng),
+                    TicketStatusEnum.COMPLETE.value,
+                )
+                row["dont_invoice"] = False
+                yield row
+        for _ in range(scale.capture_tickets):
+            number += 1
+            row = ticket_row(
+                number,
+                rng.choice(regular_customers),
+                last_day + timedelta(minutes=rng.randrange(600)),
+                TicketStatusEnum.OPEN.value,
+            )
+            row.update(
+                direction=DirectionEnum.INWARD.value,
+                transaction_type=TransactionTypeEnum.WASTEIN.value,
+            )
+            yield row
+
+    _insert(db, Ticket, tickets())
+
+    capture_ids = tuple(
+        db.execute(
+            select(Ticket.id).order_by(Ticket.id.desc()).limit(scale.capture_tickets)
+        ).scalars()
+    )[::-1]
+    rebuild_lookup_usage(db)
+    rebuild_customer_search_terms(db)
+    reconcile_balances(db, fix=True)
+    run_integrity_scan(db, full=True)
+    return DatasetInfo(
+        seed=seed,
+        tickets=scale.tickets,
+        busiest_customer_id=regular_customers[0],
+        capture_ticket_ids=capture_ids,
+        confirm_customer_ids=tuple(confirm_customers),
+    )
@@ -0,0 +1,409 @@
+"""Replay the weighbridge ticket lifecycle from several lanes at once.
+
+    python -m benchmarks.load --lanes 4 --arrival-rate 2 --duration 60
+
+Vehicles arrive at ``--arrival-rate`` per second (Poisson) and queue for the
+first free lane. Each lane stands in for one bridge with its own simulated
+indicator and runs quick-create -> set vehicle/product -> gross -> tare ->
+complete over HTTP. Without ``--base-url`` the app is served by uvicorn in
+this process against ``--database-url``. With it, ``--database-url`` is
+required and must be the running server's database, which the vehicle and
+product ids are read from.
+
+Per step the report gives p50/p95/p99 latency and error and conflict rates.
+A conflict is the app refusing a step (4xx), or two lanes being handed the
+same ticket by quick-create; anything else unexpected is an error.
+"""
+
+import argparse
+import json
+import math
+import os
+import queue
+import random
+import socket
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+DEFAULT_DATABASE_URL = "sqlite+pysqlite:///var/benchmarks/load.db"
+STEPS = ("queue", "create", "details", "gross", "tare", "complete")
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of ``values`` (which must not be empty)."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(len(ordered) * pct / 100))
+    return ordered[rank - 1]
+
+
+@dataclass
+class StepStats:
+    timings_ms: list[float] = field(default_factory=list)
+    errors: int = 0
+    conflicts: int = 0
+
+    def summary(self) -> dict:
+        attempts = len(self.timings_ms)
+        result = {
+            "count": attempts,
+            "errors": self.errors,
+            "conflicts": self.conflicts,
+            "error_rate": round(self.errors / attempts, 4) if attempts else 0.0,
+            "conflict_rate": round(self.conflicts / attempts, 4) if attempts else 0.0,
+        }
+        if attempts:
+            for pct in (50, 95, 99):
+                result[f"p{pct}_ms"] = round(percentile(self.timings_ms, pct), 3)
+        return result
+
+
+class LoadStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.steps: dict[str, StepStats] = defaultdict(StepStats)
+        self.claimed_tickets: set[int] = set()
+        self.completed = 0
+
+    def record(self, step: str, seconds: float, outcome: str = "ok") -> None:
+        with self._lock:
+            stats = self.steps[step]
+            stats.timings_ms.append(seconds * 1000)
+            if outcome == "error":
+                stats.errors += 1
+            elif outcome == "conflict":
+                stats.conflicts += 1
+
+    def conflict(self, step: str) -> None:
+        with self._lock:
+            self.steps[step].conflicts += 1
+
+    def claim(self, ticket_id: int) -> bool:
+        with self._lock:
+            if ticket_id in self.claimed_tickets:
+                return False
+            self.claimed_tickets.add(ticket_id)
+            return True
+
+    def vehicle_completed(self) -> None:
+        with self._lock:
+            self.completed += 1
+
+
+class StepFailed(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class Reference:
+    vehicle_ids: tuple[int, ...]
+    product_ids: tuple[int, ...]
+
+
+def _timed(stats: LoadStats, step: str, expect: int, call) -> httpx.Response:
+    started = time.perf_counter()
+    try:
+        response = call()
+    except httpx.HTTPError:
+        stats.record(step, time.perf_counter() - started, "error")
+        raise StepFailed(step)
+    elapsed = time.perf_counter() - started
+    if response.status_code == expect:
+        stats.record(step, elapsed)
+        return response
+    outcome = "conflict" if 400 <= response.status_code < 500 else "error"
+    stats.record(step, elapsed, outcome)
+    raise StepFailed(step)
+
+
+def run_vehicle(
+    client: httpx.Client,
+    stats: LoadStats,
+    reference: Reference,
+    indicator,
+    rng: random.Random,
+    dwell_seconds: float,
+) -> None:
+    tare_kg = rng.randrange(7000, 16000)
+    load_kg = tare_kg + int(rng.lognormvariate(8.6, 0.6))
+
+    response = _timed(
+        stats,
+        "create",
+        303,
+        lambda: client.post("/tickets/new/quick", follow_redirects=False),
+    )
+    ticket_id = int(response.headers["location"].rsplit("/", 1)[-1])
+    if not stats.claim(ticket_id):
+        # quick-create reused a blank ticket another lane is already filling.
+        stats.conflict("create")
+        return
+
+    details = {
+        "datetime": datetime.now().strftime("%Y-%m-%dT%H:%M"),
+        "direction": "INWARD",
+        "transaction_type": "WASTEIN",
+        "vehicle_id": str(rng.choice(reference.vehicle_ids)),
+        "product_id": str(rng.choice(reference.product_ids)),
+    }
+    _timed(
+        stats,
+        "details",
+        303,
+        lambda: client.post(
+            f"/tickets/{ticket_id}",
+            data={**details, "action": "save"},
+            follow_redirects=False,
+        ),
+    )
+
+    indicator.drive_on(load_kg)
+    gross = indicator.get_weight_kg()
+    _timed(
+        stats,
+        "gross",
+        200,
+        lambda: client.post(
+            f"/tickets/{ticket_id}/weights/gross", data={"weight_value": gross}
+        ),
+    )
+    indicator.drive_off()
+    if dwell_seconds:
+        time.sleep(dwell_seconds)
+
+    indicator.drive_on(tare_kg)
+    tare = indicator.get_weight_kg()
+    _timed(
+        stats,
+        "tare",
+        200,
+        lambda: client.post(
+            f"/tickets/{ticket_id}/weights/tare", data={"weight_value": tare}
+        ),
+    )
+    indicator.drive_off()
+
+    complete = {**details, "action": "complete", "gross_kg": gross, "tare_kg": tare}
+    _timed(
+        stats,
+        "complete",
+        303,
+        lambda: client.post(
+            f"/tickets/{ticket_id}", data=complete, follow_redirects=False
+        ),
+    )
+    stats.vehicle_completed()
+
+
+def lane(
+    base_url: str,
+    arrivals: queue.Queue,
+    stats: LoadStats,
+    reference: Reference,
+    seed: int,
+    dwell_seconds: float,
+) -> None:
+    from app.services.weight_source import SimulatedIndicatorWeightSource
+
+    rng = random.Random(seed)
+    indicator = SimulatedIndicatorWeightSource(rng)
+    with httpx.Client(base_url=base_url, timeout=30.0) as client:
+        while True:
+            arrived = arrivals.get()
+            if arrived is None:
+                return
+            stats.record("queue", time.perf_counter() - arrived)
+            try:
+                run_vehicle(client, stats, reference, indicator, rng, dwell_seconds)
+            except StepFailed:
+                pass
+
+
+def load_reference(database_url: str) -> Reference:
+    """Vehicle and product ids to use, seeding a small set if there are none."""
+    from sqlalchemy import create_engine, select
+    from sqlalchemy.orm import Session
+
+    from app.models import Base, Product, Vehicle
+
+    from .dataset import Scale, generate
+
+    engine = create_engine(database_url)
+    try:
+        Base.metadata.create_all(engine)
+        with Session(engine) as db:
+            vehicle_ids = tuple(db.execute(select(Vehicle.id)).scalars())
+            product_ids = tuple(db.execute(select(Product.id)).scalars())
+            if not vehicle_ids or not product_ids:
+                generate(
+                    db,
+                    scale=Scale(
+                        tickets=0,
+                        customers=50,
+                        vehicles=200,
+                        products=10,
+                        hauliers=10,
+                        drivers=20,
+                        containers=5,
+                        destinations=5,
+                        capture_tickets=0,
+                        confirm_customers=0,
+                    ),
+                )
+                db.commit()
+                vehicle_ids = tuple(db.execute(select(Vehicle.id)).scalars())
+                product_ids = tuple(db.execute(select(Product.id)).scalars())
+    finally:
+        engine.dispose()
+    return Reference(vehicle_ids, product_ids)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve_in_process():
+    """Start the app under uvicorn on a free local port; returns (url, stop)."""
+    import uvicorn
+
+    from app.main import app
+
+    port = _free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("uvicorn failed to start")
+        time.sleep(0.05)
+
+    def stop() -> None:
+        server.should_exit = True
+        thread.join()
+
+    return f"http://127.0.0.1:{port}", stop
+
+
+def simulate(
+    base_url: str,
+    reference: Reference,
+    *,
+    lanes: int,
+    arrival_rate: float,
+    duration_seconds: float,
+    dwell_seconds: float = 0.0,
+    seed: int = 42,
+) -> dict:
+    stats = LoadStats()
+    arrivals: queue.Queue = queue.Queue()
+    workers = [
+        threading.Thread(
+            target=lane,
+            args=(base_url, arrivals, stats, reference, seed + number, dwell_seconds),
+        )
+        for number in range(lanes)
+    ]
+    for worker in workers:
+        worker.start()
+
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    arrived = 0
+    next_arrival = started + rng.expovariate(arrival_rate)
+    while next_arrival - started < duration_seconds:
+        time.sleep(max(0.0, next_arrival - time.perf_counter()))
+        arrivals.put(time.perf_counter())
+        arrived += 1
+        next_arrival += rng.expovariate(arrival_rate)
+    for _ in workers:
+        arrivals.put(None)
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "meta": {
+            "lanes": lanes,
+            "arrival_rate_per_second": arrival_rate,
+            "duration_seconds": duration_seconds,
+            "dwell_seconds": dwell_seconds,
+            "seed": seed,
+            "vehicles_arrived": arrived,
+            "vehicles_completed": stats.completed,
+            "completed_per_minute": round(stats.completed * 60 / elapsed, 2),
+        },
+        "steps": {
+            step: stats.steps[step].summary() for step in STEPS if step in stats.steps
+        },
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load")
+    parser.add_argument("--lanes", type=int, default=4)
+    parser.add_argument(
+        "--arrival-rate", type=float, default=1.0, help="Vehicles per second."
+    )
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds.")
+    parser.add_argument(
+        "--dwell", type=float, default=0.0, help="Seconds between gross and tare."
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--database-url",
+        help=f"Default {DEFAULT_DATABASE_URL}; required with --base-url.",
+    )
+    parser.add_argument("--base-url", help="Drive an already running server.")
+    parser.add_argument("--output", help="Write results as JSON to this path.")
+    args = parser.parse_args(argv)
+    if args.database_url is None:
+        if args.base_url is not None:
+            parser.error("--base-url needs the server's --database-url")
+        args.database_url = DEFAULT_DATABASE_URL
+
+    # The in-process server reads its settings on import.
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("SECRET_KEY", "load-test")
+    if args.database_url.startswith("sqlite") and ":///" in args.database_url:
+        Path(args.database_url.split(":///", 1)[1]).parent.mkdir(
+            parents=True, exist_ok=True
+        )
+
+    reference = load_reference(args.database_url)
+    stop = None
+    base_url = args.base_url
+    if base_url is None:
+        base_url, stop = serve_in_process()
+    try:
+        results = simulate(
+            base_url,
+            reference,
+            lanes=args.lanes,
+            arrival_rate=args.arrival_rate,
+            duration_seconds=args.duration,
+            dwell_seconds=args.dwell,
+            seed=args.seed,
+        )
+    finally:
+        if stop is not None:
+            stop()
+
+    rendered = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(rendered + "\n")
+    print(rendered)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
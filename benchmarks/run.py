@@ -0,0 +1,275 @@
+"""Time the key request paths against a synthetic dataset.
+
+    python -m benchmarks.run --tickets 1000000 --output var/bench.json
+    python -m benchmarks.run --baseline var/bench.json
+
+Each case reports wall-clock latency (median, p95, min) and the SQL statements
+it issued. With ``--baseline`` the run exits non-zero when a case is slower
+than the baseline median by more than ``--tolerance`` or issues more
+statements than it did.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from itertools import count
+from pathlib import Path
+
+DEFAULT_DATABASE_URL = "sqlite+pysqlite:///var/benchmarks/bench.db"
+
+os.environ.setdefault("DATABASE_URL", DEFAULT_DATABASE_URL)
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.engine import make_url  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.db import engine_options, get_db, get_read_db  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Base  # noqa: E402
+from app.services.query_budget import track_engine  # noqa: E402
+
+from .dataset import END, DatasetInfo, Scale, generate  # noqa: E402
+
+PREVIEW_FROM = (END - timedelta(days=31)).date().isoformat()
+PREVIEW_TO = (END - timedelta(days=1)).date().isoformat()
+RECENT_FROM = (END - timedelta(days=7)).date().isoformat()
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    method: str
+    # Called with the iteration number; returns (url, form data).
+    request: object
+    expect_status: int = 200
+    debug: bool = False
+
+
+@dataclass
+class CaseResult:
+    name: str
+    timings_ms: list[float] = field(default_factory=list)
+    queries: int = 0
+
+    def summary(self) -> dict:
+        ordered = sorted(self.timings_ms)
+        p95_index = max(0, round(0.95 * len(ordered)) - 1)
+        return {
+            "iterations": len(ordered),
+            "median_ms": round(statistics.median(ordered), 3),
+            "p95_ms": round(ordered[p95_index], 3),
+            "min_ms": round(ordered[0], 3),
+            "queries_per_request": self.queries // max(len(ordered), 1),
+        }
+
+
+def _list(**params):
+    query = "&".join(f"{name}={value}" for name, value in params.items())
+    return lambda _: (f"/tickets?{query}" if query else "/tickets", None)
+
+
+def build_cases(info: DatasetInfo) -> list[Case]:
+    captures = iter(info.capture_ticket_ids)
+    confirms = iter(info.confirm_customer_ids)
+    captured: list[int] = []
+    ticket_ids = count(1, max(info.tickets // 97, 1))
+
+    def gross(_):
+        ticket_id = next(captures)
+        captured.append(ticket_id)
+        return f"/tickets/{ticket_id}/weights/gross", {"weight_value": "24000"}
+
+    def tare(iteration):
+        ticket_id = captured[iteration]
+        return f"/tickets/{ticket_id}/weights/tare", {"weight_value": "11000"}
+
+    def confirm(_):
+        return "/invoices/generate/confirm", {
+            "customer_id": str(next(confirms)),
+            "date_from": "",
+            "date_to": "",
+        }
+
+    return [
+        Case("tickets_list", "GET", _list()),
+        Case(
+            "tickets_list.date_range",
+            "GET",
+            _list(date_from=RECENT_FROM, date_to=PREVIEW_TO),
+        ),
+        Case("tickets_list.status", "GET", _list(status="VOID")),
+        Case("tickets_list.open_only", "GET", _list(open_only=1)),
+        Case("tickets_list.direction", "GET", _list(direction="OUTWARD")),
+        Case("tickets_list.transaction_type", "GET", _list(transaction_type="SALE")),
+        Case("tickets_list.ticket_no", "GET", _list(ticket_no="25-0500000")),
+        Case("tickets_list.q", "GET", _list(q="recycling")),
+        Case("tickets_list.deep_page", "GET", _list(page=500)),
+        Case("ticket_edit", "GET", lambda _: (f"/tickets/{next(ticket_ids)}", None)),
+        Case("weight_capture.gross", "POST", gross),
+        Case("weight_capture.tare", "POST", tare),
+        Case(
+            "invoice_preview",
+            "POST",
+            lambda _: (
+                "/invoices/generate",
+                {
+                    "customer_id": str(info.busiest_customer_id),
+                    "date_from": PREVIEW_FROM,
+                    "date_to": PREVIEW_TO,
+                },
+            ),
+        ),
+        Case("invoice_confirm", "POST", confirm, expect_status=303),
+        Case(
+            "debug_integrity",
+            "GET",
+            lambda _: ("/debug/integrity", None),
+            debug=True,
+        ),
+    ]
+
+
+def run_case(client: TestClient, engine, case: Case, iterations: int) -> CaseResult:
+    result = CaseResult(case.name)
+    previous_debug = settings.debug
+    settings.debug = case.debug
+    try:
+        with track_engine(engine) as tracker:
+            for iteration in range(iterations):
+                url, data = case.request(iteration)
+                started = time.perf_counter()
+                response = client.request(
+                    case.method, url, data=data, follow_redirects=False
+                )
+                result.timings_ms.append((time.perf_counter() - started) * 1000)
+                if response.status_code != case.expect_status:
+                    raise RuntimeError(
+                        f"{case.name}: {case.method} {url} returned "
+                        f"{response.status_code}, expected {case.expect_status}"
+                    )
+        result.queries = tracker.count
+    finally:
+        settings.debug = previous_debug
+    return result
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Describe every case that regressed against ``baseline``."""
+    regressions: list[str] = []
+    for name, before in baseline.get("cases", {}).items():
+        after = current["cases"].get(name)
+        if after is None:
+            regressions.append(f"{name}: missing from this run")
+            continue
+        limit = before["median_ms"] * (1 + tolerance)
+        if after["median_ms"] > limit:
+            regressions.append(
+                f"{name}: median {after['median_ms']:.1f} ms exceeds "
+                f"{before['median_ms']:.1f} ms by more than {tolerance:.0%}"
+            )
+        if after["queries_per_request"] > before["queries_per_request"]:
+            regressions.append(
+                f"{name}: {after['queries_per_request']} queries per request, "
+                f"was {before['queries_per_request']}"
+            )
+    return regressions
+
+
+def prepare_database(url: str, seed: int, scale: Scale):
+    url_obj = make_url(url)
+    if url_obj.get_backend_name() == "sqlite" and url_obj.database:
+        Path(url_obj.database).parent.mkdir(parents=True, exist_ok=True)
+    engine = create_engine(url, **engine_options(url))
+    # The cases consume open tickets and uninvoiced customers, so every run
+    # starts from a freshly generated dataset.
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    with SessionLocal() as db:
+        info = generate(db, seed=seed, scale=scale)
+        db.commit()
+    return engine, SessionLocal, info
+
+
+def run(url: str, *, seed: int, scale: Scale, iterations: int) -> dict:
+    started = time.perf_counter()
+    engine, SessionLocal, info = prepare_database(url, seed, scale)
+    generated_seconds = time.perf_counter() - started
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    try:
+        with TestClient(app) as client:
+            results = [
+                run_case(client, engine, case, iterations)
+                for case in build_cases(info)
+            ]
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
+
+    return {
+        "meta": {
+            "seed": seed,
+            "tickets": scale.tickets,
+            "iterations": iterations,
+            "backend": make_url(url).get_backend_name(),
+            "python": platform.python_version(),
+            "generate_seconds": round(generated_seconds, 1),
+        },
+        "cases": {result.name: result.summary() for result in results},
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--tickets", type=int, default=Scale.tickets)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--output", help="Write results as JSON to this path.")
+    parser.add_argument("--baseline", help="Fail on regressions against this file.")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    scale = Scale(
+        tickets=args.tickets,
+        capture_tickets=max(args.iterations, 1),
+        confirm_customers=max(args.iterations, 1),
+    )
+    results = run(
+        args.database_url, seed=args.seed, scale=scale, iterations=args.iterations
+    )
+    rendered = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(rendered + "\n")
+    print(rendered)
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
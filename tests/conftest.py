@@ -1,11 +1,14 @@
+from contextlib import contextmanager
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
-from app.db import get_db
+from app.db import get_db, get_read_db
 from app.main import app
 from app.models import Base
+from app.services.query_budget import N_PLUS_ONE_THRESHOLD, track_engine
 
 
 @pytest.fixture()
@@ -42,6 +45,25 @@ def client(SessionLocal):
             db.close()
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
+
+
+@pytest.fixture()
+def query_budget(engine):
+    """Assert the statements run inside the block stay within a budget."""
+
+    @contextmanager
+    def budget(max_queries: int, *, max_repeats: int = N_PLUS_ONE_THRESHOLD - 1):
+        with track_engine(engine) as tracker:
+            yield tracker
+        assert tracker.count <= max_queries, (
+            f"{tracker.count} statements, budget {max_queries}: "
+            f"{dict(tracker.shapes)}"
+        )
+        repeated = tracker.repeated(max_repeats + 1)
+        assert not repeated, f"Repeated statement shapes (N+1): {repeated}"
+
+    return budget
@@ -0,0 +1,150 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from app.models import (
+    Customer,
+    DirectionEnum,
+    Invoice,
+    InvoiceLine,
+    Ticket,
+    TicketStatusEnum,
+    TicketVoid,
+    TransactionTypeEnum,
+    VoidReason,
+)
+from app.services import archive
+
+CUTOFF = datetime(2020, 1, 1)
+
+
+def _ticket(ticket_no, when, status, customer, invoice=None):
+    return Ticket(
+        ticket_no=ticket_no,
+        datetime=when,
+        status=status.value,
+        direction=DirectionEnum.INWARD.value,
+        transaction_type=TransactionTypeEnum.WASTEIN.value,
+        customer_id=customer.id,
+        invoice_id=invoice.id if invoice else None,
+        net_kg=Decimal("1250.000"),
+    )
+
+
+@pytest.fixture()
+def tickets(db_session):
+    customer = Customer(account_code="C001", name="Acme Skips")
+    reason = VoidReason(code="DUP", description="Duplicate")
+    db_session.add_all([customer, reason])
+    db_session.flush()
+    invoice = Invoice(
+        invoice_no="INV-18-00001",
+        customer_id=customer.id,
+        invoice_date=date(2018, 3, 31),
+        status="ISSUED",
+        net_total=Decimal("100.00"),
+        vat_total=Decimal("20.00"),
+        gross_total=Decimal("120.00"),
+    )
+    db_session.add(invoice)
+    db_session.flush()
+    invoiced = _ticket(
+        "T-2018-1", datetime(2018, 3, 2, 9, 30), TicketStatusEnum.COMPLETE, customer, invoice
+    )
+    voided = _ticket("T-2019-1", datetime(2019, 6, 1, 8, 0), TicketStatusEnum.VOID, customer)
+    uninvoiced = _ticket(
+        "T-2018-2", datetime(2018, 4, 1, 8, 0), TicketStatusEnum.COMPLETE, customer
+    )
+    still_open = _ticket("T-2018-3", datetime(2018, 5, 1, 8, 0), TicketStatusEnum.OPEN, customer)
+    recent = _ticket(
+        "T-2024-1", datetime(2024, 1, 5, 8, 0), TicketStatusEnum.COMPLETE, customer, invoice
+    )
+    db_session.add_all([invoiced, voided, uninvoiced, still_open, recent])
+    db_session.flush()
+    db_session.add_all(
+        [
+            TicketVoid(
+                ticket_id=voided.id,
+                reason_id=reason.id,
+                note="Entered twice",
+                voided_at=datetime(2019, 6, 1, 9, 0),
+                voided_by="admin",
+            ),
+            InvoiceLine(
+                invoice_id=invoice.id,
+                ticket_id=invoiced.id,
+                description="T-2018-1 Soil",
+                quantity=Decimal("1.25"),
+                unit_price=Decimal("80.00"),
+                net=Decimal("100.00"),
+                vat=Decimal("20.00"),
+                gross=Decimal("120.00"),
+            ),
+        ]
+    )
+    db_session.commit()
+    return customer
+
+
+def _live_ticket_nos(db_session):
+    return set(db_session.execute(select(Ticket.ticket_no)).scalars())
+
+
+def test_archive_moves_closed_tickets_into_segments(db_session, tickets, tmp_path):
+    assert archive.count_archivable(db_session, CUTOFF) == 2
+
+    result = archive.archive_tickets(
+        db_session, cutoff=CUTOFF, directory=tmp_path, segment_rows=1
+    )
+
+    assert result.tickets == 2
+    assert result.segments == ["tickets-000001.ndjson.gz", "tickets-000002.ndjson.gz"]
+    assert _live_ticket_nos(db_session) == {"T-2018-2", "T-2018-3", "T-2024-1"}
+    assert db_session.execute(select(TicketVoid)).first() is None
+    line = db_session.execute(select(InvoiceLine)).scalar_one()
+    assert line.ticket_id is None
+
+    manifest = archive.load_manifest(tmp_path)
+    first, second = manifest["segments"]
+    assert first["state"] == second["state"] == "archived"
+    assert first["zones"]["ticket_no"] == ["T-2018-1", "T-2018-1"]
+    assert second["zones"]["datetime"] == ["2019-06-01T08:00:00", "2019-06-01T08:00:00"]
+
+    (row,) = archive.read_segment(tmp_path / first["file"])
+    assert row["customer_name"] == "Acme Skips"
+    assert row["net_kg"] == "1250.000"
+    assert row["void"] is None
+    (voided,) = archive.read_segment(tmp_path / second["file"])
+    assert voided["void"]["note"] == "Entered twice"
+
+    # Nothing left to move; a second run writes no segment.
+    assert archive.archive_tickets(db_session, cutoff=CUTOFF, directory=tmp_path).tickets == 0
+
+
+def test_search_skips_segments_outside_the_range(db_session, tickets, tmp_path):
+    archive.archive_tickets(db_session, cutoff=CUTOFF, directory=tmp_path, segment_rows=1)
+
+    rows, scanned = archive.search_archive(
+        archive.ArchiveQuery(date_from=datetime(2019, 1, 1)), directory=tmp_path
+    )
+    assert [row["ticket_no"] for row in rows] == ["T-2019-1"]
+    assert scanned == 1
+
+    rows, scanned = archive.search_archive(
+        archive.ArchiveQuery(customer_id=tickets.id + 1), directory=tmp_path
+    )
+    assert rows == [] and scanned == 0
+
+
+def test_archive_page_searches_segments(client, db_session, tickets, tmp_path, monkeypatch):
+    monkeypatch.setattr(archive.settings, "archive_dir", str(tmp_path))
+    archive.archive_tickets(db_session, cutoff=CUTOFF)
+
+    page = client.get("/archive/tickets", params={"ticket_no": "T-2018-1"})
+    assert page.status_code == 200
+    assert "T-2018-1" in page.text
+    assert "Acme Skips" in page.text
+    assert "T-2019-1" not in page.text
+    assert "Read 1 of 1 segments." in page.text
@@ -0,0 +1,113 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+
+from app.models import (
+    AuditEntry,
+    Customer,
+    DirectionEnum,
+    Ticket,
+    TicketStatusEnum,
+    TransactionTypeEnum,
+)
+from app.services.audit import AuditWriter, audit_writer
+
+
+def _entries(db_session, entity):
+    db_session.expire_all()
+    return list(
+        db_session.execute(
+            select(AuditEntry).where(AuditEntry.entity == entity).order_by(AuditEntry.id)
+        ).scalars()
+    )
+
+
+@pytest.fixture()
+def ticket(db_session):
+    ticket = Ticket(
+        ticket_no="T-AUDIT-1",
+        datetime=datetime(2026, 1, 1, 10, 0, 0),
+        status=TicketStatusEnum.OPEN.value,
+        direction=DirectionEnum.INWARD.value,
+        transaction_type=TransactionTypeEnum.WASTEIN.value,
+    )
+    db_session.add(ticket)
+    db_session.commit()
+    return ticket
+
+
+def test_field_changes_are_recorded(db_session):
+    customer = Customer(account_code="C001", name="Acme Skips")
+    db_session.add(customer)
+    db_session.commit()
+
+    customer.name = "Acme Skip Hire"
+    customer.account_code = "C001"
+    db_session.commit()
+
+    customer.name = "Discarded"
+    db_session.flush()
+    db_session.rollback()
+
+    customer_id = customer.id
+    db_session.delete(customer)
+    db_session.commit()
+
+    created, updated, deleted = _entries(db_session, "customer")
+    assert created.action == "create"
+    assert created.changes["name"] == [None, "Acme Skips"]
+    assert updated.action == "update"
+    assert updated.entity_id == customer_id
+    assert updated.changes == {"name": ["Acme Skips", "Acme Skip Hire"]}
+    assert updated.changed_by == "admin"
+    assert deleted.action == "delete"
+    assert deleted.changes["name"] == ["Acme Skip Hire", None]
+
+
+def test_running_writer_batches_after_commit(db_session, engine, ticket):
+    writer = AuditWriter()
+    writer.start(interval_seconds=60, batch_size=500)
+    try:
+        row = {
+            "entity": "ticket",
+            "entity_id": ticket.id,
+            "action": "update",
+            "changes": {"gross_kg": [None, "24000"]},
+            "changed_by": "admin",
+            "changed_at": datetime(2026, 1, 1),
+        }
+        writer.submit(engine, [row] * 3)
+        # Queued, not written, until the batch is flushed.
+        assert len(_entries(db_session, "ticket")) == 1
+        assert writer.flush() == 3
+    finally:
+        writer.stop()
+    assert len(_entries(db_session, "ticket")) == 4
+
+
+def test_ticket_save_shows_in_history(client, db_session, ticket):
+    response = client.post(
+        f"/tickets/{ticket.id}",
+        data={
+            "action": "save",
+            "datetime": "2026-01-01T10:00",
+            "direction": "INWARD",
+            "transaction_type": "WASTEIN",
+            "gross_kg": "24000",
+        },
+        headers={"HX-Request": "true"},
+    )
+    assert response.status_code == 200
+    audit_writer.flush()
+
+    created, updated = _entries(db_session, "ticket")
+    assert created.action == "create"
+    assert float(updated.changes["gross_kg"][1]) == 24000
+    assert "updated_at" not in updated.changes
+
+    page = client.get(f"/audit/ticket/{ticket.id}")
+    assert page.status_code == 200
+    assert "gross_kg" in page.text
+    assert "24000" in page.text
+    assert client.get(f"/audit/vehicle/{ticket.id}").status_code == 404
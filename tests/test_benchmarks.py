@@ -0,0 +1,71 @@
+from sqlalchemy import func, select
+
+from app.models import Ticket
+from benchmarks.dataset import Scale, generate
+from benchmarks.run import build_cases, compare, run_case
+
+TINY = Scale(
+    tickets=300,
+    customers=20,
+    vehicles=30,
+    products=5,
+    hauliers=5,
+    drivers=5,
+    containers=3,
+    destinations=3,
+    capture_tickets=1,
+    confirm_customers=1,
+)
+
+
+def test_every_benchmark_case_runs_on_a_tiny_dataset(client, engine, db_session):
+    info = generate(db_session, seed=7, scale=TINY)
+    db_session.commit()
+
+    total = db_session.execute(select(func.count()).select_from(Ticket)).scalar_one()
+    assert total == 300 + TINY.capture_tickets + 20
+    for case in build_cases(info):
+        summary = run_case(client, engine, case, iterations=1).summary()
+        assert summary["iterations"] == 1
+        assert summary["queries_per_request"] > 0
+
+
+def test_dataset_is_deterministic(SessionLocal, db_session):
+    first = generate(db_session, seed=7, scale=TINY)
+    rows = db_session.execute(
+        select(Ticket.ticket_no, Ticket.customer_id, Ticket.total).order_by(Ticket.id)
+    ).all()
+    db_session.rollback()
+
+    assert generate(db_session, seed=7, scale=TINY) == first
+    assert (
+        db_session.execute(
+            select(Ticket.ticket_no, Ticket.customer_id, Ticket.total).order_by(
+                Ticket.id
+            )
+        ).all()
+        == rows
+    )
+
+
+def test_compare_flags_slower_cases_and_extra_queries():
+    baseline = {
+        "cases": {
+            "a": {"median_ms": 10.0, "queries_per_request": 2},
+            "b": {"median_ms": 10.0, "queries_per_request": 2},
+            "c": {"median_ms": 10.0, "queries_per_request": 2},
+        }
+    }
+    current = {
+        "cases": {
+            "a": {"median_ms": 12.0, "queries_per_request": 2},
+            "b": {"median_ms": 14.0, "queries_per_request": 3},
+        }
+    }
+
+    regressions = compare(current, baseline, tolerance=0.25)
+
+    assert len(regressions) == 3
+    assert regressions[0].startswith("b: median 14.0 ms")
+    assert regressions[1] == "b: 3 queries per request, was 2"
+    assert regressions[2] == "c: missing from this run"
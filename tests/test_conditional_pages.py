@@ -0,0 +1,126 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from app.models import (
+    Container,
+    Customer,
+    DirectionEnum,
+    Product,
+    Ticket,
+    TicketStatusEnum,
+    TransactionTypeEnum,
+    Vehicle,
+)
+from app.routes import tickets as ticket_routes
+
+
+@pytest.fixture()
+def records(db_session):
+    customer = Customer(account_code="C001", name="Acme Skips")
+    db_session.add(customer)
+    db_session.flush()
+    vehicle = Vehicle(registration="AB12CDE", owner_customer_id=customer.id)
+    product = Product(code="P1", description="Soil", unit_price=Decimal("10.00"))
+    ticket = Ticket(
+        ticket_no="T-ETAG-1",
+        datetime=datetime(2026, 1, 1, 10, 0, 0),
+        status=TicketStatusEnum.OPEN.value,
+        direction=DirectionEnum.INWARD.value,
+        transaction_type=TransactionTypeEnum.WASTEIN.value,
+        customer_id=customer.id,
+    )
+    db_session.add_all([vehicle, product, ticket])
+    db_session.commit()
+    return {
+        "ticket": f"/tickets/{ticket.id}",
+        "customer": f"/customers/{customer.id}",
+        "vehicle": f"/vehicles/{vehicle.id}",
+        "product": f"/products/{product.id}",
+    }
+
+
+@pytest.mark.parametrize("page", ["ticket", "customer", "vehicle", "product"])
+def test_unchanged_edit_page_returns_304(client, records, page):
+    first = client.get(records[page])
+    assert first.status_code == 200
+    assert first.headers["etag"].startswith('W/"')
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    repeat = client.get(records[page], headers={"If-None-Match": first.headers["etag"]})
+    assert repeat.status_code == 304
+    assert repeat.content == b""
+    assert repeat.headers["etag"] == first.headers["etag"]
+
+    assert "last-modified" not in first.headers
+
+
+def test_ticket_revalidation_skips_rendering(client, records, monkeypatch):
+    etag = client.get(records["ticket"]).headers["etag"]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("rendered an unchanged ticket")
+
+    monkeypatch.setattr(ticket_routes, "_render_ticket_edit", fail)
+    assert client.get(records["ticket"], headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_edits_change_the_etag(client, records, db_session):
+    ticket_etag = client.get(records["ticket"]).headers["etag"]
+
+    # A new customer appears in the ticket page's customer list.
+    db_session.add(Customer(account_code="C002", name="Bravo Haulage"))
+    db_session.commit()
+    response = client.get(records["ticket"], headers={"If-None-Match": ticket_etag})
+    assert response.status_code == 200
+    assert "Bravo Haulage" in response.text
+
+    container = Container(name="Skip 8yd")
+    db_session.add(container)
+    db_session.commit()
+    vehicle_etag = client.get(records["vehicle"]).headers["etag"]
+    client.post(
+        f"{records['vehicle']}/tares",
+        data={"container_id": str(container.id), "tare_kg": "900"},
+    )
+    response = client.get(records["vehicle"], headers={"If-None-Match": vehicle_etag})
+    assert response.status_code == 200
+    assert "900" in response.text
+
+
+def test_deletes_are_not_hidden_by_if_modified_since(client, records, db_session):
+    container = Container(name="Skip 12yd")
+    db_session.add(container)
+    db_session.commit()
+    first = client.get(records["vehicle"])
+    assert "Skip 12yd" in first.text
+
+    db_session.delete(container)
+    db_session.commit()
+    response = client.get(
+        records["vehicle"],
+        headers={
+            "If-None-Match": first.headers["etag"],
+            "If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT",
+        },
+    )
+    assert response.status_code == 200
+    assert "Skip 12yd" not in response.text
+    since = client.get(
+        records["vehicle"], headers={"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"}
+    )
+    assert since.status_code == 200
+
+
+def test_large_html_is_compressed(client, records):
+    page = client.get(records["ticket"], headers={"Accept-Encoding": "gzip"})
+    assert page.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in page.headers["vary"]
+    assert "T-ETAG-1" in page.text
+
+    identity = client.get(records["ticket"], headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+
+    small = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
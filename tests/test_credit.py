@@ -0,0 +1,160 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from app.models import (
+    Customer,
+    DirectionEnum,
+    PaymentMethod,
+    Product,
+    Ticket,
+    TicketStatusEnum,
+    TransactionTypeEnum,
+    Vehicle,
+)
+from app.services.credit import reconcile_balances
+
+
+@pytest.fixture()
+def setup(db_session):
+    customer = Customer(
+        account_code="C001", name="Acme Skips", credit_limit=Decimal("100.00")
+    )
+    vehicle = Vehicle(registration="ABC123")
+    product = Product(code="P001", description="Mixed", unit_price=Decimal("10.00"))
+    db_session.add_all([customer, vehicle, product])
+    db_session.flush()
+    ticket = Ticket(
+        ticket_no="T-CREDIT-1",
+        datetime=datetime(2026, 1, 1, 10, 0, 0),
+        status=TicketStatusEnum.OPEN.value,
+        direction=DirectionEnum.INWARD.value,
+        transaction_type=TransactionTypeEnum.WASTEIN.value,
+        customer_id=customer.id,
+        dont_invoice=False,
+        paid=False,
+    )
+    db_session.add(ticket)
+    db_session.commit()
+    return customer, vehicle, product, ticket
+
+
+def _complete(client, ticket, vehicle, product, customer):
+    return client.post(
+        f"/tickets/{ticket.id}",
+        data={
+            "action": "complete",
+            "datetime": "2026-01-01T10:00",
+            "direction": "INWARD",
+            "transaction_type": "WASTEIN",
+            "gross_kg": "15000",
+            "tare_kg": "3000",
+            "qty": "12",
+            "customer_id": str(customer.id),
+            "vehicle_id": str(vehicle.id),
+            "product_id": str(product.id),
+        },
+        follow_redirects=False,
+    )
+
+
+def test_on_stop_customer_blocks_completion(client, db_session, setup):
+    customer, vehicle, product, ticket = setup
+    customer.on_stop = True
+    db_session.commit()
+
+    response = _complete(client, ticket, vehicle, product, customer)
+    assert response.status_code == 400
+    assert "Customer is on stop." in response.text
+    db_session.refresh(customer)
+    assert customer.uninvoiced_balance == Decimal("0.00")
+
+
+def test_balances_follow_ticket_and_invoice_lifecycle(client, db_session, setup):
+    customer, vehicle, product, ticket = setup
+    db_session.add(PaymentMethod(code="BACS", is_active=True))
+    db_session.commit()
+
+    assert _complete(client, ticket, vehicle, product, customer).status_code == 303
+    db_session.refresh(customer)
+    assert customer.uninvoiced_balance == Decimal("120.00")
+    response = client.get(f"/tickets/{ticket.id}")
+    assert "over their credit limit" in response.text
+
+    response = client.post(
+        "/invoices/generate/confirm",
+        data={"customer_id": str(customer.id)},
+        follow_redirects=False,
+    )
+    assert response.status_code == 303
+    db_session.refresh(customer)
+    assert customer.uninvoiced_balance == Decimal("0.00")
+    assert customer.unpaid_invoice_balance == Decimal("120.00")
+    assert reconcile_balances(db_session) == []
+
+    invoice_url = response.headers["location"].split("?")[0]
+    payment_method = db_session.query(PaymentMethod).one()
+    client.post(
+        f"{invoice_url}/paid",
+        data={"payment_method_id": str(payment_method.id), "paid_at": "2026-01-31"},
+    )
+    db_session.refresh(customer)
+    assert customer.unpaid_invoice_balance == Decimal("0.00")
+
+
+def test_reconcile_reports_and_fixes_drift(db_session, setup):
+    customer, *_ = setup
+    customer.uninvoiced_balance = Decimal("5.00")
+    db_session.commit()
+
+    [mismatch] = reconcile_balances(db_session, fix=True)
+    assert mismatch.expected_uninvoiced == Decimal("0.00")
+    db_session.commit()
+    assert reconcile_balances(db_session) == []
+
+
+def test_balance_changes_leave_customer_updated_at_alone(client, db_session, setup):
+    customer, vehicle, product, ticket = setup
+    other = Customer(account_code="C002", name="Bravo Haulage")
+    db_session.add(other)
+    db_session.flush()
+    same_customer, other_customer = (
+        Ticket(
+            ticket_no=ticket_no,
+            datetime=datetime(2026, 1, 2, 10, 0, 0),
+            status=TicketStatusEnum.OPEN.value,
+            direction=DirectionEnum.INWARD.value,
+            transaction_type=TransactionTypeEnum.WASTEIN.value,
+            customer_id=customer_id,
+        )
+        for ticket_no, customer_id in (
+            ("T-CREDIT-2", customer.id),
+            ("T-CREDIT-3", other.id),
+        )
+    )
+    db_session.add_all([same_customer, other_customer])
+    db_session.commit()
+    updated_at = customer.updated_at
+    etags = {
+        page.id: client.get(f"/tickets/{page.id}").headers["etag"]
+        for page in (same_customer, other_customer)
+    }
+
+    assert _complete(client, ticket, vehicle, product, customer).status_code == 303
+    db_session.refresh(customer)
+    assert customer.uninvoiced_balance == Decimal("120.00")
+    assert customer.updated_at == updated_at
+
+    # Over the limit now: the warning appears on this customer's tickets only.
+    response = client.get(
+        f"/tickets/{same_customer.id}",
+        headers={"If-None-Match": etags[same_customer.id]},
+    )
+    assert response.status_code == 200
+    assert "over their credit limit" in response.text
+    response = client.get(
+        f"/tickets/{other_customer.id}",
+        headers={"If-None-Match": etags[other_customer.id]},
+    )
+    assert response.status_code == 304
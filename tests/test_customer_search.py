@@ -0,0 +1,85 @@
+from sqlalchemy import select
+
+from app.models import Customer, CustomerSearchTerm
+from app.services.customer_search import customer_page, normalize_search_text
+
+
+def _terms(db_session, customer_id):
+    return set(
+        db_session.execute(
+            select(CustomerSearchTerm.term).where(
+                CustomerSearchTerm.customer_id == customer_id
+            )
+        ).scalars()
+    )
+
+
+def test_normalize_search_text_strips_accents_and_punctuation():
+    assert normalize_search_text("  Café-Müller & Sons ") == "cafe muller sons"
+
+
+def test_search_terms_follow_customer_changes(db_session):
+    customer = Customer(account_code="AB-12", name="Acme Skip Hire")
+    db_session.add(customer)
+    db_session.commit()
+    assert _terms(db_session, customer.id) == {"ab", "12", "ab12", "acme", "skip", "hire"}
+
+    customer.name = "Zenith Waste"
+    db_session.commit()
+    assert _terms(db_session, customer.id) == {"ab", "12", "ab12", "zenith", "waste"}
+
+
+def test_customer_page_matches_word_prefixes(db_session):
+    db_session.add_all(
+        [
+            Customer(account_code="C001", name="Acme Skip Hire"),
+            Customer(account_code="C002", name="Skipton Metals"),
+            Customer(account_code="C003", name="Bridge Haulage"),
+        ]
+    )
+    db_session.commit()
+
+    names = [c.name for c in customer_page(db_session, q="skip")[0]]
+    assert names == ["Acme Skip Hire", "Skipton Metals"]
+    names = [c.name for c in customer_page(db_session, q="skip acm")[0]]
+    assert names == ["Acme Skip Hire"]
+    names = [c.name for c in customer_page(db_session, q="c003")[0]]
+    assert names == ["Bridge Haulage"]
+
+
+def test_customer_list_keyset_pages(client, db_session):
+    db_session.add_all(
+        [Customer(account_code=f"C{i:03d}", name=f"Customer {i:03d}") for i in range(55)]
+    )
+    db_session.commit()
+
+    first, next_after = customer_page(db_session, limit=50)
+    assert len(first) == 50 and next_after == first[-1].id
+
+    response = client.get("/customers")
+    assert response.status_code == 200
+    assert "Customer 049" in response.text
+    assert "Customer 050" not in response.text
+    assert f"after={next_after}" in response.text
+
+    response = client.get(f"/customers?after={next_after}")
+    assert "Customer 050" in response.text
+    assert "Customer 049" not in response.text
+    assert "after=" not in response.text
+
+
+def test_typeahead_json_and_fragment(client, db_session):
+    db_session.add(Customer(account_code="C001", name="Acme Skip Hire"))
+    db_session.commit()
+
+    response = client.get("/customers/typeahead?q=acme&format=json")
+    assert response.status_code == 200
+    assert [row["account_code"] for row in response.json()] == ["C001"]
+
+    response = client.get(
+        "/customers/typeahead?q=acme&target=customer_id",
+        headers={"HX-Request": "true"},
+    )
+    assert response.status_code == 200
+    assert 'data-target="customer_id"' in response.text
+    assert "Acme Skip Hire" in response.text
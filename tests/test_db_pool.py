@@ -0,0 +1,72 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
+
+from app.config import Settings, settings
+from app.db import InstrumentedQueuePool, engine_options, pool_status
+
+
+def _settings(**overrides) -> Settings:
+    return Settings(database_url="sqlite://", secret_key="test", **overrides)
+
+
+def test_engine_options_follow_settings(tmp_path):
+    url = f"sqlite+pysqlite:///{tmp_path / 'pool.db'}"
+    options = engine_options(
+        url, _settings(db_pool_size=2, db_max_overflow=1, db_pool_reset_on_return="none")
+    )
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert options["pool_size"] == 2
+    assert options["max_overflow"] == 1
+    assert options["pool_pre_ping"] is False
+    assert options["pool_reset_on_return"] is None
+
+    assert "pool_size" not in engine_options("sqlite://", _settings())
+    postgres = engine_options(
+        "postgresql+psycopg://wb@localhost/wb", _settings(db_statement_timeout_ms=5000)
+    )
+    assert postgres["connect_args"] == {"options": "-c statement_timeout=5000"}
+
+
+def test_pool_status_reports_checkouts(tmp_path):
+    url = f"sqlite+pysqlite:///{tmp_path / 'pool.db'}"
+    engine = create_engine(url, **engine_options(url, _settings(db_pool_size=2)))
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        status = pool_status(engine)
+        assert status.checked_out == 1
+        assert status.size == 2
+    status = pool_status(engine)
+    assert status.checked_out == 0
+    assert status.checkouts == 1
+    assert status.timeouts == 0
+    engine.dispose()
+
+
+def test_pool_counts_only_checkout_timeouts(tmp_path):
+    url = f"sqlite+pysqlite:///{tmp_path / 'pool.db'}"
+    settings_ = _settings(
+        db_pool_size=1, db_max_overflow=0, db_pool_timeout_seconds=0.01
+    )
+    engine = create_engine(url, **engine_options(url, settings_))
+    with engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+    assert pool_status(engine).timeouts == 1
+    engine.dispose()
+
+    broken = f"sqlite+pysqlite:///{tmp_path / 'missing' / 'pool.db'}"
+    engine = create_engine(broken, **engine_options(broken, _settings()))
+    with pytest.raises(OperationalError):
+        engine.connect()
+    assert pool_status(engine).timeouts == 0
+    engine.dispose()
+
+
+def test_admin_pool_endpoint(client, monkeypatch):
+    assert client.get("/admin/pool").status_code == 404
+
+    monkeypatch.setattr(settings, "debug", True)
+    response = client.get("/admin/pool")
+    assert response.status_code == 200
+    assert {"checked_out", "overflow", "wait_seconds_avg"} <= response.json().keys()
@@ -0,0 +1,221 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.config import settings
+from app.models import (
+    Customer,
+    DirectionEnum,
+    Haulier,
+    IntegrityScanState,
+    Invoice,
+    InvoiceLine,
+    Ticket,
+    TicketStatusEnum,
+    TicketVoid,
+    TransactionTypeEnum,
+    VoidReason,
+)
+from app.services.integrity import SCAN_NAME, findings_page, run_integrity_scan
+
+
+@pytest.fixture()
+def tickets(db_session):
+    haulier = Haulier(name="Old Haulage", is_active=False)
+    db_session.add(haulier)
+    db_session.flush()
+
+    def ticket(no, day, **fields):
+        return Ticket(
+            ticket_no=no,
+            datetime=datetime(2026, 1, day, 10, 0, 0),
+            status=fields.pop("status", TicketStatusEnum.OPEN.value),
+            direction=DirectionEnum.INWARD.value,
+            transaction_type=TransactionTypeEnum.WASTEIN.value,
+            **fields,
+        )
+
+    db_session.add_all(
+        [
+            ticket("T-1", 1, gross_kg=1000, tare_kg=1500, haulier_id=haulier.id),
+            ticket("T-2", 2, status=TicketStatusEnum.COMPLETE.value),
+            ticket("T-3", 3, gross_kg=2000, tare_kg=1000, net_kg=1000),
+        ]
+    )
+    db_session.commit()
+
+
+def _issues(db_session, **filters):
+    _, findings = findings_page(db_session, **filters)
+    return sorted((finding.reference, finding.issue_code) for finding in findings)
+
+
+def test_full_scan_stores_findings_for_every_rule(db_session, tickets):
+    result = run_integrity_scan(db_session)
+    db_session.commit()
+
+    assert result.full
+    assert result.findings == 3
+    counts, _ = findings_page(db_session)
+    assert counts["negative_net"] == 1
+    assert counts["complete_missing_weights"] == 1
+    assert counts["inactive_haulier"] == 1
+    assert counts["inactive_driver"] == 0
+    assert _issues(db_session) == [
+        ("T-1", "inactive_haulier"),
+        ("T-1", "negative_net"),
+        ("T-2", "complete_missing_weights"),
+    ]
+    _, findings = findings_page(db_session, issue="negative_net")
+    assert [finding.detail for finding in findings] == ["gross 1000, tare 1500"]
+    _, findings = findings_page(db_session, page=2, page_size=2)
+    assert len(findings) == 1
+
+
+def test_incremental_scan_rechecks_changed_rows_only(db_session, tickets):
+    run_integrity_scan(db_session)
+    db_session.commit()
+
+    t3 = db_session.query(Ticket).filter_by(ticket_no="T-3").one()
+    t3.net_kg = 900
+    customer = Customer(account_code="C001", name="Acme Skips")
+    db_session.add(customer)
+    db_session.flush()
+    db_session.add(
+        Invoice(
+            invoice_no="INV-26-00001",
+            customer_id=customer.id,
+            invoice_date=date(2026, 1, 31),
+            status="DRAFT",
+            net_total=Decimal("100.00"),
+            vat_total=Decimal("20.00"),
+            gross_total=Decimal("120.00"),
+        )
+    )
+    db_session.commit()
+
+    result = run_integrity_scan(db_session)
+    db_session.commit()
+
+    assert not result.full
+    assert ("T-3", "net_mismatch") in _issues(db_session)
+    assert ("INV-26-00001", "invoice_totals_mismatch") in _issues(db_session)
+    assert result.findings == 5
+
+    haulier = db_session.query(Haulier).one()
+    haulier.is_active = True
+    db_session.commit()
+    run_integrity_scan(db_session)
+    db_session.commit()
+    assert ("T-1", "inactive_haulier") not in _issues(db_session)
+    assert ("T-1", "negative_net") in _issues(db_session)
+
+
+def test_scan_flags_tickets_on_void_invoices(db_session, tickets):
+    customer = Customer(account_code="C001", name="Acme Skips")
+    db_session.add(customer)
+    db_session.flush()
+    invoice = Invoice(
+        invoice_no="INV-26-00002",
+        customer_id=customer.id,
+        invoice_date=date(2026, 1, 31),
+        status="VOID",
+        net_total=Decimal("0.00"),
+        vat_total=Decimal("0.00"),
+        gross_total=Decimal("0.00"),
+    )
+    db_session.add(invoice)
+    db_session.flush()
+    db_session.query(Ticket).filter_by(ticket_no="T-3").update(
+        {"invoice_id": invoice.id}
+    )
+    db_session.commit()
+
+    run_integrity_scan(db_session)
+    db_session.commit()
+    assert ("T-3", "void_invoice_ticket") in _issues(db_session)
+
+
+def test_debug_integrity_reads_stored_findings(
+    client, db_session, tickets, monkeypatch
+):
+    monkeypatch.setattr(settings, "debug", True)
+
+    response = client.get("/debug/integrity")
+    assert "No scan has run yet" in response.text
+    assert "Ticket T-1" not in response.text
+
+    run_integrity_scan(db_session)
+    db_session.commit()
+    response = client.get("/debug/integrity?date_from=2026-01-02")
+    assert response.status_code == 200
+    assert "Ticket T-2" in response.text
+    assert "Ticket T-1" not in response.text
+    assert "(1 issues)" in response.text
+    assert "Last scanned" in response.text
+
+
+def test_scan_state_records_watermark(db_session, tickets):
+    before = datetime.utcnow() - timedelta(seconds=1)
+    run_integrity_scan(db_session)
+    db_session.commit()
+    state = db_session.get(IntegrityScanState, SCAN_NAME)
+    assert state.watermark >= before
+    assert state.last_findings == 3
+
+
+def test_debug_integrity_hidden_without_debug(client):
+    assert client.get("/debug/integrity").status_code == 404
+
+
+def test_scan_reports_rows_pointing_at_missing_tickets(db_session, tickets):
+    customer = Customer(account_code="C001", name="Acme Skips")
+    reason = VoidReason(code="KEYED", description="Keying error", is_active=True)
+    db_session.add_all([customer, reason])
+    db_session.flush()
+    invoice = Invoice(
+        invoice_no="INV-26-00003",
+        customer_id=customer.id,
+        invoice_date=date(2026, 1, 5),
+        status="DRAFT",
+        net_total=Decimal("0.00"),
+        vat_total=Decimal("0.00"),
+        gross_total=Decimal("0.00"),
+    )
+    db_session.add(invoice)
+    db_session.flush()
+    db_session.add_all(
+        [
+            InvoiceLine(
+                invoice_id=invoice.id,
+                ticket_id=9999,
+                description="Ticket 9999",
+                quantity=1,
+                unit_price=Decimal("0"),
+                net=Decimal("0"),
+                vat=Decimal("0"),
+                gross=Decimal("0"),
+            ),
+            TicketVoid(
+                ticket_id=9998,
+                reason_id=reason.id,
+                note="",
+                voided_at=datetime(2026, 1, 6, 9, 0, 0),
+                voided_by="admin",
+            ),
+        ]
+    )
+    db_session.commit()
+
+    run_integrity_scan(db_session)
+    db_session.commit()
+    run_integrity_scan(db_session)
+    db_session.commit()
+
+    counts, _ = findings_page(db_session)
+    assert counts["orphan_invoice_line"] == 1
+    assert counts["orphan_ticket_void"] == 1
+    assert _issues(db_session, issue="orphan_invoice_line") == [
+        ("INV-26-00003", "orphan_invoice_line")
+    ]
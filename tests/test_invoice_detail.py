@@ -0,0 +1,120 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from app.models import (
+    Customer,
+    DirectionEnum,
+    Invoice,
+    InvoiceLine,
+    PaymentMethod,
+    Ticket,
+    TicketStatusEnum,
+    TransactionTypeEnum,
+    VoidReason,
+)
+
+
+@pytest.fixture()
+def invoice(db_session):
+    customer = Customer(account_code="C001", name="Acme Skips")
+    db_session.add_all(
+        [
+            customer,
+            PaymentMethod(code="BACS", is_active=True),
+            VoidReason(code="ERROR", is_active=True),
+        ]
+    )
+    db_session.flush()
+    invoice = Invoice(
+        invoice_no="INV-26-00001",
+        customer_id=customer.id,
+        invoice_date=date(2026, 1, 31),
+        status="DRAFT",
+        net_total=Decimal("100.00"),
+        vat_total=Decimal("20.00"),
+        gross_total=Decimal("120.00"),
+    )
+    db_session.add(invoice)
+    db_session.flush()
+    ticket = Ticket(
+        ticket_no="26-00001",
+        datetime=datetime(2026, 1, 2, 9, 0, 0),
+        status=TicketStatusEnum.COMPLETE.value,
+        direction=DirectionEnum.INWARD.value,
+        transaction_type=TransactionTypeEnum.WASTEIN.value,
+        customer_id=customer.id,
+        invoice_id=invoice.id,
+        total=Decimal("100.00"),
+        dont_invoice=False,
+        paid=False,
+    )
+    db_session.add(ticket)
+    db_session.flush()
+    db_session.add(
+        InvoiceLine(
+            invoice_id=invoice.id,
+            ticket_id=ticket.id,
+            description="Ticket 26-00001 - Mixed waste",
+            quantity=1,
+            unit_price=Decimal("100.00"),
+            net=Decimal("100.00"),
+            vat=Decimal("20.00"),
+            gross=Decimal("120.00"),
+        )
+    )
+    db_session.commit()
+    return invoice
+
+
+def test_invoice_detail_renders_graph(client, invoice):
+    response = client.get(f"/invoices/{invoice.id}")
+
+    assert response.status_code == 200
+    assert "Acme Skips" in response.text
+    assert "Ticket 26-00001 - Mixed waste" in response.text
+    assert "BACS" in response.text
+    assert "ERROR" in response.text
+
+
+def test_mark_paid_error_keeps_full_context(client, invoice):
+    response = client.post(f"/invoices/{invoice.id}/paid", data={})
+
+    assert response.status_code == 400
+    assert "Payment method and paid date are required." in response.text
+    assert "Ticket 26-00001 - Mixed waste" in response.text
+    assert "ERROR" in response.text
+
+
+def test_invoice_detail_not_found(client):
+    response = client.get("/invoices/999")
+
+    assert response.status_code == 404
+
+
+def test_invoice_detail_revalidates_until_invoice_changes(client, invoice, db_session):
+    etag = client.get(f"/invoices/{invoice.id}").headers["etag"]
+    assert client.get(
+        f"/invoices/{invoice.id}", headers={"If-None-Match": etag}
+    ).status_code == 304
+
+    invoice.status = "ISSUED"
+    db_session.commit()
+    response = client.get(f"/invoices/{invoice.id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_lookup_edits_refresh_payment_and_void_options(client, invoice, db_session):
+    assert "CHEQUE" not in client.get(f"/invoices/{invoice.id}").text
+
+    client.post("/lookups/payment-methods/new", data={"code": "CHEQUE"})
+    reason = db_session.query(VoidReason).one()
+    client.post(
+        f"/lookups/void-reasons/{reason.id}/edit", data={"code": "KEYING ERROR"}
+    )
+
+    page = client.get(f"/invoices/{invoice.id}").text
+    assert "CHEQUE" in page
+    assert "KEYING ERROR" in page
@@ -0,0 +1,96 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from app.config import settings
+from app.models import Customer, Invoice, InvoiceLine
+
+
+@pytest.fixture()
+def pdf_settings(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "document_cache_dir", str(tmp_path / "documents"))
+    monkeypatch.setattr(settings, "render_workers", 0)
+    return tmp_path / "documents"
+
+
+@pytest.fixture()
+def invoice(db_session):
+    customer = Customer(account_code="C100", name="Brick & Co (North)")
+    db_session.add(customer)
+    db_session.flush()
+    invoice = Invoice(
+        invoice_no="INV-26-00007",
+        customer_id=customer.id,
+        invoice_date=date(2026, 2, 1),
+        status="DRAFT",
+        net_total=Decimal("50.00"),
+        vat_total=Decimal("10.00"),
+        gross_total=Decimal("60.00"),
+    )
+    db_session.add(invoice)
+    db_session.flush()
+    db_session.add(
+        InvoiceLine(
+            invoice_id=invoice.id,
+            description="Ticket 26-00010 - Hardcore",
+            quantity=2.5,
+            unit_price=Decimal("20.00"),
+            net=Decimal("50.00"),
+            vat=Decimal("10.00"),
+            gross=Decimal("60.00"),
+        )
+    )
+    db_session.commit()
+    return invoice
+
+
+def test_invoice_pdf_is_rendered_and_cached(client, invoice, pdf_settings):
+    response = client.get(f"/invoices/{invoice.id}/pdf")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.content.startswith(b"%PDF-1.4")
+    assert b"Brick & Co \\(North\\)" in response.content
+    assert len(list(pdf_settings.rglob("*.pdf"))) == 1
+
+    etag = response.headers["etag"]
+    cached = client.get(f"/invoices/{invoice.id}/pdf", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+
+def test_invoice_pdf_range_request(client, invoice, pdf_settings):
+    full = client.get(f"/invoices/{invoice.id}/pdf")
+
+    partial = client.get(f"/invoices/{invoice.id}/pdf", headers={"Range": "bytes=0-7"})
+
+    assert partial.status_code == 206
+    assert partial.content == full.content[:8]
+    assert partial.headers["content-range"] == f"bytes 0-7/{len(full.content)}"
+
+
+def test_invoice_pdf_changes_with_status(client, db_session, invoice, pdf_settings):
+    first = client.get(f"/invoices/{invoice.id}/pdf").headers["etag"]
+
+    invoice.status = "VOID"
+    db_session.commit()
+    second = client.get(f"/invoices/{invoice.id}/pdf").headers["etag"]
+
+    assert first != second
+    assert len(list(pdf_settings.rglob("*.pdf"))) == 2
+
+
+def test_invoice_pdf_follows_printed_customer_fields(
+    client, db_session, invoice, pdf_settings
+):
+    first = client.get(f"/invoices/{invoice.id}/pdf").headers["etag"]
+
+    customer = invoice.customer
+    customer.uninvoiced_balance = Decimal("75.00")
+    customer.updated_at = datetime(2026, 3, 1, 12, 0, 0)
+    db_session.commit()
+    assert client.get(f"/invoices/{invoice.id}/pdf").headers["etag"] == first
+
+    customer.city = "Leeds"
+    db_session.commit()
+    assert client.get(f"/invoices/{invoice.id}/pdf").headers["etag"] != first
@@ -0,0 +1,65 @@
+import random
+
+import pytest
+
+from app.models import Ticket, TicketStatusEnum
+from app.services.weight_source import SimulatedIndicatorWeightSource
+from benchmarks.dataset import Scale, generate
+from benchmarks.load import LoadStats, Reference, main, percentile, run_vehicle
+
+SMALL = Scale(
+    tickets=0,
+    customers=5,
+    vehicles=5,
+    products=3,
+    hauliers=2,
+    drivers=2,
+    containers=1,
+    destinations=1,
+    capture_tickets=0,
+    confirm_customers=0,
+)
+
+
+def test_lane_runs_the_ticket_lifecycle(client, db_session):
+    generate(db_session, seed=3, scale=SMALL)
+    db_session.commit()
+    reference = Reference(vehicle_ids=(1, 2), product_ids=(1,))
+    stats = LoadStats()
+    rng = random.Random(3)
+
+    run_vehicle(
+        client, stats, reference, SimulatedIndicatorWeightSource(rng), rng, 0.0
+    )
+
+    assert stats.completed == 1
+    for step in ("create", "details", "gross", "tare", "complete"):
+        summary = stats.steps[step].summary()
+        assert summary["count"] == 1
+        assert summary["errors"] == summary["conflicts"] == 0
+    ticket = db_session.get(Ticket, stats.claimed_tickets.pop())
+    assert ticket.status == TicketStatusEnum.COMPLETE
+    assert ticket.net_kg == ticket.gross_kg - ticket.tare_kg > 0
+
+
+def test_simulated_indicator_reads_in_divisions():
+    indicator = SimulatedIndicatorWeightSource(random.Random(1), division_kg=20)
+    assert indicator.get_weight_kg() is None
+    indicator.drive_on(12345)
+    reading = indicator.get_weight_kg()
+    assert reading % 20 == 0
+    assert abs(reading - 12345) <= 30
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([7.0], 95) == 7.0
+
+
+def test_base_url_requires_the_servers_database(capsys):
+    with pytest.raises(SystemExit) as exc:
+        main(["--base-url", "http://127.0.0.1:8000"])
+    assert exc.value.code == 2
+    assert "--database-url" in capsys.readouterr().err
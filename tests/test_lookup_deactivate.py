@@ -1,17 +1,27 @@
 from datetime import datetime
 
 import pytest
+from sqlalchemy import delete
 
 from app.models import (
     Container,
     Destination,
     Driver,
     Haulier,
+    LookupUsageCount,
+    TaxRate,
     Ticket,
     TicketStatusEnum,
     DirectionEnum,
     TransactionTypeEnum,
 )
+from app.services.lookups import (
+    LOOKUP_SPECS,
+    LOOKUPS,
+    lookup_usage_totals,
+    lookups_in_use,
+    rebuild_lookup_usage,
+)
 
 
 @pytest.fixture()
@@ -66,3 +76,84 @@ def test_lookup_deactivate_guard(client, db_session, lookup_ticket, key, path):
     refreshed = db_session.get(type(record), record.id)
     assert refreshed is not None
     assert refreshed.is_active is True
+
+
+def test_lookup_bulk_deactivate_skips_rows_in_use(client, db_session, lookup_ticket):
+    spare = Haulier(name="Spare Haulier", is_active=True)
+    db_session.add(spare)
+    db_session.commit()
+    used = lookup_ticket["haulier"]
+
+    response = client.post(
+        "/lookups/hauliers/bulk",
+        data={"action": "deactivate", "ids": [str(used.id), str(spare.id)]},
+    )
+
+    assert response.status_code == 200
+    assert "1 not deactivated: in use by tickets." in response.text
+    db_session.expire_all()
+    assert db_session.get(Haulier, used.id).is_active is True
+    assert db_session.get(Haulier, spare.id).is_active is False
+
+
+def test_registry_serves_code_lookups(client, db_session):
+    response = client.post(
+        "/lookups/tax-rates/new",
+        data={"code": "S", "description": "Standard", "rate_percent": "20"},
+        follow_redirects=False,
+    )
+    assert response.status_code == 303
+    assert db_session.query(TaxRate).one().rate_percent == 20
+
+    listing = client.get("/lookups/tax-rates")
+    assert "Standard" in listing.text
+
+    duplicate = client.post(
+        "/lookups/tax-rates/new", data={"code": "s", "description": ""}
+    )
+    assert duplicate.status_code == 400
+    assert "Code already exists." in duplicate.text
+
+    assert client.get("/lookups/not-a-lookup").status_code == 404
+
+
+@pytest.mark.parametrize("spec", LOOKUP_SPECS, ids=lambda spec: spec.slug)
+def test_every_registered_lookup_lists_and_creates(client, db_session, spec):
+    assert client.get(spec.base_path).status_code == 200
+    assert client.get(f"{spec.base_path}/new").status_code == 200
+
+    data = {
+        lookup_field.name: "5" if lookup_field.numeric else f"Row {lookup_field.name}"
+        for lookup_field in spec.fields
+    }
+    response = client.post(f"{spec.base_path}/new", data=data, follow_redirects=False)
+    assert response.status_code == 303
+
+    row = db_session.query(spec.model).one()
+    assert client.get(f"{spec.base_path}/{row.id}/edit").status_code == 200
+    assert f"Row {spec.key_field.name}" in client.get(spec.base_path).text
+
+
+def test_usage_counters_follow_ticket_changes(client, db_session, lookup_ticket):
+    spare = Haulier(name="Spare Haulier", is_active=True)
+    db_session.add(spare)
+    db_session.commit()
+    used = lookup_ticket["haulier"]
+    spec = LOOKUPS["hauliers"]
+    assert lookup_usage_totals(db_session, spec) == {used.id: 1}
+
+    ticket = db_session.query(Ticket).one()
+    db_session.expire_all()
+    ticket.haulier_id = spare.id
+    db_session.commit()
+    assert lookup_usage_totals(db_session, spec) == {used.id: 0, spare.id: 1}
+    assert lookups_in_use(db_session, spec, [used.id, spare.id]) == {
+        spare.id: "tickets"
+    }
+
+    listing = client.get("/lookups/hauliers?sort=usage")
+    assert listing.text.index("Spare Haulier") < listing.text.index("Test Haulier")
+
+    db_session.execute(delete(LookupUsageCount))
+    assert rebuild_lookup_usage(db_session) == 4
+    assert lookup_usage_totals(db_session, spec) == {spare.id: 1}
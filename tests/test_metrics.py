@@ -0,0 +1,46 @@
+import jinja2
+import pytest
+
+from app.services.metrics import TimedTemplate, registry, render_metrics
+from app.templating import templates
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry():
+    registry.reset()
+    yield
+    registry.reset()
+
+
+def test_metrics_endpoint_reports_routes_and_sql(client):
+    assert client.get("/customers").status_code == 200
+    assert client.get("/customers/999").status_code == 404
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert (
+        'http_requests_total{method="GET",route="/customers",status="200"} 1' in body
+    )
+    assert 'route="/customers/{customer_id}",status="404"' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="/customers"} 1' in body
+    assert 'db_statements_total{route="/customers"}' in body
+    assert 'template_render_duration_seconds_count{template="customers/list.html"} 1' in body
+    assert "http_requests_in_flight 0" in body
+
+
+def test_histogram_buckets_are_cumulative():
+    for value in (0.003, 0.02, 20.0):
+        registry.observe("http_request_duration_seconds", value, (("route", "/x"),))
+    body = render_metrics()
+    assert 'http_request_duration_seconds_bucket{route="/x",le="0.005"} 1' in body
+    assert 'http_request_duration_seconds_bucket{route="/x",le="0.025"} 2' in body
+    assert 'http_request_duration_seconds_bucket{route="/x",le="10.0"} 2' in body
+    assert 'http_request_duration_seconds_bucket{route="/x",le="+Inf"} 3' in body
+    assert 'http_request_duration_seconds_count{route="/x"} 3' in body
+
+
+def test_only_the_app_environment_times_templates():
+    assert templates.env.template_class is TimedTemplate
+    assert jinja2.Environment().template_class is jinja2.Template
@@ -0,0 +1,43 @@
+from datetime import date
+
+import pytest
+
+from app.services.partitions import (
+    _covered,
+    ensure_ticket_partitions,
+    partition_for,
+    partitions_between,
+)
+
+
+def test_yearly_partitions_cover_the_range():
+    partitions = partitions_between(date(2024, 6, 1), date(2026, 1, 1), "year")
+
+    assert [partition.name for partition in partitions] == [
+        "tickets_y2024",
+        "tickets_y2025",
+        "tickets_y2026",
+    ]
+    assert partitions[0].start == date(2024, 1, 1)
+    assert partitions[-1].end == date(2027, 1, 1)
+
+
+def test_monthly_partitions_roll_over_the_year():
+    december = partition_for(date(2025, 12, 31), "month")
+
+    assert december.name == "tickets_m2025_12"
+    assert (december.start, december.end) == (date(2025, 12, 1), date(2026, 1, 1))
+    assert partition_for(december.end, "month").name == "tickets_m2026_01"
+    with pytest.raises(ValueError):
+        partition_for(date(2025, 1, 1), "week")
+
+
+def test_switching_period_never_overlaps_old_partitions():
+    assert _covered(partition_for(date(2026, 3, 1), "month"), {"tickets_y2026"})
+    assert _covered(partition_for(date(2026, 3, 1), "year"), {"tickets_m2026_01"})
+    assert not _covered(partition_for(date(2027, 3, 1), "month"), {"tickets_y2026"})
+
+
+def test_ensure_is_a_no_op_without_partitioning(engine):
+    with engine.begin() as conn:
+        assert ensure_ticket_partitions(conn) == []
@@ -0,0 +1,150 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from app import jobs
+from app.models import (
+    Customer,
+    DirectionEnum,
+    Product,
+    Ticket,
+    TicketStatusEnum,
+    TransactionTypeEnum,
+)
+from app.services.price_lists import (
+    PriceSchedule,
+    customer_price,
+    import_price_list,
+    invalidate_price_lists,
+)
+from app.services.pricing import price_tickets
+
+
+@pytest.fixture()
+def parties(db_session):
+    customer = Customer(account_code="C001", name="Acme Skips")
+    product = Product(code="MIX", description="Mixed waste", unit_price=Decimal("100"))
+    db_session.add_all([customer, product])
+    db_session.commit()
+    return customer, product
+
+
+def _row(unit_price, effective_from, effective_to=""):
+    return {
+        "account_code": "C001",
+        "product_code": "MIX",
+        "unit_price": unit_price,
+        "effective_from": effective_from,
+        "effective_to": effective_to,
+    }
+
+
+def test_price_schedule_finds_interval_in_force():
+    schedule = PriceSchedule(
+        [
+            (date(2026, 4, 1), None, Decimal("95")),
+            (date(2026, 1, 1), date(2026, 3, 31), Decimal("90")),
+        ]
+    )
+    assert schedule.price_on(date(2025, 12, 31)) is None
+    assert schedule.price_on(date(2026, 3, 31)) == Decimal("90")
+    assert schedule.price_on(date(2026, 4, 1)) == Decimal("95")
+
+
+def test_import_rejects_overlaps_without_writing(db_session, parties):
+    rows = [_row("90", "2026-01-01", "2026-03-31"), _row("95", "2026-03-01")]
+    result = import_price_list(db_session, rows)
+    assert result.errors and result.created == 0
+
+    rows[1]["effective_from"] = "2026-04-01"
+    result = import_price_list(db_session, rows)
+    assert result.errors == [] and result.created == 2
+    db_session.commit()
+
+    rows[1]["unit_price"] = "97"
+    result = import_price_list(db_session, rows[1:])
+    assert (result.created, result.updated) == (0, 1)
+
+
+def test_import_rejects_duplicate_start_dates_in_one_file(db_session, parties):
+    rows = [_row("90", "2026-01-01"), _row("95", "2026-01-01", "2026-06-30")]
+    result = import_price_list(db_session, rows)
+    assert result.errors == [
+        "Line 3: same customer, product and effective from as line 2."
+    ]
+    assert result.created == 0
+
+
+def test_ticket_pricing_uses_price_list(db_session, parties):
+    customer, product = parties
+    import_price_list(db_session, [_row("80", "2026-01-01")])
+    db_session.commit()
+    invalidate_price_lists()
+    ticket = Ticket(
+        ticket_no="26-00001",
+        datetime=datetime(2026, 2, 1, 9, 0, 0),
+        status=TicketStatusEnum.OPEN.value,
+        direction=DirectionEnum.INWARD.value,
+        transaction_type=TransactionTypeEnum.WASTEIN.value,
+        customer_id=customer.id,
+        product_id=product.id,
+        qty=2,
+    )
+    db_session.add(ticket)
+    db_session.commit()
+
+    day = date(2026, 2, 1)
+    assert customer_price(db_session, customer.id, product.id, day) == Decimal("80")
+    [priced] = price_tickets(db_session, [ticket])
+    assert priced.total == Decimal("160.00")
+
+
+def test_reprice_applies_new_prices_except_typed_ones(
+    client, db_session, SessionLocal, parties, monkeypatch
+):
+    customer, product = parties
+    defaulted, typed = (
+        Ticket(
+            ticket_no=ticket_no,
+            datetime=datetime(2026, 2, 1, 9, 0, 0),
+            status=TicketStatusEnum.OPEN.value,
+            direction=DirectionEnum.INWARD.value,
+            transaction_type=TransactionTypeEnum.WASTEIN.value,
+        )
+        for ticket_no in ("26-00001", "26-00002")
+    )
+    db_session.add_all([defaulted, typed])
+    db_session.commit()
+    form = {
+        "action": "save",
+        "datetime": "2026-02-01T09:00",
+        "direction": "INWARD",
+        "transaction_type": "WASTEIN",
+        "customer_id": str(customer.id),
+        "product_id": str(product.id),
+        "qty": "2",
+    }
+    # The form fills in the default price; the operator overtyped the second.
+    client.post(f"/tickets/{defaulted.id}", data={**form, "unit_price": "100.00"})
+    client.post(f"/tickets/{typed.id}", data={**form, "unit_price": "55.00"})
+    client.post(f"/tickets/{typed.id}", data={**form, "unit_price": "55.00"})
+    db_session.expire_all()
+    assert (defaulted.unit_price_overridden, typed.unit_price_overridden) == (
+        False,
+        True,
+    )
+
+    result = import_price_list(db_session, [_row("90.00", "2026-01-01")])
+    assert not result.errors
+    db_session.commit()
+    invalidate_price_lists()
+    monkeypatch.setattr(jobs, "SessionLocal", SessionLocal)
+
+    assert jobs.reprice_open_tickets() == 1
+    db_session.expire_all()
+    assert (defaulted.unit_price, defaulted.total) == (
+        Decimal("90.00"),
+        Decimal("180.00"),
+    )
+    assert (typed.unit_price, typed.total) == (Decimal("55.00"), Decimal("110.00"))
@@ -0,0 +1,89 @@
+from dataclasses import replace
+from datetime import datetime
+from decimal import Decimal
+
+from app.models import (
+    Customer,
+    DirectionEnum,
+    Product,
+    Ticket,
+    TicketStatusEnum,
+    TransactionTypeEnum,
+)
+from app.services.pricing import price_tickets, quote
+from app.services.product_catalog import ProductRecord
+
+BASE = ProductRecord(
+    id=1,
+    code="MIX",
+    description="Mixed waste",
+    unit_price=Decimal("100.00"),
+    account_price=Decimal("90.00"),
+    cash_price=Decimal("110.00"),
+    min_price=None,
+    max_price=None,
+    max_qty=None,
+    excess_trigger=None,
+    excess_price=None,
+    unit_name="Tonne",
+    tax_rate_percent=Decimal("20"),
+    default_waste_code_id=None,
+    default_waste_code=None,
+)
+
+
+def test_quote_uses_customer_price_tier():
+    assert quote(BASE, 2).total == Decimal("180.00")
+    assert quote(BASE, 2, cash_account=True).total == Decimal("220.00")
+    no_tiers = replace(BASE, account_price=None, cash_price=None)
+    assert quote(no_tiers, 2).total == Decimal("200.00")
+    assert quote(BASE, 2, unit_price=Decimal("50")).total == Decimal("100.00")
+
+
+def test_quote_applies_excess_cap_and_clamps():
+    tiered = replace(
+        BASE,
+        excess_trigger=Decimal("10"),
+        excess_price=Decimal("150.00"),
+        max_qty=Decimal("12"),
+    )
+    priced = quote(tiered, 15)
+    assert priced.chargeable_qty == Decimal("12")
+    assert priced.excess_qty == Decimal("2")
+    assert priced.total == Decimal("1200.00")
+
+    clamped = replace(BASE, min_price=Decimal("50.00"), max_price=Decimal("500.00"))
+    assert quote(clamped, Decimal("0.2")).total == Decimal("50.00")
+    assert quote(clamped, 20).total == Decimal("500.00")
+
+
+def test_price_tickets_batches_customers_and_products(db_session):
+    cash = Customer(account_code="CASH", name="Cash Sale", cash_account=True)
+    account = Customer(account_code="ACC", name="Account Co")
+    product = Product(
+        code="MIX",
+        description="Mixed waste",
+        unit_price=Decimal("100.00"),
+        account_price=Decimal("90.00"),
+        cash_price=Decimal("110.00"),
+    )
+    db_session.add_all([cash, account, product])
+    db_session.flush()
+    tickets = [
+        Ticket(
+            ticket_no=f"26-0000{i}",
+            datetime=datetime(2026, 1, 2, 9, 0, 0),
+            status=TicketStatusEnum.OPEN.value,
+            direction=DirectionEnum.INWARD.value,
+            transaction_type=TransactionTypeEnum.WASTEIN.value,
+            customer_id=customer_id,
+            product_id=product.id,
+            qty=1.5,
+        )
+        for i, customer_id in enumerate([cash.id, account.id, None])
+    ]
+    db_session.add_all(tickets)
+    db_session.commit()
+
+    totals = [priced.total for priced in price_tickets(db_session, tickets)]
+    assert totals == [Decimal("165.00"), Decimal("135.00"), Decimal("135.00")]
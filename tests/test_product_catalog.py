@@ -0,0 +1,142 @@
+from datetime import datetime
+from decimal import Decimal
+
+from app.models import (
+    Customer,
+    DirectionEnum,
+    Invoice,
+    Product,
+    TaxRate,
+    Ticket,
+    TicketStatusEnum,
+    TransactionTypeEnum,
+    Unit,
+)
+from app.services.product_catalog import product_record
+
+
+def _product(db_session):
+    unit = Unit(name="Tonne", is_active=True)
+    tax_rate = TaxRate(code="STD", rate_percent=Decimal("20.000"), is_active=True)
+    db_session.add_all([unit, tax_rate])
+    db_session.flush()
+    product = Product(
+        code="MIX",
+        description="Mixed waste",
+        unit_id=unit.id,
+        tax_rate_id=tax_rate.id,
+        unit_price=Decimal("95.00"),
+    )
+    db_session.add(product)
+    db_session.commit()
+    return product
+
+
+def test_product_record_is_compact_and_denormalised(db_session):
+    product = _product(db_session)
+
+    record = product_record(db_session, product.id)
+    assert record.unit_price == Decimal("95.00")
+    assert record.unit_name == "Tonne"
+    assert record.tax_rate_percent == Decimal("20.000")
+    assert not hasattr(record, "__dict__")
+
+
+def test_product_defaults_revalidates_with_etag(client, db_session):
+    product = _product(db_session)
+
+    response = client.get(f"/tickets/product-defaults?product_id={product.id}")
+    assert response.status_code == 200
+    assert 'value="95.00"' in response.text
+    assert response.headers["cache-control"] == "private, max-age=60"
+    etag = response.headers["etag"]
+
+    response = client.get(
+        f"/tickets/product-defaults?product_id={product.id}",
+        headers={"If-None-Match": etag},
+    )
+    assert response.status_code == 304
+
+
+def test_product_update_invalidates_catalogue(client, db_session):
+    product = _product(db_session)
+    first = client.get(f"/tickets/product-defaults?product_id={product.id}")
+
+    response = client.post(
+        f"/products/{product.id}",
+        data={"code": "MIX", "description": "Mixed waste", "unit_price": "110.00"},
+        follow_redirects=False,
+    )
+    assert response.status_code == 303
+
+    response = client.get(
+        f"/tickets/product-defaults?product_id={product.id}",
+        headers={"If-None-Match": first.headers["etag"]},
+    )
+    assert response.status_code == 200
+    assert 'value="110.00"' in response.text
+
+
+def _invoiceable_ticket(db_session, product):
+    customer = Customer(account_code="C001", name="Acme Skips")
+    db_session.add(customer)
+    db_session.flush()
+    db_session.add(
+        Ticket(
+            ticket_no="T-VAT-1",
+            datetime=datetime(2026, 1, 2, 9, 0, 0),
+            status=TicketStatusEnum.COMPLETE.value,
+            direction=DirectionEnum.INWARD.value,
+            transaction_type=TransactionTypeEnum.WASTEIN.value,
+            customer_id=customer.id,
+            product_id=product.id,
+            qty=Decimal("1.000"),
+            unit_price=Decimal("100.00"),
+            total=Decimal("100.00"),
+            dont_invoice=False,
+            paid=False,
+        )
+    )
+    db_session.commit()
+    return customer
+
+
+def test_tax_rate_edit_reaches_invoice_vat(client, db_session):
+    product = _product(db_session)
+    customer = _invoiceable_ticket(db_session, product)
+    assert product_record(db_session, product.id).tax_rate_percent == Decimal("20.000")
+
+    tax_rate = db_session.query(TaxRate).one()
+    response = client.post(
+        f"/lookups/tax-rates/{tax_rate.id}/edit",
+        data={"code": "STD", "description": "", "rate_percent": "5"},
+        follow_redirects=False,
+    )
+    assert response.status_code == 303
+
+    response = client.post(
+        "/invoices/generate/confirm",
+        data={"customer_id": str(customer.id)},
+        follow_redirects=False,
+    )
+    assert response.status_code == 303
+    assert db_session.query(Invoice).one().vat_total == Decimal("5.00")
+
+
+def test_invoice_vat_ignores_a_stale_catalogue(client, db_session):
+    product = _product(db_session)
+    customer = _invoiceable_ticket(db_session, product)
+    assert product_record(db_session, product.id).tax_rate_percent == Decimal("20.000")
+
+    # Another worker edits the rate; this process's catalogue is not cleared.
+    db_session.query(TaxRate).update({TaxRate.rate_percent: Decimal("5.000")})
+    db_session.commit()
+    assert product_record(db_session, product.id).tax_rate_percent == Decimal("20.000")
+
+    response = client.post(
+        "/invoices/generate/confirm",
+        data={"customer_id": str(customer.id)},
+        follow_redirects=False,
+    )
+    assert response.status_code == 303
+    assert db_session.query(Invoice).one().vat_total == Decimal("5.00")
@@ -0,0 +1,70 @@
+from datetime import datetime
+
+import pytest
+
+from app.config import settings
+from app.models import (
+    Customer,
+    DirectionEnum,
+    Haulier,
+    Ticket,
+    TicketStatusEnum,
+    TransactionTypeEnum,
+)
+from app.services.query_budget import QueryTracker, fingerprint
+
+
+@pytest.fixture()
+def tickets(db_session):
+    customer = Customer(account_code="C001", name="Acme Skips")
+    haulier = Haulier(name="Test Haulier", is_active=True)
+    db_session.add_all([customer, haulier])
+    db_session.flush()
+    db_session.add_all(
+        [
+            Ticket(
+                ticket_no=f"T-{number}",
+                datetime=datetime(2026, 1, number, 10, 0, 0),
+                status=TicketStatusEnum.OPEN.value,
+                direction=DirectionEnum.INWARD.value,
+                transaction_type=TransactionTypeEnum.WASTEIN.value,
+                customer_id=customer.id,
+                haulier_id=haulier.id,
+            )
+            for number in range(1, 6)
+        ]
+    )
+    db_session.commit()
+    return db_session.query(Ticket).order_by(Ticket.id).all()
+
+
+def test_fingerprint_ignores_literals_and_in_lists():
+    assert fingerprint("SELECT * FROM t WHERE id = 5 AND name = 'x'") == (
+        "SELECT * FROM t WHERE id = ? AND name = ?"
+    )
+    assert fingerprint("SELECT * FROM t WHERE id IN (?, ?,\n ?)") == (
+        "SELECT * FROM t WHERE id IN (?)"
+    )
+    tracker = QueryTracker()
+    for ticket_id in range(4):
+        tracker.record(f"SELECT * FROM tickets WHERE id = {ticket_id}")
+    assert tracker.repeated() == [("SELECT * FROM tickets WHERE id = ?", 4)]
+
+
+def test_debug_responses_report_query_counts(client, tickets, monkeypatch):
+    response = client.get("/tickets")
+    assert "x-query-count" not in response.headers
+
+    monkeypatch.setattr(settings, "debug", True)
+    response = client.get("/tickets", headers={"Accept-Encoding": "identity"})
+    assert int(response.headers["x-query-count"]) > 0
+    assert response.headers["x-query-repeated"] == "0"
+    assert "query-budget-panel" in response.text
+    assert int(response.headers["content-length"]) == len(response.content)
+
+
+def test_ticket_pages_stay_within_query_budget(client, tickets, query_budget):
+    with query_budget(3):
+        assert client.get("/tickets").status_code == 200
+    with query_budget(20):
+        assert client.get(f"/tickets/{tickets[0].id}").status_code == 200
@@ -0,0 +1,57 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import ReadOnlySession, ReplicaRouter, get_read_db
+from app.main import app
+from app.models import Base, Customer
+
+
+@pytest.fixture()
+def replica_factory(tmp_path):
+    engine = create_engine(
+        f"sqlite+pysqlite:///{tmp_path / 'replica.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine, class_=ReadOnlySession, autoflush=False)
+    engine.dispose()
+
+
+def _bind_path(session) -> str:
+    return str(session.get_bind().url)
+
+
+def test_router_prefers_fresh_replica(SessionLocal, replica_factory, monkeypatch):
+    router = ReplicaRouter(SessionLocal, replica_factory, max_lag_seconds=5)
+    with router.session() as session:
+        assert _bind_path(session).endswith("replica.db")
+
+    router = ReplicaRouter(SessionLocal, replica_factory, max_lag_seconds=5)
+    monkeypatch.setattr(router, "_replica_lag_seconds", lambda: 60.0)
+    with router.session() as session:
+        assert _bind_path(session).endswith("test.db")
+
+    router = ReplicaRouter(SessionLocal, None, max_lag_seconds=5)
+    with router.session() as session:
+        assert _bind_path(session).endswith("test.db")
+
+
+def test_read_only_session_refuses_writes(replica_factory):
+    with replica_factory() as session:
+        session.add(Customer(account_code="C001", name="Acme Skips"))
+        with pytest.raises(RuntimeError):
+            session.flush()
+
+
+def test_list_pages_read_from_replica(client, replica_factory):
+    with sessionmaker(bind=replica_factory.kw["bind"])() as session:
+        session.add(Customer(account_code="R001", name="Replica Haulage"))
+        session.commit()
+
+    def override_get_read_db():
+        with replica_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_read_db] = override_get_read_db
+    assert "Replica Haulage" in client.get("/customers").text
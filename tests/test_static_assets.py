@@ -0,0 +1,98 @@
+import base64
+import gzip
+import hashlib
+import io
+import json
+
+from app import assets, jobs
+from app.config import Settings
+
+
+def _settings(tmp_path) -> Settings:
+    return Settings(
+        database_url="sqlite://",
+        secret_key="test",
+        static_build_dir=str(tmp_path / "static"),
+    )
+
+
+def test_build_writes_hashed_copies_and_gzip(tmp_path):
+    source = tmp_path / "source"
+    (source / "css").mkdir(parents=True)
+    (source / "css" / "site.css").write_text("body { margin: 0; }\n" * 100)
+    (source / "tiny.js").write_text("x()")
+
+    manifest = assets.build_assets(source, _settings(tmp_path))
+
+    hashed = manifest.files["css/site.css"]
+    assert hashed.startswith("css/site.") and hashed.endswith(".css")
+    built = tmp_path / "static" / hashed
+    assert built.read_text() == (source / "css" / "site.css").read_text()
+    assert gzip.decompress(built.with_name(built.name + ".gz").read_bytes()) == (
+        built.read_bytes()
+    )
+    # Too small to be worth compressing.
+    assert not (tmp_path / "static" / (manifest.files["tiny.js"] + ".gz")).exists()
+    assert json.loads((tmp_path / "static" / "manifest.json").read_text()) == (
+        manifest.files
+    )
+
+    (source / "css" / "site.css").write_text("body { margin: 1px; }\n")
+    assert assets.build_assets(source, _settings(tmp_path)).files[
+        "css/site.css"
+    ] != hashed
+
+
+def test_pages_link_hashed_assets_served_immutable(client):
+    page = client.get("/")
+    css_url = assets.static_url("css/style.css")
+    assert css_url != "/static/css/style.css"
+    assert css_url in page.text
+
+    response = client.get(css_url, headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == assets.IMMUTABLE_CACHE_CONTROL
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["content-type"].startswith("text/css")
+    assert response.text == (assets.STATIC_DIR / "css" / "style.css").read_text()
+
+    plain = client.get("/static/css/style.css", headers={"Accept-Encoding": "identity"})
+    assert plain.status_code == 200
+    assert plain.headers["cache-control"] == assets.REVALIDATE_CACHE_CONTROL
+    assert "content-encoding" not in plain.headers
+
+
+def test_debug_links_plain_names(monkeypatch):
+    monkeypatch.setattr(assets.settings, "debug", True)
+    assert assets.static_url("css/style.css") == "/static/css/style.css"
+
+
+def test_pages_load_vendored_htmx(client):
+    page = client.get("/")
+    assert assets.static_url("vendor/htmx.min.js") in page.text
+    assert "unpkg.com" not in page.text
+    data = assets.HTMX_PATH.read_bytes()
+    assert base64.b64encode(hashlib.sha384(data).digest()).decode() == (
+        assets.HTMX_SHA384
+    )
+
+
+def test_vendor_htmx_refuses_a_mismatched_download(tmp_path, monkeypatch, capsys):
+    target = tmp_path / "htmx.min.js"
+    monkeypatch.setattr(jobs, "HTMX_PATH", target)
+    monkeypatch.setattr(
+        jobs.urllib.request, "urlopen", lambda url, timeout: io.BytesIO(b"tampered")
+    )
+
+    assert jobs.main(["vendor-htmx"]) == 1
+    assert not target.exists()
+    assert "nothing written" in capsys.readouterr().err
+
+    monkeypatch.setattr(
+        jobs.urllib.request,
+        "urlopen",
+        lambda url, timeout: io.BytesIO(assets.HTMX_PATH.read_bytes()),
+    )
+    assert jobs.main(["vendor-htmx"]) == 0
+    assert target.read_bytes() == assets.HTMX_PATH.read_bytes()
@@ -0,0 +1,30 @@
+from app.config import Settings
+from app.main import templates as main_templates
+from app.routes.tickets import templates as ticket_templates
+from app.templating import build_environment, precompile_templates
+
+
+def _settings(tmp_path, **overrides) -> Settings:
+    overrides.setdefault("template_cache_dir", str(tmp_path / "templates"))
+    return Settings(database_url="sqlite://", secret_key="test", **overrides)
+
+
+def test_routes_share_one_environment():
+    assert ticket_templates.env is main_templates.env
+
+
+def test_precompile_writes_bytecode_for_every_template(tmp_path):
+    env = build_environment(_settings(tmp_path))
+
+    compiled = precompile_templates(env)
+
+    assert compiled == len(env.list_templates(extensions=["html"]))
+    assert len(list((tmp_path / "templates").iterdir())) == compiled
+    assert env.get_template("tickets/list.html").name == "tickets/list.html"
+
+
+def test_auto_reload_only_in_debug(tmp_path):
+    assert build_environment(_settings(tmp_path)).auto_reload is False
+    assert build_environment(_settings(tmp_path, debug=True)).auto_reload is True
+    uncached = build_environment(_settings(tmp_path, template_cache_dir=""))
+    assert uncached.bytecode_cache is None
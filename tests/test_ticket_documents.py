@@ -0,0 +1,111 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from app.config import settings
+from app.models import (
+    Customer,
+    DirectionEnum,
+    Licence,
+    Product,
+    Ticket,
+    TicketStatusEnum,
+    TransactionTypeEnum,
+    Vehicle,
+    WasteCode,
+    WasteProducer,
+)
+
+
+@pytest.fixture(autouse=True)
+def document_settings(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "document_cache_dir", str(tmp_path / "documents"))
+    monkeypatch.setattr(settings, "render_workers", 0)
+
+
+def _ticket(ticket_no, status, when, **kwargs):
+    return Ticket(
+        ticket_no=ticket_no,
+        datetime=when,
+        status=status,
+        direction=DirectionEnum.INWARD.value,
+        transaction_type=TransactionTypeEnum.WASTEIN.value,
+        dont_invoice=False,
+        paid=False,
+        **kwargs,
+    )
+
+
+@pytest.fixture()
+def complete_ticket(db_session):
+    customer = Customer(account_code="C200", name="Green Yard Ltd")
+    vehicle = Vehicle(registration="WB12 XYZ")
+    product = Product(code="MIX", description="Mixed waste", unit_price=Decimal("90.00"))
+    waste_code = WasteCode(code="17 09 04", description="Mixed construction waste")
+    producer = WasteProducer(name="Site Builders")
+    licence = Licence(code="EPR/AB1234")
+    db_session.add_all([customer, vehicle, product, waste_code, producer, licence])
+    db_session.flush()
+    ticket = _ticket(
+        "26-00100",
+        TicketStatusEnum.COMPLETE.value,
+        datetime(2026, 3, 4, 8, 30),
+        customer_id=customer.id,
+        vehicle_id=vehicle.id,
+        product_id=product.id,
+        waste_code_id=waste_code.id,
+        waste_producer_id=producer.id,
+        licence_id=licence.id,
+        gross_kg=18000,
+        tare_kg=11000,
+        net_kg=7000,
+    )
+    db_session.add(ticket)
+    db_session.add(
+        _ticket("26-00101", TicketStatusEnum.OPEN.value, datetime(2026, 3, 4, 9, 0))
+    )
+    db_session.commit()
+    return ticket
+
+
+def test_ticket_pdf_and_wtn(client, complete_ticket):
+    ticket_pdf = client.get(f"/tickets/{complete_ticket.id}/document?kind=ticket")
+    wtn_pdf = client.get(f"/tickets/{complete_ticket.id}/document?kind=wtn")
+
+    assert ticket_pdf.status_code == 200
+    assert ticket_pdf.content.startswith(b"%PDF")
+    assert b"WEIGHBRIDGE TICKET" in ticket_pdf.content
+    assert b"WB12 XYZ" in ticket_pdf.content
+    assert wtn_pdf.status_code == 200
+    assert b"17 09 04" in wtn_pdf.content
+    assert b"EPR/AB1234" in wtn_pdf.content
+    assert b"Site Builders" in wtn_pdf.content
+
+
+def test_ticket_escpos(client, complete_ticket):
+    response = client.get(
+        f"/tickets/{complete_ticket.id}/document?kind=ticket&format=escpos"
+    )
+
+    assert response.status_code == 200
+    assert response.content.startswith(b"\x1b@")
+    assert b"Net: 7,000 kg" in response.content
+    assert response.content.endswith(b"\x1dV\x01")
+
+
+def test_open_ticket_cannot_be_printed(client, db_session, complete_ticket):
+    open_ticket = db_session.query(Ticket).filter_by(ticket_no="26-00101").one()
+
+    response = client.get(f"/tickets/{open_ticket.id}/document")
+
+    assert response.status_code == 409
+
+
+def test_daily_bulk_includes_only_complete_tickets(client, complete_ticket):
+    response = client.get("/tickets/documents/daily?date=2026-03-04&format=escpos")
+
+    assert response.status_code == 200
+    assert response.content.count(b"WEIGHBRIDGE TICKET") == 1
+    assert b"26-00100" in response.content
+    assert b"26-00101" not in response.content
@@ -0,0 +1,122 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from app.models import (
+    Customer,
+    DirectionEnum,
+    Product,
+    Ticket,
+    TicketStatusEnum,
+    TransactionTypeEnum,
+    Vehicle,
+)
+
+HTMX = {"HX-Request": "true"}
+SAVE_FRAGMENT_IDS = ("ticket-header", "ticket-alerts", "weights-block", "ticket-pricing")
+FORM = {
+    "action": "save",
+    "datetime": "2026-01-01T10:00",
+    "direction": "INWARD",
+    "transaction_type": "WASTEIN",
+}
+
+
+@pytest.fixture()
+def ticket(db_session):
+    customers = [
+        Customer(account_code=f"C{number:03d}", name=f"Customer {number}")
+        for number in range(500)
+    ]
+    db_session.add_all(customers)
+    db_session.flush()
+    db_session.add(Vehicle(registration="AB12CDE", owner_customer_id=customers[3].id))
+    db_session.add(Product(code="P1", description="Soil", unit_price=Decimal("10.00")))
+    ticket = Ticket(
+        ticket_no="T-FRAG-1",
+        datetime=datetime(2026, 1, 1, 10, 0, 0),
+        status=TicketStatusEnum.OPEN.value,
+        direction=DirectionEnum.INWARD.value,
+        transaction_type=TransactionTypeEnum.WASTEIN.value,
+    )
+    db_session.add(ticket)
+    db_session.commit()
+    return ticket
+
+
+def test_htmx_save_returns_only_changed_fragments(client, ticket, query_budget):
+    page = client.get(f"/tickets/{ticket.id}")
+
+    with query_budget(6):
+        response = client.post(
+            f"/tickets/{ticket.id}", data={**FORM, "gross_kg": "24000"}, headers=HTMX
+        )
+
+    assert response.status_code == 200
+    body = response.text
+    for fragment_id in SAVE_FRAGMENT_IDS:
+        assert f'id="{fragment_id}" hx-swap-oob="true"' in body
+    assert "ticket-lookups" not in body
+    assert "<html" not in body
+    assert "Saved." in body
+    assert len(response.content) * 10 < len(page.content)
+
+
+def test_htmx_validation_error_only_replaces_alerts(client, ticket):
+    response = client.post(
+        f"/tickets/{ticket.id}", data={**FORM, "tare_kg": "1200"}, headers=HTMX
+    )
+
+    assert response.status_code == 400
+    assert 'id="ticket-alerts" hx-swap-oob="true"' in response.text
+    assert "Weigh-in (gross) is required before tare." in response.text
+    assert "weights-block" not in response.text
+
+
+def test_htmx_save_reports_defaulted_customer(client, ticket, db_session):
+    vehicle = db_session.query(Vehicle).one()
+
+    response = client.post(
+        f"/tickets/{ticket.id}",
+        data={**FORM, "vehicle_id": str(vehicle.id)},
+        headers=HTMX,
+    )
+
+    assert response.status_code == 200
+    trigger = json.loads(response.headers["HX-Trigger"])
+    assert trigger["ticket:customer-defaulted"]["value"] == str(
+        vehicle.owner_customer_id
+    )
+
+
+def test_htmx_complete_redirects_the_page(client, ticket, db_session):
+    vehicle = db_session.query(Vehicle).one()
+    product = db_session.query(Product).one()
+    client.post(f"/tickets/{ticket.id}/weights/gross", data={"weight_value": "24000"})
+    client.post(f"/tickets/{ticket.id}/weights/tare", data={"weight_value": "11000"})
+
+    response = client.post(
+        f"/tickets/{ticket.id}",
+        data={
+            **FORM,
+            "action": "complete",
+            "vehicle_id": str(vehicle.id),
+            "product_id": str(product.id),
+            "gross_kg": "24000",
+            "tare_kg": "11000",
+        },
+        headers=HTMX,
+    )
+
+    assert response.status_code == 204
+    assert response.headers["HX-Redirect"] == f"/tickets/{ticket.id}?completed=1"
+
+
+def test_fragments_render_on_their_own(client, ticket):
+    response = client.get(f"/tickets/{ticket.id}/fragments/lookups")
+    assert response.status_code == 200
+    assert response.text.startswith('<div id="ticket-lookups" class="form-grid">')
+
+    assert client.get(f"/tickets/{ticket.id}/fragments/nope").status_code == 404